@@ -7,6 +7,8 @@ import os
 import streamlit as st
 import traceback
 from langchain_core.messages import HumanMessage
+from agent.admission import ADMISSION, AdmissionRejected
+from agent.profiling import profile_run
 from .session_state import reset_research_progress
 from .event_processor import EventStreamProcessor
 from .response_processor import ResponseProcessor
@@ -91,6 +93,42 @@ class ChatInterface:
                 self._process_ai_response(prompt)
 
     def _process_ai_response(self, prompt):
+        """리서치 실행 슬롯을 확보한 뒤 AI 응답을 처리합니다.
+
+        대기 중 재실행(rerun)이나 중단으로 스크립트가 끊겨도 슬롯과 대기열 자리를
+        반납하도록 제출부터 반납까지 try/finally로 감쌉니다.
+        """
+        ticket = None
+        try:
+            # 세션마다 사용자로 집계하며, 테넌트 제한은 API 테넌트에만 적용됩니다
+            ticket = ADMISSION.submit(
+                user=st.session_state.thread_id, priority="interactive"
+            )
+            self._wait_for_research_slot(ticket)
+            self._run_research(prompt)
+        except AdmissionRejected as e:
+            self.sidebar_manager.update_status("🚦 대기열 가득 참", str(e))
+            st.error(
+                "⏳ 현재 리서치 요청이 많아 처리할 수 없습니다. "
+                f"약 {max(1, round(e.retry_after_s))}초 후 다시 시도해주세요."
+            )
+        finally:
+            if ticket is not None:
+                ADMISSION.release(ticket)
+
+    def _wait_for_research_slot(self, ticket):
+        """동시 실행 제한에 걸리면 대기열 순서를 표시하며 슬롯을 기다립니다."""
+        while not ticket.wait(1.0):
+            position = ADMISSION.position(ticket)
+            if position is None:
+                break
+            self.sidebar_manager.update_status(
+                "⏳ 대기 중",
+                f"대기열 {position + 1}번째 "
+                f"(예상 대기 약 {round(ADMISSION.estimated_wait_s(ticket))}초)",
+            )
+
+    def _run_research(self, prompt):
         """AI 응답을 처리합니다."""
         # 환경변수와 세션 상태에서 API 키를 가져옵니다
         google_api_key = (
@@ -111,43 +149,59 @@ class ChatInterface:
         }
         final_answer = ""
 
-        try:
-            # 이벤트 스트림 처리
-            collected_data, stream_error = self.event_processor.process_stream(
-                prompt, config
-            )
-
-            if stream_error:
-                raise stream_error
-
-            # 스트림 완료 후 최종 처리
-            self.sidebar_manager.update_status("🔄 후처리 중", "결과 정리 중...")
-
-            final_answer = collected_data.get("final_answer", "")
-
-            # 최종 답변이 여전히 없으면 일반 invoke 시도
-            if not final_answer:
-                final_answer = self.response_processor.fallback_invoke(prompt, config)
-
-            # <think> 태그 분리 및 결과 렌더링
-            if final_answer:
-                main_answer, reasoning_text = (
-                    self.response_processor.separate_thinking_and_answer(final_answer)
-                )
-
-                # 최종 상태 업데이트
-                self.sidebar_manager.update_status("✅ 완료", "리서치 완료!")
-
-                # 결과 렌더링
-                self.response_processor.render_final_result(
-                    main_answer, reasoning_text, collected_data
+        profiling = bool(st.session_state.get("profile_run"))
+        with profile_run(
+            st.session_state.thread_id, enabled=profiling, caller_label="streamlit"
+        ) as profiler:
+            try:
+                # 이벤트 스트림 처리
+                collected_data, stream_error = self.event_processor.process_stream(
+                    prompt, config
                 )
-            else:
-                st.markdown("### 📋 최종 리서치 결과")
-                st.markdown("리서치를 완료했지만 답변을 생성하지 못했습니다.")
 
-        except Exception as e:
-            final_answer = self._handle_error_recovery(e, prompt, config)
+                if stream_error:
+                    raise stream_error
+
+                # 스트림 완료 후 최종 처리
+                self.sidebar_manager.update_status("🔄 후처리 중", "결과 정리 중...")
+
+                final_answer = collected_data.get("final_answer", "")
+
+                # 최종 답변이 여전히 없으면 일반 invoke 시도
+                if not final_answer:
+                    final_answer = self.response_processor.fallback_invoke(
+                        prompt, config
+                    )
+
+                # <think> 태그 분리 및 결과 렌더링
+                if final_answer:
+                    main_answer, reasoning_text = (
+                        self.response_processor.separate_thinking_and_answer(
+                            final_answer
+                        )
+                    )
+
+                    # 최종 상태 업데이트
+                    if collected_data.get("is_partial"):
+                        self.sidebar_manager.update_status(
+                            "⏱️ 부분 완료", "시간 제한으로 일부만 리서치했습니다."
+                        )
+                    else:
+                        self.sidebar_manager.update_status("✅ 완료", "리서치 완료!")
+
+                    # 결과 렌더링
+                    self.response_processor.render_final_result(
+                        main_answer, reasoning_text, collected_data
+                    )
+                else:
+                    st.markdown("### 📋 최종 리서치 결과")
+                    st.markdown("리서치를 완료했지만 답변을 생성하지 못했습니다.")
+
+            except Exception as e:
+                final_answer = self._handle_error_recovery(e, prompt, config)
+
+        if profiler is not None and profiler.path:
+            st.caption(f"🔥 프로파일 저장됨: `{profiler.path}`")
 
         # 최종 답변을 세션 기록에 저장
         if final_answer:
@@ -6,6 +6,7 @@ LangGraph 이벤트 스트림을 처리하고 데이터를 수집합니다.
 import streamlit as st
 import traceback
 from langchain_core.messages import HumanMessage
+from agent.usage import merge_usage, usage_totals
 
 
 class EventStreamProcessor:
@@ -24,6 +25,8 @@ class EventStreamProcessor:
             "final_answer": "",
             "sources_gathered": [],
             "total_documents": 0,
+            "is_partial": False,
+            "token_usage": {},
         }
 
         try:
@@ -75,6 +78,14 @@ class EventStreamProcessor:
             if not node_data:
                 return
 
+            # 시간 제한으로 일부 결과만 수집된 경우 표시
+            if node_data.get("is_partial"):
+                collected_data["is_partial"] = True
+
+            # 노드별 토큰 사용량 누적
+            if node_data.get("token_usage"):
+                self._process_token_usage(node_data, collected_data)
+
             # 현재 진행 상황 업데이트
             current_status = f"🔄 {node_name} 실행 중"
 
@@ -84,6 +95,11 @@ class EventStreamProcessor:
             elif node_name == "web_research":
                 self._process_web_research(node_data, collected_data, current_status)
 
+            elif node_name == "web_research_pipelined":
+                self._process_web_research_pipelined(
+                    node_data, collected_data, current_status
+                )
+
             elif node_name == "reflection":
                 self._process_reflection(node_data, collected_data, current_status)
 
@@ -94,6 +110,17 @@ class EventStreamProcessor:
             st.warning(f"⚠️ 노드 '{node_name}' 처리 중 오류: {str(node_error)}")
             st.error(f"상세 오류: {traceback.format_exc()}")
 
+    def _process_token_usage(self, node_data, collected_data):
+        """노드가 보고한 토큰 사용량을 누적하고 통계에 반영합니다."""
+        collected_data["token_usage"] = merge_usage(
+            collected_data["token_usage"], node_data["token_usage"]
+        )
+        totals = usage_totals(collected_data["token_usage"])
+        for key in ("prompt_tokens", "completion_tokens", "reasoning_tokens"):
+            st.session_state.current_stats[key] = totals[key]
+        st.session_state.current_stats["search_calls"] = totals["search_calls"]
+        self.sidebar_manager.update_stats()
+
     def _process_generate_query(self, node_data, collected_data, current_status):
         """generate_query 노드 이벤트를 처리합니다."""
         self.sidebar_manager.update_status(current_status, "검색어 생성 중...")
@@ -182,6 +209,26 @@ class EventStreamProcessor:
             self.sidebar_manager.update_stats()
             self.sidebar_manager.update_progress()
 
+    def _process_web_research_pipelined(self, node_data, collected_data, current_status):
+        """web_research_pipelined 노드 이벤트를 검색별 web_research 이벤트로 나누어 처리합니다."""
+        queries = node_data.get("search_query", [])
+        results = node_data.get("web_research_result", [])
+        # 완료된 검색이 먼저 오므로 결과 수만큼만 짝지어 처리
+        for query, result in zip(queries, results):
+            self._process_web_research(
+                {"search_query": [query], "web_research_result": [result]},
+                collected_data,
+                current_status,
+            )
+
+        sources = node_data.get("sources_gathered", [])
+        if sources:
+            collected_data["sources_gathered"].extend(sources)
+            st.session_state.current_stats["documents"] = len(
+                collected_data["sources_gathered"]
+            )
+            self.sidebar_manager.update_stats()
+
     def _process_reflection(self, node_data, collected_data, current_status):
         """reflection 노드 이벤트를 처리합니다."""
         self.sidebar_manager.update_status(current_status, "성찰 중...")
@@ -229,4 +276,9 @@ class EventStreamProcessor:
             collected_data["final_answer"] = final_answer
 
             # 사이드바 업데이트
-            self.sidebar_manager.update_status("✅ 완료", "최종 보고서 작성 완료!")
+            if collected_data["is_partial"]:
+                self.sidebar_manager.update_status(
+                    "⏱️ 부분 완료", "시간 제한으로 부분 보고서를 작성했습니다."
+                )
+            else:
+                self.sidebar_manager.update_status("✅ 완료", "최종 보고서 작성 완료!")
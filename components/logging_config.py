@@ -3,23 +3,112 @@ Centralized logging configuration for the AI Research Agent
 모든 모듈에서 사용할 중앙집중식 로깅 시스템
 """
 
+import atexit
+import bisect
+import contextvars
+import functools
+import json
 import logging
+import os
+import queue
+import random
 import sys
+import threading
+import time
+import uuid
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
+from typing import Optional
 
-# 로그 디렉토리 생성
-LOG_DIR = Path("logs")
-LOG_DIR.mkdir(exist_ok=True)
+# 로그 디렉토리 (첫 기록 시점에 생성)
+LOG_DIR = Path(os.getenv("LOG_DIR", "logs"))
+# 로그 레벨과 파일 회전 설정
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+# DEBUG 레코드 중 실제로 기록할 비율 (1.0보다 작으면 대량 디버그 로그를 샘플링)
+LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))
 
+_FORMATTER = logging.Formatter(
+    fmt="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+_LISTENERS: list[QueueListener] = []
 
-def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
+
+class _LazyRotatingFileHandler(RotatingFileHandler):
+    """첫 레코드를 쓸 때 디렉토리와 파일을 만드는 크기 기반 회전 파일 핸들러."""
+
+    def __init__(self, filename: Path, **kwargs):
+        super().__init__(filename, delay=True, encoding="utf-8", **kwargs)
+
+    def _open(self):
+        Path(self.baseFilename).parent.mkdir(parents=True, exist_ok=True)
+        return super()._open()
+
+
+class _DebugSampler(logging.Filter):
+    """DEBUG 레코드를 rate 비율만 통과시키는 필터 (INFO 이상은 모두 통과)."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+def _queued(*handlers: logging.Handler) -> QueueHandler:
+    """handlers에 쓰는 백그라운드 writer 스레드를 시작하고 그 큐 핸들러를 반환합니다.
+
+    메시지는 큐에 넣기 전에 포맷되므로, 이후 인자 객체가 바뀌어도 기록 내용은 그대로입니다.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _LISTENERS.append(listener)
+    return QueueHandler(log_queue)
+
+
+@functools.cache
+def _log_queue_handler() -> QueueHandler:
+    """모든 로거가 공유하는 콘솔/파일 writer의 큐 핸들러를 반환합니다."""
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(_FORMATTER)
+
+    # 파일 핸들러 (크기 기반 회전)
+    today = datetime.now().strftime("%Y-%m-%d")
+    file_handler = _LazyRotatingFileHandler(
+        LOG_DIR / f"agent_{today}.log",
+        maxBytes=LOG_MAX_BYTES,
+        backupCount=LOG_BACKUP_COUNT,
+    )
+    file_handler.setFormatter(_FORMATTER)
+
+    handler = _queued(console_handler, file_handler)
+    handler.addFilter(_DebugSampler(LOG_DEBUG_SAMPLE_RATE))
+    return handler
+
+
+@atexit.register
+def _flush_logs() -> None:
+    """종료 시 큐에 남은 로그를 모두 기록합니다."""
+    for listener in _LISTENERS:
+        listener.stop()
+    _LISTENERS.clear()
+
+
+def setup_logger(name: str, level: Optional[int] = None) -> logging.Logger:
     """
     로거를 설정하고 반환합니다.
 
+    로거는 레코드를 큐에 넣기만 하고, 콘솔/파일 기록은 백그라운드 스레드가 담당합니다.
+    메시지는 `logger.info("... %s", value)`처럼 인자로 넘겨야 실제로 기록될 때만 포맷됩니다.
+
     Args:
         name: 로거 이름 (보통 모듈명)
-        level: 로그 레벨
+        level: 로그 레벨 (기본값: LOG_LEVEL 환경변수)
 
     Returns:
         설정된 로거
@@ -30,27 +119,8 @@ def setup_logger(name: str, level: int = logging.INFO) -> logging.Logger:
     if logger.handlers:
         return logger
 
-    logger.setLevel(level)
-
-    # 포맷터 설정
-    formatter = logging.Formatter(
-        fmt="%(asctime)s | %(name)s | %(levelname)s | %(message)s",
-        datefmt="%Y-%m-%d %H:%M:%S",
-    )
-
-    # 콘솔 핸들러
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setLevel(level)
-    console_handler.setFormatter(formatter)
-    logger.addHandler(console_handler)
-
-    # 파일 핸들러 (일별 로그 파일)
-    today = datetime.now().strftime("%Y-%m-%d")
-    file_handler = logging.FileHandler(LOG_DIR / f"agent_{today}.log", encoding="utf-8")
-    file_handler.setLevel(logging.DEBUG)  # 파일에는 모든 레벨 기록
-    file_handler.setFormatter(formatter)
-    logger.addHandler(file_handler)
-
+    logger.setLevel(level if level is not None else LOG_LEVEL)
+    logger.addHandler(_log_queue_handler())
     return logger
 
 
@@ -62,28 +132,36 @@ def log_api_call(
     response_status: str = None,
 ):
     """API 호출을 로깅합니다."""
-    log_msg = f"API Call - {method} {endpoint}"
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    log_msg = "API Call - %s %s"
+    args = [method, endpoint]
     if response_status:
-        log_msg += f" | Status: {response_status}"
+        log_msg += " | Status: %s"
+        args.append(response_status)
     if data:
         # 데이터가 너무 길면 자름
-        data_preview = data[:200] + "..." if len(data) > 200 else data
-        log_msg += f" | Data: {data_preview}"
-    logger.info(log_msg)
+        log_msg += " | Data: %.200s" + ("..." if len(data) > 200 else "")
+        args.append(data)
+    logger.info(log_msg, *args)
 
 
 def log_graph_transition(
     logger: logging.Logger, from_node: str, to_node: str, state_data: dict = None
 ):
     """그래프 노드 전환을 로깅합니다."""
-    log_msg = f"Graph Transition: {from_node} -> {to_node}"
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    log_msg = "Graph Transition: %s -> %s"
+    args = [from_node, to_node]
     if state_data:
         # 중요한 상태 정보만 로깅
         important_keys = ["search_query", "research_loop_count", "is_sufficient"]
         filtered_state = {k: v for k, v in state_data.items() if k in important_keys}
         if filtered_state:
-            log_msg += f" | State: {filtered_state}"
-    logger.info(log_msg)
+            log_msg += " | State: %s"
+            args.append(filtered_state)
+    logger.info(log_msg, *args)
 
 
 def log_tool_usage(
@@ -94,33 +172,256 @@ def log_tool_usage(
     success: bool = True,
 ):
     """도구 사용을 로깅합니다."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
     status = "SUCCESS" if success else "FAILED"
-    log_msg = f"Tool Usage - {tool_name} | Status: {status}"
+    log_msg = "Tool Usage - %s | Status: %s"
+    args = [tool_name, status]
 
     if input_data:
-        input_preview = (
-            input_data[:100] + "..." if len(input_data) > 100 else input_data
-        )
-        log_msg += f" | Input: {input_preview}"
+        log_msg += " | Input: %.100s" + ("..." if len(input_data) > 100 else "")
+        args.append(input_data)
 
     if output_data:
-        output_preview = (
-            output_data[:100] + "..." if len(output_data) > 100 else output_data
-        )
-        log_msg += f" | Output: {output_preview}"
+        log_msg += " | Output: %.100s" + ("..." if len(output_data) > 100 else "")
+        args.append(output_data)
 
-    logger.info(log_msg)
+    logger.info(log_msg, *args)
 
 
 def log_error_with_context(
     logger: logging.Logger, error: Exception, context: str, additional_data: dict = None
 ):
     """에러를 컨텍스트와 함께 로깅합니다."""
-    log_msg = f"ERROR in {context} | {type(error).__name__}: {str(error)}"
+    log_msg = "ERROR in %s | %s: %s"
+    args = [context, type(error).__name__, error]
     if additional_data:
-        log_msg += f" | Context: {additional_data}"
-    logger.error(log_msg, exc_info=True)
+        log_msg += " | Context: %s"
+        args.append(additional_data)
+    logger.error(log_msg, *args, exc_info=True)
+
+
+# 지연 시간 히스토그램 버킷 경계 (ms)
+LATENCY_BUCKETS_MS = (
+    1, 2, 5, 10, 25, 50, 100, 250, 500,
+    1000, 2500, 5000, 10000, 30000, 60000, 120000,
+)  # fmt: skip
+
+
+class LatencyHistogram:
+    """고정 버킷 지연 시간 히스토그램.
+
+    버킷 안에서 선형 보간하여 p50/p95/p99 같은 분위수를 추정합니다.
+    """
+
+    def __init__(self, bounds_ms: tuple = LATENCY_BUCKETS_MS):
+        """bounds_ms 경계(ms)로 나눈 빈 히스토그램을 만듭니다."""
+        self.bounds_ms = bounds_ms
+        # 마지막 칸은 가장 큰 경계를 넘는 값 (+Inf)
+        self.counts = [0] * (len(bounds_ms) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.errors = 0
+
+    def observe(self, duration_ms: float, error: bool = False) -> None:
+        """측정값 하나를 기록합니다."""
+        self.counts[bisect.bisect_left(self.bounds_ms, duration_ms)] += 1
+        self.count += 1
+        self.sum_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        if error:
+            self.errors += 1
+
+    def quantile(self, q: float) -> float:
+        """분위수 q의 값(ms)을 추정합니다."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for idx, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.bounds_ms[idx - 1] if idx > 0 else 0.0
+                upper = (
+                    self.bounds_ms[idx] if idx < len(self.bounds_ms) else self.max_ms
+                )
+                upper = min(upper, self.max_ms)
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.max_ms
+
+    def copy(self) -> "LatencyHistogram":
+        """현재 값의 복사본을 반환합니다."""
+        histogram = LatencyHistogram(self.bounds_ms)
+        histogram.counts = list(self.counts)
+        histogram.count = self.count
+        histogram.sum_ms = self.sum_ms
+        histogram.max_ms = self.max_ms
+        histogram.errors = self.errors
+        return histogram
+
+    def summary(self) -> dict:
+        """건수, 평균, 분위수, 최대값을 반환합니다."""
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "mean_ms": round(self.sum_ms / self.count, 2) if self.count else 0.0,
+            "p50_ms": round(self.quantile(0.50), 2),
+            "p95_ms": round(self.quantile(0.95), 2),
+            "p99_ms": round(self.quantile(0.99), 2),
+            "max_ms": round(self.max_ms, 2),
+        }
+
+
+_HISTOGRAMS: dict[str, LatencyHistogram] = {}
+_HISTOGRAMS_LOCK = threading.Lock()
+_CURRENT_SPAN: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+def _span_exporter() -> Optional[logging.Logger]:
+    """SPAN_EXPORT_PATH가 설정되면 완료된 span을 JSON lines로 기록하는 로거를 만듭니다."""
+    path = os.getenv("SPAN_EXPORT_PATH")
+    if not path:
+        return None
+    exporter = logging.getLogger("agent.spans")
+    exporter.propagate = False
+    if not exporter.handlers:
+        handler = _LazyRotatingFileHandler(
+            Path(path), maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        exporter.addHandler(_queued(handler))
+        exporter.setLevel(logging.INFO)
+    return exporter
+
+
+class _JsonLine:
+    """str()로 변환될 때 JSON으로 직렬화되는 로그 인자."""
+
+    __slots__ = ("data",)
+
+    def __init__(self, data: dict):
+        self.data = data
+
+    def __str__(self) -> str:
+        return json.dumps(self.data, ensure_ascii=False, default=str)
+
+
+class Span:
+    """이름이 있는 시간 구간.
+
+    `with span(...)` 안에서 시작한 span은 자식이 되고, 같은 trace_id(thread_id)를 물려받습니다.
+    """
+
+    def __init__(self, name: str, trace_id: Optional[str] = None, **attributes):
+        """아직 시작하지 않은 span을 만듭니다."""
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent: Optional[Span] = None
+        self.trace_id = trace_id
+        self.start_time = 0.0
+        self.duration_ms = 0.0
+        self.error: Optional[str] = None
+        self._start = 0.0
+        self._token = None
+
+    def __enter__(self) -> "Span":
+        """시간 측정을 시작하고 현재 span으로 등록합니다."""
+        self.parent = _CURRENT_SPAN.get()
+        if self.trace_id is None and self.parent is not None:
+            self.trace_id = self.parent.trace_id
+        self.start_time = time.time()
+        self._start = time.perf_counter()
+        self._token = _CURRENT_SPAN.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        """시간 측정을 끝내고 히스토그램에 기록합니다 (예외는 그대로 전파)."""
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+        _CURRENT_SPAN.reset(self._token)
+        if exc_type is not None:
+            self.error = f"{exc_type.__name__}: {exc}"
+        with _HISTOGRAMS_LOCK:
+            histogram = _HISTOGRAMS.setdefault(self.name, LatencyHistogram())
+            histogram.observe(self.duration_ms, error=exc_type is not None)
+        if SPAN_EXPORTER is not None:
+            # JSON 직렬화는 레코드가 필터를 통과해 큐에 들어갈 때만 수행
+            SPAN_EXPORTER.info("%s", _JsonLine(self.to_dict()))
+        return False
+
+    def set(self, **attributes) -> None:
+        """Span에 속성을 추가합니다."""
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict:
+        """내보내기용 dict를 반환합니다."""
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent.span_id if self.parent else None,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration_ms, 3),
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+def span(name: str, trace_id: Optional[str] = None, **attributes) -> Span:
+    """시간을 측정할 구간을 만듭니다.
+
+    Args:
+        name: span 이름 (히스토그램 집계 단위, 예: "node.reflection")
+        trace_id: 실행 식별자 (보통 thread_id). 없으면 부모 span에서 물려받음
+        **attributes: 함께 기록할 속성
+
+    Returns:
+        `with` 문에 사용할 Span
+    """
+    return Span(name, trace_id=trace_id, **attributes)
+
+
+def traced(name: str):
+    """함수 호출 전체를 span으로 감싸는 데코레이터를 반환합니다."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def current_span() -> Optional[Span]:
+    """현재 실행 중인 span을 반환합니다."""
+    return _CURRENT_SPAN.get()
+
+
+def span_stats() -> dict:
+    """Span 이름별 지연 시간 요약(p50/p95/p99 등)을 반환합니다."""
+    with _HISTOGRAMS_LOCK:
+        return {name: h.summary() for name, h in sorted(_HISTOGRAMS.items())}
+
+
+def span_histograms() -> dict:
+    """Span 이름별 히스토그램의 복사본을 반환합니다 (메트릭 내보내기용)."""
+    with _HISTOGRAMS_LOCK:
+        return {name: h.copy() for name, h in sorted(_HISTOGRAMS.items())}
+
+
+def reset_span_stats() -> None:
+    """집계된 히스토그램을 초기화합니다."""
+    with _HISTOGRAMS_LOCK:
+        _HISTOGRAMS.clear()
+
 
+SPAN_EXPORTER = _span_exporter()
 
 # 각 모듈별 로거 미리 설정
 GRAPH_LOGGER = setup_logger("agent.graph")
@@ -128,3 +429,4 @@ UTILS_LOGGER = setup_logger("agent.utils")
 TOOLS_LOGGER = setup_logger("agent.tools")
 STREAMLIT_LOGGER = setup_logger("streamlit.app")
 API_LOGGER = setup_logger("api.client")
+BATCH_LOGGER = setup_logger("agent.batch")
@@ -7,6 +7,7 @@ import re
 import streamlit as st
 import traceback
 from langchain_core.messages import HumanMessage
+from agent.utils import strip_thinking
 
 
 class ResponseProcessor:
@@ -18,27 +19,22 @@ class ResponseProcessor:
 
     def separate_thinking_and_answer(self, final_answer):
         """<think> 태그를 분리하여 reasoning과 main answer로 나눕니다."""
-        reasoning_text = ""
-        main_answer = final_answer
-
-        if final_answer:
-            # <think>...</think> 패턴 찾기
-            think_pattern = r"<think>(.*?)</think>"
-            think_matches = re.findall(think_pattern, final_answer, re.DOTALL)
-
-            if think_matches:
-                reasoning_text = "\n".join(think_matches)
-                # <think> 태그 부분을 제거한 메인 답변
-                main_answer = re.sub(
-                    think_pattern, "", final_answer, flags=re.DOTALL
-                ).strip()
+        if not final_answer:
+            return final_answer, ""
 
+        # 스트리밍 파서로 <think>...</think> 블록을 분리
+        main_answer, reasoning_text = strip_thinking(final_answer)
         return main_answer, reasoning_text
 
     def render_final_result(self, main_answer, reasoning_text, collected_data):
         """최종 결과를 렌더링합니다."""
         # 최종 답변을 먼저 표시 (상단)
         st.markdown("### 📋 최종 리서치 결과")
+        if collected_data.get("is_partial"):
+            st.warning(
+                "⏱️ 시간 제한으로 리서치를 모두 마치지 못했습니다. "
+                "지금까지 수집한 정보로 작성한 부분 답변입니다."
+            )
         if main_answer:
             # 인용 링크를 실제 URL로 변환
             enhanced_answer = self._enhance_citations(main_answer, collected_data)
@@ -75,11 +71,12 @@ class ResponseProcessor:
             return text
 
         # short_url을 키로 하는 소스 매핑 생성
+        # 중복으로 합쳐진 소스의 short_url(aliases)도 남은 소스를 가리키도록 함
         source_mapping = {}
         for source in collected_data["sources_gathered"]:
-            short_url = source.get("short_url", "")
-            if short_url:
-                source_mapping[short_url] = source
+            for short_url in [source.get("short_url", ""), *source.get("aliases", [])]:
+                if short_url:
+                    source_mapping.setdefault(short_url, source)
 
         # [label](short_url) 패턴 찾기
         import re
@@ -108,9 +105,7 @@ class ResponseProcessor:
 
     def clean_answer_for_session(self, final_answer):
         """세션 저장용으로 <think> 태그를 제거한 깨끗한 답변을 반환합니다."""
-        clean_answer = re.sub(
-            r"<think>.*?</think>", "", final_answer, flags=re.DOTALL
-        ).strip()
+        clean_answer, _ = strip_thinking(final_answer)
         return clean_answer or final_answer
 
     def fallback_invoke(self, prompt, config):
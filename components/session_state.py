@@ -25,6 +25,10 @@ def initialize_session_state():
             "completed_searches": 0,
             "documents": 0,
             "reflections": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "reasoning_tokens": 0,
+            "search_calls": 0,
         }
 
     # Initialize model and search configurations
@@ -58,6 +62,10 @@ def reset_research_progress():
         "completed_searches": 0,
         "documents": 0,
         "reflections": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "reasoning_tokens": 0,
+        "search_calls": 0,
     }
 
 
@@ -296,6 +296,12 @@ class SidebarManager:
         st.markdown("## 📊 디버그 정보")
         st.write(f"**Thread ID:** `{st.session_state.thread_id}`")
         st.write(f"**메시지 수:** {len(st.session_state.messages)}")
+        st.checkbox(
+            "🔥 실행 프로파일링",
+            key="profile_run",
+            help="리서치 실행을 샘플링 프로파일러로 기록하고 플레임 그래프 파일과 "
+            "노드별 실행/CPU 시간을 저장합니다",
+        )
 
     def _render_env_info(self):
         """환경 설정 정보를 간단히 렌더링합니다."""
@@ -371,6 +377,16 @@ class SidebarManager:
                     st.metric(
                         "성찰 횟수", st.session_state.current_stats["reflections"]
                     )
+
+                stats = st.session_state.current_stats
+                st.markdown("#### 🧮 토큰 사용량")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("입력 토큰", f"{stats.get('prompt_tokens', 0):,}")
+                    st.metric("추론 토큰", f"{stats.get('reasoning_tokens', 0):,}")
+                with col2:
+                    st.metric("출력 토큰", f"{stats.get('completion_tokens', 0):,}")
+                    st.metric("검색 호출", stats.get("search_calls", 0))
         except Exception as e:
             st.error(f"통계 업데이트 오류: {e}")
 
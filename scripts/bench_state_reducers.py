@@ -0,0 +1,187 @@
+"""Benchmark the research list channels: operator.add vs. the bounded reducers.
+
+Runs a graph shaped like the research agent (fan-out search branches, a
+reflection reading every summary, a final answer) for many loops with
+synthetic results whose sources overlap, once with ``operator.add`` channels
+and once with the bounded, de-duplicating reducers of ``agent.reducers``.
+Reports the final state size, the time spent merging updates and the mean
+time per graph step.
+
+Usage:
+    PYTHONPATH=src:. python scripts/bench_state_reducers.py --loops 30
+"""
+
+import argparse
+import operator
+import pickle
+import random
+import time
+from typing import Annotated, Callable, TypedDict
+
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Send
+
+from agent.reducers import add_research_results, add_search_queries, add_sources
+
+HOSTS = ("example.com", "news.example.org", "docs.example.net")
+
+
+class Timed:
+    """Wrap a reducer and add up the time spent in it."""
+
+    def __init__(self, reducer: Callable[[list, list], list]):
+        """Wrap ``reducer`` with no time counted yet."""
+        self.reducer = reducer
+        self.calls = 0
+        self.elapsed = 0.0
+
+    def __call__(self, left: list, right: list) -> list:
+        """Merge ``right`` into ``left`` with the wrapped reducer, timing the call."""
+        started = time.perf_counter()
+        merged = self.reducer(left, right)
+        self.elapsed += time.perf_counter() - started
+        self.calls += 1
+        return merged
+
+
+def make_graph(reducers: dict, args: argparse.Namespace, returns_all_sources: bool):
+    """Build the benchmark graph with ``reducers`` on the three list channels."""
+
+    class State(TypedDict):
+        search_query: Annotated[list, reducers["search_query"]]
+        web_research_result: Annotated[list, reducers["web_research_result"]]
+        sources_gathered: Annotated[list, reducers["sources_gathered"]]
+        loop: int
+
+    class Branch(TypedDict):
+        query: str
+        id: int
+
+    def plan(state: State) -> dict:
+        return {"loop": state.get("loop", 0) + 1}
+
+    def fan_out(state: State) -> list:
+        start = (state["loop"] - 1) * args.branches
+        return [
+            Send("search", {"query": f"query {start + idx}", "id": start + idx})
+            for idx in range(args.branches)
+        ]
+
+    def search(branch: Branch) -> dict:
+        rng = random.Random(branch["id"])
+        sources = []
+        for idx in range(args.sources):
+            page = rng.randrange(args.url_pool)
+            # The same page comes back with and without www, slashes and trackers
+            host = rng.choice(("", "www.")) + HOSTS[page % len(HOSTS)]
+            url = f"https://{host}/page/{page}" + rng.choice(("", "/"))
+            if rng.random() < 0.3:
+                url += f"?utm_source=search&utm_medium={rng.randrange(9)}"
+            sources.append(
+                {
+                    "label": f"Page {page}",
+                    "value": url,
+                    "short_url": f"{branch['id']}-{idx}",
+                    "content": "x" * args.content_chars,
+                }
+            )
+        summary = f"{branch['query']}: " + "word " * (args.summary_chars // 5)
+        return {
+            "search_query": [branch["query"]],
+            "web_research_result": [summary],
+            "sources_gathered": sources,
+        }
+
+    def reflect(state: State) -> dict:
+        # Like the agent's reflection, read every summary and count the sources
+        "\n\n---\n\n".join(state["web_research_result"])
+        len(state["sources_gathered"])
+        return {}
+
+    def route(state: State) -> str:
+        return "plan" if state["loop"] < args.loops else "finalize"
+
+    def finalize(state: State) -> dict:
+        if returns_all_sources:
+            # The old finalize_answer handed the whole list back to operator.add
+            return {"sources_gathered": state["sources_gathered"]}
+        return {}
+
+    builder = StateGraph(State)
+    builder.add_node("plan", plan)
+    builder.add_node("search", search)
+    builder.add_node("reflect", reflect)
+    builder.add_node("finalize", finalize)
+    builder.add_edge(START, "plan")
+    builder.add_conditional_edges("plan", fan_out, ["search"])
+    builder.add_edge("search", "reflect")
+    builder.add_conditional_edges("reflect", route, ["plan", "finalize"])
+    builder.add_edge("finalize", END)
+    return builder.compile()
+
+
+def bench(name: str, reducers: dict, args, returns_all_sources: bool) -> None:
+    """Run the graph ``args.repeat`` times and print one result row.
+
+    The time per step is the best of the repeats, after one warm-up run.
+    """
+    timed = {channel: Timed(reducer) for channel, reducer in reducers.items()}
+    graph = make_graph(timed, args, returns_all_sources)
+    config = {"recursion_limit": args.loops * 4 + 10}
+    graph.invoke({}, config)
+    for reducer in timed.values():
+        reducer.calls, reducer.elapsed = 0, 0.0
+    step_s = float("inf")
+    for _ in range(args.repeat):
+        steps, started = 0, time.perf_counter()
+        for state in graph.stream({}, config, stream_mode="values"):
+            steps += 1
+        step_s = min(step_s, (time.perf_counter() - started) / steps)
+    merge_s = sum(reducer.elapsed for reducer in timed.values())
+    merges = sum(reducer.calls for reducer in timed.values())
+    size = len(pickle.dumps({channel: list(state[channel]) for channel in reducers}))
+    print(
+        f"{name:<10}{len(state['search_query']):>9}"
+        f"{len(state['web_research_result']):>9}{len(state['sources_gathered']):>9}"
+        f"{size / 1024:>11.0f}{merge_s / merges * 1e6:>11.1f}{step_s * 1e3:>11.2f}"
+    )
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--loops", type=int, default=30)
+    parser.add_argument("--branches", type=int, default=5)
+    parser.add_argument("--sources", type=int, default=10)
+    parser.add_argument("--url-pool", type=int, default=150)
+    parser.add_argument("--summary-chars", type=int, default=2000)
+    parser.add_argument("--content-chars", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(
+        f"{'channels':<10}{'queries':>9}{'results':>9}{'sources':>9}"
+        f"{'state KiB':>11}{'us/merge':>11}{'ms/step':>11}"
+    )
+    bench(
+        "add",
+        dict.fromkeys(
+            ("search_query", "web_research_result", "sources_gathered"), operator.add
+        ),
+        args,
+        returns_all_sources=True,
+    )
+    bench(
+        "bounded",
+        {
+            "search_query": add_search_queries,
+            "web_research_result": add_research_results,
+            "sources_gathered": add_sources,
+        },
+        args,
+        returns_all_sources=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
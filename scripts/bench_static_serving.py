@@ -0,0 +1,122 @@
+"""Benchmark frontend static serving: in-memory index vs. per-request file access.
+
+Builds a Vite-like dist directory in a temp dir and measures requests/sec and
+bytes sent for a mix of index.html and hashed asset requests, in process
+through ASGI so the numbers reflect the app and not the network.
+
+Usage:
+    PYTHONPATH=src:. python scripts/bench_static_serving.py --requests 5000
+"""
+
+import argparse
+import asyncio
+import pathlib
+import random
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import FileResponse
+from fastapi.staticfiles import StaticFiles
+
+from agent.app import create_frontend_router
+
+PATHS = (
+    "",
+    "index.html",
+    "research/123",
+    "assets/index-B7mqx9Ux.js",
+    "assets/index-Cq1h3ZkD.css",
+    "favicon.svg",
+)
+
+
+def make_build(root: pathlib.Path) -> None:
+    """Write a small Vite-like build into ``root``."""
+    rng = random.Random(0)
+    words = ["const", "function", "return", "props", "state", "=>", "{", "}", ";"]
+    (root / "assets").mkdir(parents=True)
+    (root / "index.html").write_text(
+        '<!doctype html><html><head><script type="module" '
+        'src="/app/assets/index-B7mqx9Ux.js"></script></head>'
+        '<body><div id="root"></div></body></html>' * 4
+    )
+    (root / "assets" / "index-B7mqx9Ux.js").write_text(
+        " ".join(rng.choice(words) for _ in range(60_000))
+    )
+    (root / "assets" / "index-Cq1h3ZkD.css").write_text(
+        "".join(f".c{i}{{margin:{i % 16}px;color:#{i:06x}}}\n" for i in range(3000))
+    )
+    (root / "favicon.svg").write_text('<svg xmlns="http://www.w3.org/2000/svg"/>')
+
+
+def baseline_router(build_path: pathlib.Path) -> FastAPI:
+    """Return the previous implementation: StaticFiles mount plus FileResponse."""
+    react = FastAPI(openapi_url="")
+    react.mount("/assets", StaticFiles(directory=build_path / "assets"))
+
+    @react.get("/{path:path}")
+    async def handle_catch_all(request: Request, path: str):
+        fp = build_path / path
+        if not fp.exists() or not fp.is_file():
+            fp = build_path / "index.html"
+        return FileResponse(fp)
+
+    return react
+
+
+async def bench(app, requests: int, concurrency: int, headers: dict) -> tuple:
+    """Return requests/sec and the mean body size sent for ``requests`` requests."""
+    transport = httpx.ASGITransport(app=app)
+    sent = 0
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as c:
+
+        async def worker(n: int):
+            nonlocal sent
+            for i in range(n):
+                url = "/" + PATHS[i % len(PATHS)]
+                # Read the raw body so client-side decompression is not measured
+                async with c.stream("GET", url, headers=headers) as r:
+                    r.raise_for_status()
+                    async for chunk in r.aiter_raw():
+                        sent += len(chunk)
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(worker(requests // concurrency) for _ in range(concurrency))
+        )
+        elapsed = time.perf_counter() - started
+    done = requests // concurrency * concurrency
+    return done / elapsed, sent / done
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        build_path = pathlib.Path(tmp) / "dist"
+        make_build(build_path)
+        apps = {
+            "baseline": baseline_router(build_path),
+            "indexed": create_frontend_router(str(build_path)),
+        }
+        scenarios = {
+            "identity": {"Accept-Encoding": "identity"},
+            "gzip": {"Accept-Encoding": "gzip, deflate"},
+        }
+        print(f"{'app':<10}{'encoding':<10}{'req/s':>10}{'bytes/req':>12}")
+        for name, app in apps.items():
+            for scenario, headers in scenarios.items():
+                rps, size = asyncio.run(
+                    bench(app, args.requests, args.concurrency, headers)
+                )
+                print(f"{name:<10}{scenario:<10}{rps:>10.0f}{size:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
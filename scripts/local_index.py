@@ -0,0 +1,60 @@
+"""Build or query a local search index from the command line.
+
+Indexes ``.txt``, ``.md``, ``.rst`` and ``.jsonl`` files into the BM25 index
+that ``"search_type": "local"`` searches, and prints the best results of a
+query as JSON lines.
+
+Usage:
+    PYTHONPATH=src:. python scripts/local_index.py index docs/ --index index/local --workers 8
+    PYTHONPATH=src:. python scripts/local_index.py search "what changed in 0.9" --index index/local
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Optional
+
+from agent.local_search import LocalIndex, build_index
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Build or query a local index from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--index", default="index/local", help="index directory (default index/local)"
+    )
+    # ``--index`` is also accepted after the command; without it there the
+    # value given before the command is kept
+    index_path = argparse.ArgumentParser(add_help=False)
+    index_path.add_argument(
+        "--index", default=argparse.SUPPRESS, help="index directory"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    index = commands.add_parser(
+        "index", parents=[index_path], help="add new and changed files"
+    )
+    index.add_argument("sources", type=Path, nargs="+", help="files or directories")
+    index.add_argument(
+        "--workers", type=int, default=None, help="indexing processes (default: cores)"
+    )
+    index.add_argument(
+        "--rebuild", action="store_true", help="discard the index and start over"
+    )
+    search = commands.add_parser(
+        "search", parents=[index_path], help="print the best results of a query"
+    )
+    search.add_argument("query")
+    search.add_argument("--max-results", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    if args.command == "index":
+        stats = build_index(args.sources, Path(args.index), args.workers, args.rebuild)
+        print(json.dumps(stats))
+    else:
+        for result in LocalIndex(Path(args.index)).search(args.query, args.max_results):
+            print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,241 @@
+"""Admission control for research runs: bounded queue, concurrency caps and priorities."""
+
+import asyncio
+import itertools
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from components.logging_config import API_LOGGER
+
+# Priority classes, most urgent first
+PRIORITIES = ("interactive", "batch")
+
+
+class AdmissionRejected(RuntimeError):
+    """Raised when a run is shed because the queue is full or waiting timed out."""
+
+    def __init__(self, message: str, retry_after_s: float):
+        """Create a rejection suggesting a retry after ``retry_after_s`` seconds."""
+        super().__init__(message)
+        self.retry_after_s = retry_after_s
+
+
+class Ticket:
+    """A run's place in the admission queue and, once admitted, its slot."""
+
+    def __init__(
+        self, user: Optional[str], tenant: Optional[str], priority: str, seq: int
+    ):
+        """Create a queued ticket."""
+        self.user = user
+        self.tenant = tenant
+        self.priority = priority
+        self.seq = seq
+        self.enqueued_at = time.monotonic()
+        self.admitted_at: Optional[float] = None
+        self.cancelled = False
+        self._admitted = threading.Event()
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def admitted(self) -> bool:
+        """Return True once the ticket holds a run slot."""
+        return self._admitted.is_set()
+
+    @property
+    def wait_s(self) -> float:
+        """Return the seconds spent in the queue so far."""
+        end = self.admitted_at if self.admitted_at is not None else time.monotonic()
+        return end - self.enqueued_at
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until admitted; return False if ``timeout`` passed first."""
+        return self._admitted.wait(timeout)
+
+    async def wait_async(self) -> None:
+        """Wait until admitted without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._async_waiters.append((loop, future))
+        if self.admitted and not future.done():
+            future.set_result(None)
+        await future
+
+    def _admit(self) -> None:
+        self.admitted_at = time.monotonic()
+        self._admitted.set()
+        for loop, future in self._async_waiters:
+            loop.call_soon_threadsafe(_resolve, future)
+        self._async_waiters.clear()
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class AdmissionController:
+    """Admit research runs under global, per-user and per-tenant concurrency caps.
+
+    Runs that cannot start immediately wait in a bounded queue ordered by
+    priority class (``interactive`` before ``batch``) and arrival. A queued
+    run is skipped, not blocked on, while its user or tenant is at its cap,
+    so one busy tenant cannot hold up everyone else. Runs without a user or
+    tenant are not counted against that cap, so anonymous callers do not end
+    up sharing one per-user or per-tenant slot pool. When the queue is full,
+    new runs are rejected with ``AdmissionRejected`` instead of letting every
+    run slow down together.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 64,
+        per_user_limit: int = 2,
+        per_tenant_limit: int = 4,
+    ):
+        """Create a controller with the given limits."""
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.per_user_limit = per_user_limit
+        self.per_tenant_limit = per_tenant_limit
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._queue: list[Ticket] = []
+        self._running: set[Ticket] = set()
+        self._by_user: dict[str, int] = {}
+        self._by_tenant: dict[str, int] = {}
+        self._avg_run_s = 30.0
+        self.rejected = 0
+
+    def submit(
+        self,
+        user: Optional[str] = None,
+        tenant: Optional[str] = None,
+        priority: str = "interactive",
+    ) -> Ticket:
+        """Queue a run and admit it right away if capacity allows.
+
+        Raises:
+            AdmissionRejected: If the queue is full.
+            ValueError: If ``priority`` is not a known class.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority class: {priority}")
+        with self._lock:
+            if len(self._queue) >= self.max_queue:
+                self.rejected += 1
+                retry_after_s = self._estimate_wait(len(self._queue))
+                API_LOGGER.warning(
+                    "🚦 Admission queue full (%s), rejecting run for %s/%s",
+                    len(self._queue),
+                    tenant,
+                    user,
+                )
+                raise AdmissionRejected("Research queue is full", retry_after_s)
+            ticket = Ticket(user, tenant, priority, next(self._seq))
+            self._queue.append(ticket)
+            self._queue.sort(key=lambda t: (PRIORITIES.index(t.priority), t.seq))
+            self._dispatch()
+        return ticket
+
+    def release(self, ticket: Ticket) -> None:
+        """Free the ticket's slot, or drop it from the queue if never admitted."""
+        with self._lock:
+            if ticket in self._running:
+                self._running.discard(ticket)
+                _decrement(self._by_user, ticket.user)
+                _decrement(self._by_tenant, ticket.tenant)
+                run_s = time.monotonic() - ticket.admitted_at
+                self._avg_run_s = 0.8 * self._avg_run_s + 0.2 * run_s
+            elif ticket in self._queue:
+                ticket.cancelled = True
+                self._queue.remove(ticket)
+            self._dispatch()
+
+    def position(self, ticket: Ticket) -> Optional[int]:
+        """Return the ticket's 0-based queue position, or None once admitted."""
+        with self._lock:
+            return self._queue.index(ticket) if ticket in self._queue else None
+
+    def estimated_wait_s(self, ticket: Ticket) -> float:
+        """Estimate the remaining queue wait of a ticket from recent run durations."""
+        position = self.position(ticket)
+        return 0.0 if position is None else self._estimate_wait(position)
+
+    def stats(self) -> dict:
+        """Return the number of running and queued runs per priority class."""
+        with self._lock:
+            queued = {name: 0 for name in PRIORITIES}
+            for ticket in self._queue:
+                queued[ticket.priority] += 1
+            return {
+                "running": len(self._running),
+                "queued": queued,
+                "rejected": self.rejected,
+                "avg_run_s": round(self._avg_run_s, 2),
+            }
+
+    @contextmanager
+    def slot(
+        self,
+        user: Optional[str] = None,
+        tenant: Optional[str] = None,
+        priority: str = "interactive",
+        timeout: Optional[float] = None,
+    ) -> Iterator[Ticket]:
+        """Hold a run slot for the duration of the ``with`` block.
+
+        Raises:
+            AdmissionRejected: If the queue is full or no slot was free in time.
+        """
+        ticket = self.submit(user, tenant, priority)
+        try:
+            if not ticket.wait(timeout):
+                raise AdmissionRejected(
+                    "Timed out waiting for a research slot",
+                    self.estimated_wait_s(ticket),
+                )
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def _dispatch(self) -> None:
+        for ticket in list(self._queue):
+            if len(self._running) >= self.max_concurrent:
+                break
+            if self._by_user.get(ticket.user, 0) >= self.per_user_limit:
+                continue
+            if self._by_tenant.get(ticket.tenant, 0) >= self.per_tenant_limit:
+                continue
+            self._queue.remove(ticket)
+            self._running.add(ticket)
+            if ticket.user is not None:
+                self._by_user[ticket.user] = self._by_user.get(ticket.user, 0) + 1
+            if ticket.tenant is not None:
+                self._by_tenant[ticket.tenant] = (
+                    self._by_tenant.get(ticket.tenant, 0) + 1
+                )
+            ticket._admit()
+
+    def _estimate_wait(self, position: int) -> float:
+        return (position + 1) * self._avg_run_s / max(1, self.max_concurrent)
+
+
+def _decrement(counts: dict, name: Optional[str]) -> None:
+    if name is None:
+        return
+    counts[name] -= 1
+    if not counts[name]:
+        del counts[name]
+
+
+ADMISSION = AdmissionController(
+    max_concurrent=int(os.getenv("RESEARCH_MAX_CONCURRENT_RUNS", "8")),
+    max_queue=int(os.getenv("RESEARCH_MAX_QUEUED_RUNS", "64")),
+    per_user_limit=int(os.getenv("RESEARCH_MAX_RUNS_PER_USER", "2")),
+    per_tenant_limit=int(os.getenv("RESEARCH_MAX_RUNS_PER_TENANT", "4")),
+)
@@ -0,0 +1,44 @@
+"""API keys passed by the user with a run, kept per run instead of in the environment."""
+
+import contextvars
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+# ``configurable`` entries holding API keys entered by the user
+USER_API_KEYS = ("google_api_key", "tavily_api_key")
+
+_USER_API_KEYS: contextvars.ContextVar[dict] = contextvars.ContextVar(
+    "user_api_keys", default={}
+)
+
+
+def config_api_keys(config: Optional[RunnableConfig]) -> dict:
+    """Return the non-empty user API keys in ``config``'s ``configurable``."""
+    configurable = (config or {}).get("configurable") or {}
+    keys = {}
+    for name in USER_API_KEYS:
+        value = configurable.get(name)
+        if isinstance(value, str) and value.strip():
+            keys[name] = value.strip()
+    return keys
+
+
+@contextmanager
+def use_api_keys(config: Optional[RunnableConfig]) -> Iterator[None]:
+    """Make the user API keys of ``config`` visible to the clients created inside.
+
+    The keys live in a context variable, so they follow the run into the
+    worker threads of its calls but never leak into concurrent runs.
+    """
+    token = _USER_API_KEYS.set(config_api_keys(config))
+    try:
+        yield
+    finally:
+        _USER_API_KEYS.reset(token)
+
+
+def user_api_key(name: str) -> Optional[str]:
+    """Return the user API key ``name`` of the current run, if one was passed."""
+    return _USER_API_KEYS.get().get(name)
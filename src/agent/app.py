@@ -4,9 +4,11 @@
 import logging
 import pathlib
 
-import fastapi.exceptions
 from fastapi import FastAPI, Request, Response
-from fastapi.staticfiles import StaticFiles
+
+from agent.metrics import CONTENT_TYPE, REGISTRY
+from agent.research_api import router as research_router
+from agent.static_files import StaticIndex
 
 # Define the FastAPI app
 app = FastAPI()
@@ -17,6 +19,11 @@ logger = logging.getLogger(__name__)
 def create_frontend_router(build_dir="../frontend/dist"):
     """Create a router to serve the React frontend.
 
+    The build directory is indexed into memory once, so requests are served
+    without filesystem calls, precompressed and with ETag and cache headers.
+    Unknown paths fall back to ``index.html`` for client-side routing. ``HEAD``
+    and single byte-range requests are supported.
+
     Args:
         build_dir: Path to the React build directory relative to this file.
 
@@ -24,7 +31,6 @@ def create_frontend_router(build_dir="../frontend/dist"):
         A Starlette application serving the frontend.
     """
     build_path = pathlib.Path(__file__).parent.parent.parent / build_dir
-    static_files_path = build_path / "assets"  # Vite uses 'assets' subdir
 
     if not build_path.is_dir() or not (build_path / "index.html").is_file():
         logger.warning(
@@ -42,23 +48,33 @@ def create_frontend_router(build_dir="../frontend/dist"):
 
         return Route("/{path:path}", endpoint=dummy_frontend)
 
-    build_dir = pathlib.Path(build_dir)
+    index = StaticIndex(build_path)
+    index_html = index.lookup("index.html")
 
     react = FastAPI(openapi_url="")
-    react.mount(
-        "/assets", StaticFiles(directory=static_files_path), name="static_assets"
-    )
 
-    @react.get("/{path:path}")
+    @react.api_route("/{path:path}", methods=["GET", "HEAD"])
     async def handle_catch_all(request: Request, path: str):
-        fp = build_path / path
-        if not fp.exists() or not fp.is_file():
-            fp = build_path / "index.html"
-        return fastapi.responses.FileResponse(fp)
+        static_file = index.lookup(path)
+        if static_file is None:
+            # Missing hashed assets are real 404s, not client-side routes
+            if path.startswith("assets/"):
+                return Response("Not Found", media_type="text/plain", status_code=404)
+            static_file = index_html
+        return index.response(request, static_file)
 
     return react
 
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics() -> Response:
+    """Expose the service metrics in the Prometheus text format."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
+# Headless research endpoints for programmatic clients
+app.include_router(research_router)
+
 # Mount the frontend under /app to not conflict with the LangGraph API routes
 app.mount(
     "/app",
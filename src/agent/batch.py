@@ -0,0 +1,212 @@
+"""Batch research runner: answer a JSONL file of questions with shared searches.
+
+Each input line is a JSON object with a ``question`` and optionally an ``id``
+and per-question ``config`` overrides. Results are appended to the output
+JSONL file as each question finishes, which doubles as the checkpoint: a
+rerun skips every id that already has a succeeded record. Questions whose
+answer could not be generated or whose research found no sources are
+recorded as failed, so a rerun tries them again.
+
+Usage:
+    python -m agent.batch questions.jsonl results.jsonl --concurrency 4
+"""
+
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Optional
+
+from langchain_core.messages import HumanMessage
+
+from agent.configuration import Configuration
+from agent.graph import graph
+from agent.profiling import profile_run
+from agent.search_cache import get_search_cache
+from agent.usage import usage_totals
+from agent.utils import strip_thinking
+from components.logging_config import BATCH_LOGGER, log_error_with_context
+
+# Batch questions share searches for the whole job, not just within one run
+DEFAULT_SEARCH_CACHE_TTL_S = 6 * 3600.0
+
+
+def load_questions(path: Path) -> list[dict]:
+    """Read the questions of a batch, giving each line without an id its line number.
+
+    Raises:
+        ValueError: If a line is not a JSON object with a ``question`` or an id
+            appears twice.
+    """
+    questions = []
+    seen = set()
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            if not isinstance(item, dict) or not item.get("question"):
+                raise ValueError(f"{path}:{lineno}: expected an object with a question")
+            item["id"] = str(item.get("id", lineno))
+            if item["id"] in seen:
+                raise ValueError(f"{path}:{lineno}: duplicate id {item['id']}")
+            seen.add(item["id"])
+            questions.append(item)
+    return questions
+
+
+def load_completed(path: Path) -> set[str]:
+    """Return the ids that already have a succeeded record in the output file."""
+    completed = set()
+    if not path.exists():
+        return completed
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line of an interrupted run may be cut off
+                continue
+            if record.get("status") == "succeeded":
+                completed.add(str(record["id"]))
+    return completed
+
+
+def run_question(item: dict, config: dict) -> dict:
+    """Research one question and return its result record."""
+    started = time.monotonic()
+    configurable = {
+        **config,
+        **item.get("config", {}),
+        "thread_id": f"batch-{item['id']}",
+    }
+    record: dict[str, Any] = {"id": item["id"], "question": item["question"]}
+    try:
+        profiling = Configuration.from_runnable_config(
+            {"configurable": configurable}
+        ).profile_run
+        with profile_run(configurable["thread_id"], enabled=profiling):
+            result = graph.invoke(
+                {"messages": [HumanMessage(content=item["question"])]},
+                {"configurable": configurable},
+            )
+    except Exception as e:
+        log_error_with_context(BATCH_LOGGER, e, "batch_question", {"id": item["id"]})
+        record.update(status="failed", error=str(e))
+    else:
+        answer, _ = strip_thinking(result["messages"][-1].content)
+        sources = result.get("sources_gathered", [])
+        record.update(
+            status="succeeded",
+            answer=answer,
+            sources=[{"label": s.get("label"), "url": s.get("value")} for s in sources],
+            is_partial=bool(result.get("is_partial")),
+            token_usage=usage_totals(result.get("token_usage")),
+        )
+        # The graph answers even when it failed; such answers must be retried
+        error = result.get("answer_error") or (
+            None if sources else "The research found no sources"
+        )
+        if error:
+            BATCH_LOGGER.warning("📦 Question %s failed: %s", item["id"], error)
+            record.update(status="failed", error=error)
+    record["elapsed_s"] = round(time.monotonic() - started, 2)
+    return record
+
+
+def run_batch(
+    input_path: Path,
+    output_path: Path,
+    concurrency: int = 4,
+    config: Optional[dict] = None,
+) -> dict:
+    """Research every question of ``input_path`` not yet answered in ``output_path``.
+
+    Up to ``concurrency`` questions run at once. All of them share one search
+    cache, so a query that several questions need is searched once and
+    questions searching the same query at the same time wait for a single
+    request.
+
+    Args:
+        input_path: The JSONL file of questions.
+        output_path: The JSONL file results are appended to.
+        concurrency: The maximum number of questions researched in parallel.
+        config: Configurable overrides applied to every question.
+
+    Returns:
+        dict: Counts of the questions run, skipped and failed, plus search
+        cache statistics.
+    """
+    config = {
+        "share_search_cache": True,
+        "search_cache_ttl_s": DEFAULT_SEARCH_CACHE_TTL_S,
+        **(config or {}),
+    }
+    questions = load_questions(input_path)
+    completed = load_completed(output_path)
+    pending = [item for item in questions if item["id"] not in completed]
+    BATCH_LOGGER.info(
+        "📦 Batch of %s questions: %s already done, %s to run with concurrency %s",
+        len(questions),
+        len(completed),
+        len(pending),
+        concurrency,
+    )
+
+    counts = {"total": len(questions), "skipped": len(completed)}
+    counts.update(succeeded=0, failed=0)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with (
+        open(output_path, "a", encoding="utf-8") as out,
+        ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="batch"
+        ) as executor,
+    ):
+        futures = [executor.submit(run_question, item, config) for item in pending]
+        for future in as_completed(futures):
+            record = future.result()
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            counts[record["status"]] += 1
+            done = counts["succeeded"] + counts["failed"]
+            BATCH_LOGGER.info(
+                "📦 [%s/%s] %s %s in %ss",
+                done,
+                len(pending),
+                record["id"],
+                record["status"],
+                record["elapsed_s"],
+            )
+
+    configurable = Configuration(**config)
+    counts["search_cache"] = get_search_cache(
+        configurable.search_cache_ttl_s, configurable.search_cache_similarity
+    ).stats()
+    BATCH_LOGGER.info("📦 Batch finished: %s", counts)
+    return counts
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """Run the batch runner from the command line."""
+    parser = argparse.ArgumentParser(
+        prog="python -m agent.batch", description=__doc__.split("\n\n")[0]
+    )
+    parser.add_argument("input", type=Path, help="JSONL file of questions")
+    parser.add_argument("output", type=Path, help="JSONL file to append results to")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="questions researched at once"
+    )
+    parser.add_argument(
+        "--config",
+        type=json.loads,
+        default={},
+        help="JSON object of configurable overrides for every question",
+    )
+    args = parser.parse_args(argv)
+    counts = run_batch(args.input, args.output, args.concurrency, args.config)
+    return 1 if counts["failed"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,231 @@
+"""Timeouts, deadlines, retries and hedging for outbound LLM and search calls."""
+
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Optional, TypeVar
+
+from agent.circuit_breaker import CircuitOpenError, get_breaker
+from agent.configuration import CallPolicy
+from agent.profiling import attach_current
+from components.logging_config import API_LOGGER, span
+
+T = TypeVar("T")
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=64, thread_name_prefix="outbound-call")
+
+# Set inside attempts running on _EXECUTOR, so nested calls never wait on the pool
+_IN_ATTEMPT: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "in_call_attempt", default=False
+)
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the run deadline leaves no time for another attempt."""
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies per call name."""
+
+    def __init__(self, window: int = 200):
+        """Create a tracker keeping the last ``window`` samples per name."""
+        self._window = window
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque] = {}
+
+    def record(self, name: str, seconds: float) -> None:
+        """Add a latency sample for ``name``."""
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self._window)).append(seconds)
+
+    def quantile(self, name: str, q: float, min_samples: int = 1) -> Optional[float]:
+        """Return the ``q`` quantile latency of ``name``, or None without enough samples."""
+        with self._lock:
+            samples = sorted(self._samples.get(name, ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+LATENCY = LatencyTracker()
+
+
+def deadline_from_budget(budget_s: Optional[float]) -> Optional[float]:
+    """Turn a run budget in seconds into an absolute epoch deadline."""
+    return time.time() + budget_s if budget_s else None
+
+
+def remaining_time(deadline: Optional[float]) -> Optional[float]:
+    """Return the seconds left until ``deadline``, or None when there is no deadline."""
+    return None if deadline is None else deadline - time.time()
+
+
+def call_with_policy(
+    name: str,
+    fn: Callable[[], T],
+    policy: Optional[CallPolicy] = None,
+    deadline: Optional[float] = None,
+    provider: Optional[str] = None,
+) -> T:
+    """Call ``fn`` with a per-attempt timeout, jittered backoff and optional hedging.
+
+    Every attempt is bounded by ``policy.timeout_s`` and by the run ``deadline``.
+    Failed attempts are retried with full-jitter exponential backoff as long as
+    the deadline allows. With ``policy.hedge`` a duplicate request is fired once
+    an attempt has been running longer than the observed ``hedge_quantile``
+    latency of ``name``, and the first successful response wins. The call is
+    traced as a ``call.<name>`` span.
+
+    With a ``provider``, every attempt is admitted and recorded by that
+    provider's circuit breaker; an open circuit fails the call immediately
+    instead of retrying.
+
+    Attempts run on a shared thread pool. A call made from inside another
+    call's attempt runs its attempts inline instead, bounded by the outer
+    attempt, so nested calls cannot starve the pool. A timed-out attempt that
+    is still running cannot be stopped; it is kept in flight and the retry
+    waits on it along with its own request, so a late response is still used.
+
+    Args:
+        name: The call name used for latency tracking and logging.
+        fn: A zero-argument callable performing the outbound request.
+        policy: The call policy. Defaults to ``CallPolicy()``.
+        deadline: The absolute epoch time by which the call must finish.
+        provider: The provider name whose circuit breaker guards the call.
+
+    Returns:
+        The return value of ``fn``.
+
+    Raises:
+        CircuitOpenError: If the provider's circuit is open.
+        DeadlineExceeded: If the deadline passed before the call could succeed.
+        TimeoutError: If the last attempt timed out.
+    """
+    with span(f"call.{name}", provider=provider or name) as call_span:
+        policy = policy or CallPolicy()
+        breaker = get_breaker(provider) if provider else None
+        last_error: Optional[BaseException] = None
+        in_flight: list[Future] = []
+        for attempt in range(1, max(1, policy.max_attempts) + 1):
+            timeout = _attempt_timeout(policy, deadline)
+            if timeout is not None and timeout <= 0:
+                raise DeadlineExceeded(
+                    f"Deadline exceeded before {name} attempt {attempt}"
+                )
+            call_span.set(attempts=attempt)
+            if breaker is not None:
+                breaker.before_call()
+            start = time.monotonic()
+            try:
+                if _IN_ATTEMPT.get():
+                    result = fn()
+                else:
+                    result = _run_attempt(name, fn, policy, timeout, in_flight)
+            except CircuitOpenError:
+                # Raised by a nested provider; the attempt says nothing about this one
+                if breaker is not None:
+                    breaker.release()
+                raise
+            except Exception as e:
+                if breaker is not None:
+                    breaker.record(False, time.monotonic() - start)
+                last_error = e
+                if attempt >= policy.max_attempts:
+                    break
+                delay = random.uniform(
+                    0,
+                    min(
+                        policy.backoff_max_s, policy.backoff_base_s * 2 ** (attempt - 1)
+                    ),
+                )
+                left = remaining_time(deadline)
+                if left is not None and left <= delay:
+                    raise DeadlineExceeded(
+                        f"Deadline exceeded while retrying {name}"
+                    ) from e
+                API_LOGGER.warning(
+                    "🔁 %s attempt %s failed (%s: %s), retrying in %.2fs",
+                    name,
+                    attempt,
+                    type(e).__name__,
+                    e,
+                    delay,
+                )
+                time.sleep(delay)
+            else:
+                if breaker is not None:
+                    breaker.record(True, time.monotonic() - start)
+                return result
+        raise last_error
+
+
+def _attempt_timeout(policy: CallPolicy, deadline: Optional[float]) -> Optional[float]:
+    left = remaining_time(deadline)
+    if policy.timeout_s is None:
+        return left
+    if left is None:
+        return policy.timeout_s
+    return min(policy.timeout_s, left)
+
+
+def _in_attempt(name: str, fn: Callable[[], T]) -> T:
+    _IN_ATTEMPT.set(True)
+    # Sampled with the node that made the call when its run is profiled
+    with attach_current(f"call.{name}"):
+        return fn()
+
+
+def _submit(name: str, fn: Callable[[], T]) -> Future:
+    return _EXECUTOR.submit(contextvars.copy_context().run, _in_attempt, name, fn)
+
+
+def _run_attempt(
+    name: str,
+    fn: Callable[[], T],
+    policy: CallPolicy,
+    timeout: Optional[float],
+    in_flight: list,
+) -> T:
+    """Run one attempt of ``fn``, also waiting on earlier attempts still in flight.
+
+    Attempts still running when this one times out are left in ``in_flight``
+    for the next attempt; queued ones are cancelled.
+    """
+    start = time.monotonic()
+    futures = [*in_flight, _submit(name, fn)]
+    in_flight.clear()
+
+    hedge_after = (
+        LATENCY.quantile(name, policy.hedge_quantile, policy.hedge_min_samples)
+        if policy.hedge
+        else None
+    )
+    if hedge_after is not None and (timeout is None or hedge_after < timeout):
+        done, _ = wait(futures, timeout=hedge_after)
+        if not done:
+            API_LOGGER.info("🪞 Hedging %s after %.2fs", name, hedge_after)
+            futures.append(_submit(name, fn))
+
+    pending = set(futures)
+    error: Optional[BaseException] = None
+    try:
+        while pending:
+            left = None if timeout is None else timeout - (time.monotonic() - start)
+            if left is not None and left <= 0:
+                break
+            done, pending = wait(pending, timeout=left, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    LATENCY.record(name, time.monotonic() - start)
+                    return future.result()
+                error = future.exception()
+    finally:
+        # Running attempts cannot be cancelled; the next attempt adopts them
+        in_flight.extend(future for future in pending if not future.cancel())
+
+    if error is not None and not pending:
+        raise error
+    raise TimeoutError(f"{name} timed out after {timeout:.1f}s")
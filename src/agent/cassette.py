@@ -0,0 +1,405 @@
+"""Record/replay cassettes for the outbound LLM and search calls of research runs."""
+
+import atexit
+import functools
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    message_chunk_to_message,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.runnables import RunnableConfig
+
+from agent.configuration import Configuration
+from agent.prompts import get_current_date
+from components.logging_config import API_LOGGER
+
+CASSETTE_MODES = ("record", "replay")
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode for a request the cassette has no response for."""
+
+
+def _request_key(kind: str, request: Any) -> str:
+    text = json.dumps([kind, request], sort_keys=True, default=repr)
+    # Prompts embed today's date; a cassette must still match on a later day
+    text = text.replace(get_current_date(), "<current date>")
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def _json_default(value: Any) -> Any:
+    """Encode values JSON has no type for; errors keep their type and message."""
+    if isinstance(value, BaseException):
+        return {"error_type": type(value).__name__, "message": str(value)}
+    return repr(value)
+
+
+def _open(path: Path, mode: str):
+    if path.suffix == ".gz":
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """A JSON-lines file of recorded call responses keyed by request.
+
+    Each line holds the call kind, a hash of the normalized request, the
+    response and the call's latency. In ``record`` mode every successful call
+    is appended as soon as it returns. In ``replay`` mode calls are answered
+    from the file in recorded order per request, with no network access;
+    ``realtime`` replays wait for the recorded latency, otherwise responses
+    come back immediately. Paths ending in ``.gz`` are gzip-compressed.
+    """
+
+    def __init__(self, path: Path, mode: str, realtime: bool = False):
+        """Open the cassette at ``path`` for recording or replaying."""
+        if mode not in CASSETTE_MODES:
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.realtime = realtime
+        self.recorded = 0
+        self.replayed = 0
+        self._lock = threading.Lock()
+        self._entries: dict[str, deque] = {}
+        self._file = None
+        if self.replaying:
+            with _open(path, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries.setdefault(entry["key"], deque()).append(entry)
+            API_LOGGER.info(
+                "📼 Replaying %s recorded calls from %s",
+                sum(len(entries) for entries in self._entries.values()),
+                path,
+            )
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = _open(path, "a")
+
+    @property
+    def replaying(self) -> bool:
+        """Whether responses are served from the cassette."""
+        return self.mode == "replay"
+
+    def record(
+        self, kind: str, request: Any, response: Any, latency_s: float, **extra: Any
+    ) -> None:
+        """Append a call and its response to the cassette."""
+        entry = {
+            "kind": kind,
+            "key": _request_key(kind, request),
+            "latency_s": round(latency_s, 4),
+            "response": response,
+            **extra,
+        }
+        # Tools return some failures as results, e.g. Tavily's {"error": exception}
+        line = json.dumps(
+            entry, ensure_ascii=False, separators=(",", ":"), default=_json_default
+        )
+        with self._lock:
+            # Flushed per call so a crashed run still leaves a usable cassette
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def close(self) -> None:
+        """Close the file of a recording cassette."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def replay(self, kind: str, request: Any) -> dict:
+        """Return the next recorded entry for ``request``.
+
+        Repeated requests get their recorded responses in order; once only
+        one is left it is served for every further repeat.
+
+        Raises:
+            CassetteMiss: If no recorded response is left for the request.
+        """
+        key = _request_key(kind, request)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise CassetteMiss(f"No recorded {kind} response for request {key}")
+            entry = entries[0] if len(entries) == 1 else entries.popleft()
+            self.replayed += 1
+        return entry
+
+    def call(
+        self,
+        kind: str,
+        request: Any,
+        fn: Callable[[], Any],
+        encode: Callable[[Any], Any] = lambda response: response,
+        decode: Callable[[Any], Any] = lambda data: data,
+    ) -> Any:
+        """Record ``fn()`` or replay its response for ``request``."""
+        if self.replaying:
+            entry = self.replay(kind, request)
+            if self.realtime:
+                time.sleep(entry["latency_s"])
+            return decode(entry["response"])
+        start = time.monotonic()
+        response = fn()
+        self.record(kind, request, encode(response), time.monotonic() - start)
+        return response
+
+
+_CASSETTES: dict[tuple, Cassette] = {}
+_CASSETTES_LOCK = threading.Lock()
+
+
+def get_cassette(path: str, mode: str, realtime: bool = False) -> Cassette:
+    """Return the process-wide cassette for ``path`` in the given mode.
+
+    Parallel branches and all nodes of a run share one instance, so recorded
+    lines never interleave and every replayed response is served once.
+    """
+    key = (str(Path(path).resolve()), mode, realtime)
+    with _CASSETTES_LOCK:
+        if key not in _CASSETTES:
+            _CASSETTES[key] = Cassette(Path(path), mode, realtime)
+        return _CASSETTES[key]
+
+
+@atexit.register
+def _close_cassettes() -> None:
+    with _CASSETTES_LOCK:
+        for cassette in _CASSETTES.values():
+            cassette.close()
+
+
+_CASSETTE: ContextVar[Optional[Cassette]] = ContextVar("cassette", default=None)
+
+
+def cassette_for(config: RunnableConfig) -> Optional[Cassette]:
+    """Return the cassette selected by ``cassette_mode``/``cassette_path``, if any."""
+    configurable = Configuration.from_runnable_config(config)
+    if not configurable.cassette_mode:
+        return None
+    return get_cassette(
+        configurable.cassette_path,
+        configurable.cassette_mode,
+        configurable.cassette_realtime,
+    )
+
+
+@contextmanager
+def use_cassette(cassette: Optional[Cassette]) -> Iterator[Optional[Cassette]]:
+    """Record or replay the calls made inside the ``with`` block with ``cassette``."""
+    token = _CASSETTE.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _CASSETTE.reset(token)
+
+
+def active_cassette() -> Optional[Cassette]:
+    """Return the cassette of the current context, if any."""
+    return _CASSETTE.get()
+
+
+def recorded(
+    kind: str,
+    request: Any,
+    fn: Callable[[], Any],
+    encode: Callable[[Any], Any] = lambda response: response,
+    decode: Callable[[Any], Any] = lambda data: data,
+) -> Any:
+    """Call ``fn()`` through the active cassette, or directly when there is none.
+
+    ``request`` must identify the call (it is hashed into the lookup key) and
+    ``encode``/``decode`` convert the response to and from JSON.
+    """
+    cassette = _CASSETTE.get()
+    if cassette is None:
+        return fn()
+    return cassette.call(kind, request, fn, encode, decode)
+
+
+def _llm_request(messages: list, stop: Optional[list], kwargs: dict) -> dict:
+    history = []
+    for message in messages:
+        data = message_to_dict(message)
+        # Message ids are generated per run and say nothing about the request
+        data["data"].pop("id", None)
+        history.append(data)
+    return {"messages": history, "stop": stop, "kwargs": kwargs}
+
+
+def _encode_message(message: AIMessage) -> dict:
+    return message_to_dict(message)
+
+
+def _decode_message(data: dict) -> AIMessage:
+    return messages_from_dict([data])[0]
+
+
+def _replay_chunks(message: AIMessage, sizes: list) -> Iterator[AIMessageChunk]:
+    """Split a recorded message back into chunks of the recorded sizes."""
+    content = message.content
+    if not isinstance(content, str) or not sizes:
+        pieces = [content]
+    else:
+        pieces, offset = [], 0
+        for size in sizes:
+            pieces.append(content[offset : offset + size])
+            offset += size
+    for idx, piece in enumerate(pieces):
+        if idx:
+            yield AIMessageChunk(content=piece)
+            continue
+        # The first chunk carries everything but the remaining content
+        yield AIMessageChunk(
+            content=piece,
+            additional_kwargs=message.additional_kwargs,
+            response_metadata=message.response_metadata,
+            usage_metadata=message.usage_metadata,
+            tool_call_chunks=[
+                {
+                    "name": call["name"],
+                    "args": json.dumps(call["args"]),
+                    "id": call["id"],
+                    "index": index,
+                }
+                for index, call in enumerate(message.tool_calls)
+            ],
+        )
+
+
+# Set while a recording _stream pulls the next chunk from the wrapped model
+_NESTED = threading.local()
+
+
+class _RecordingChatModel:
+    """Mixin routing a chat model's generations through the active cassette.
+
+    Sits at ``_generate``/``_stream``, below ``bind_tools`` and
+    ``with_structured_output``, so the request key includes the bound tools
+    and response format and every calling pattern is recorded unchanged.
+    """
+
+    def _generate(
+        self,
+        messages: list,
+        stop: Optional[list] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        cassette = _CASSETTE.get()
+        if cassette is None or getattr(_NESTED, "active", False):
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        request = _llm_request(messages, stop, kwargs)
+        if cassette.replaying:
+            entry = cassette.replay("llm", request)
+            if cassette.realtime:
+                time.sleep(entry["latency_s"])
+            message = _decode_message(entry["response"])
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        start = time.monotonic()
+        result = super()._generate(messages, stop, run_manager, **kwargs)
+        cassette.record(
+            "llm",
+            request,
+            _encode_message(result.generations[0].message),
+            time.monotonic() - start,
+        )
+        return result
+
+    def _stream(
+        self,
+        messages: list,
+        stop: Optional[list] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        cassette = _CASSETTE.get()
+        if cassette is None:
+            yield from super()._stream(messages, stop, run_manager, **kwargs)
+            return
+        request = _llm_request(messages, stop, kwargs)
+        if cassette.replaying:
+            entry = cassette.replay("llm", request)
+            sizes = entry.get("chunks") or []
+            delay = entry["latency_s"] / max(1, len(sizes)) if cassette.realtime else 0
+            message = _decode_message(entry["response"])
+            for chunk in _replay_chunks(message, sizes):
+                if delay:
+                    time.sleep(delay)
+                yield ChatGenerationChunk(message=chunk)
+            return
+        start = time.monotonic()
+        chunks = []
+        stream = super()._stream(messages, stop, run_manager, **kwargs)
+        while True:
+            # Models that stream through their own _generate are recorded once
+            _NESTED.active = True
+            try:
+                chunk = next(stream, None)
+            finally:
+                _NESTED.active = False
+            if chunk is None:
+                break
+            chunks.append(chunk)
+            yield chunk
+        if not chunks:
+            return
+        message = chunks[0].message
+        for chunk in chunks[1:]:
+            message = message + chunk.message
+        cassette.record(
+            "llm",
+            request,
+            _encode_message(message_chunk_to_message(message)),
+            time.monotonic() - start,
+            chunks=[
+                len(chunk.message.content)
+                for chunk in chunks
+                if isinstance(chunk.message.content, str)
+            ],
+        )
+
+    async def _agenerate(self, *args: Any, **kwargs: Any) -> ChatResult:
+        if _CASSETTE.get() is None:
+            return await super()._agenerate(*args, **kwargs)
+        # The default implementation runs _generate in an executor
+        return await BaseChatModel._agenerate(self, *args, **kwargs)
+
+    async def _astream(self, *args: Any, **kwargs: Any):
+        if _CASSETTE.get() is None:
+            stream = super()._astream(*args, **kwargs)
+        else:
+            stream = BaseChatModel._astream(self, *args, **kwargs)
+        async for chunk in stream:
+            yield chunk
+
+
+@functools.cache
+def recording_model(model_cls: type) -> type:
+    """Return a subclass of the chat model class ``model_cls`` that uses cassettes."""
+    namespace = {}
+    if model_cls._stream is BaseChatModel._stream:
+        # Models without native streaming must keep generating in one piece
+        namespace["_stream"] = BaseChatModel._stream
+    return type(
+        f"Recording{model_cls.__name__}", (_RecordingChatModel, model_cls), namespace
+    )
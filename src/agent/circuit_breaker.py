@@ -0,0 +1,143 @@
+"""Health-tracking circuit breakers for LLM and search providers."""
+
+import threading
+import time
+from collections import deque
+from typing import Optional
+
+from components.logging_config import API_LOGGER
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is refused because the provider's circuit is open."""
+
+
+class CircuitBreaker:
+    """Rolling error-rate and latency breaker for a single provider.
+
+    The breaker opens when, within the last ``window_s`` seconds and at least
+    ``min_calls`` calls, the share of failed or slow calls reaches
+    ``failure_rate_threshold``. While open, calls fail immediately. After
+    ``open_s`` seconds the breaker lets ``half_open_max_calls`` probe calls
+    through; a successful probe closes it again, a failed one reopens it.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        window_s: float = 60.0,
+        min_calls: int = 5,
+        failure_rate_threshold: float = 0.5,
+        slow_call_s: float = 60.0,
+        open_s: float = 30.0,
+        half_open_max_calls: int = 1,
+    ):
+        """Create a closed breaker for the provider ``name``."""
+        self.name = name
+        self.window_s = window_s
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_s = slow_call_s
+        self.open_s = open_s
+        self.half_open_max_calls = half_open_max_calls
+        self._lock = threading.Lock()
+        self._calls: deque = deque()  # (timestamp, failed)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        """Return the current state, moving from open to half-open when due."""
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def is_open(self) -> bool:
+        """Return True when calls to the provider are currently refused."""
+        return self.state == OPEN
+
+    def before_call(self) -> None:
+        """Admit a call or raise ``CircuitOpenError`` if the provider is unavailable."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == OPEN:
+                raise CircuitOpenError(f"Circuit for {self.name} is open")
+            if self._state == HALF_OPEN:
+                if self._probes >= self.half_open_max_calls:
+                    raise CircuitOpenError(f"Circuit for {self.name} is probing")
+                self._probes += 1
+
+    def record(self, success: bool, latency_s: float) -> None:
+        """Record the outcome of an admitted call."""
+        failed = not success or latency_s >= self.slow_call_s
+        now = time.monotonic()
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                if failed:
+                    self._open(now)
+                else:
+                    self._state = CLOSED
+                    self._calls.clear()
+                    API_LOGGER.info("🟢 Circuit for %s closed", self.name)
+                return
+
+            self._calls.append((now, failed))
+            while self._calls and self._calls[0][0] < now - self.window_s:
+                self._calls.popleft()
+            if self._state == CLOSED and len(self._calls) >= self.min_calls:
+                failures = sum(1 for _, call_failed in self._calls if call_failed)
+                if failures / len(self._calls) >= self.failure_rate_threshold:
+                    self._open(now)
+
+    def release(self) -> None:
+        """Give back an admitted call without recording an outcome."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+
+    def _open(self, now: float) -> None:
+        self._state = OPEN
+        self._opened_at = now
+        self._probes = 0
+        API_LOGGER.warning("🔴 Circuit for %s opened", self.name)
+
+    def _maybe_half_open(self) -> None:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_s:
+            self._state = HALF_OPEN
+            self._probes = 0
+
+
+_BREAKERS: dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide circuit breaker for a provider name."""
+    with _BREAKERS_LOCK:
+        if name not in _BREAKERS:
+            _BREAKERS[name] = CircuitBreaker(name)
+        return _BREAKERS[name]
+
+
+def failover_order(
+    primary: str, alternate: Optional[str], breaker: Optional[str] = None
+) -> list[str]:
+    """Return the providers to try, skipping a primary whose circuit is open.
+
+    An open primary is moved behind the alternate rather than dropped, so a
+    run still gets an answer attempt when both circuits are open. ``breaker``
+    names the primary's circuit when calls record it under another name than
+    the provider, e.g. per endpoint.
+    """
+    if not alternate or alternate == primary:
+        return [primary]
+    primary_open = get_breaker(breaker or primary).is_open()
+    if primary_open and not get_breaker(alternate).is_open():
+        return [alternate, primary]
+    return [primary, alternate]
@@ -1,10 +1,97 @@
 """Configuration module for the agent."""
 
+import json
 import os
 from typing import Any, Optional
 
 from langchain_core.runnables import RunnableConfig
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
+
+
+class ModelProfile(BaseModel):
+    """Model settings for a single graph node.
+
+    Unset fields fall back to the global ``model_type`` and the ``MODEL_*`` /
+    ``GEMINI_*`` environment variables, so an empty profile behaves exactly like
+    the default model.
+    """
+
+    model_type: Optional[str] = Field(
+        default=None,
+        metadata={
+            "description": "The type of model to use for this node: 'vllm', 'gemini' or 'fake'."
+        },
+    )
+    model_name: Optional[str] = Field(
+        default=None,
+        metadata={"description": "The model name served by the endpoint."},
+    )
+    api_base: Optional[str] = Field(
+        default=None,
+        metadata={"description": "The OpenAI-compatible endpoint URL (vllm only)."},
+    )
+    api_key_env: Optional[str] = Field(
+        default=None,
+        metadata={
+            "description": "The environment variable holding the API key for this endpoint."
+        },
+    )
+    temperature: Optional[float] = Field(
+        default=None,
+        metadata={"description": "The sampling temperature for this node."},
+    )
+    reasoning: Optional[bool] = Field(
+        default=None,
+        metadata={
+            "description": "Whether the model should reason before answering. None keeps the model default."
+        },
+    )
+    thinking_budget: Optional[int] = Field(
+        default=None,
+        metadata={
+            "description": "Maximum number of reasoning tokens when reasoning is enabled."
+        },
+    )
+
+
+class CallPolicy(BaseModel):
+    """Timeout, retry and hedging settings for one kind of outbound call."""
+
+    timeout_s: Optional[float] = Field(
+        default=120.0,
+        metadata={"description": "Seconds to wait for a single attempt."},
+    )
+    max_attempts: int = Field(
+        default=3,
+        metadata={
+            "description": "The maximum number of attempts, including the first."
+        },
+    )
+    backoff_base_s: float = Field(
+        default=0.5,
+        metadata={"description": "The base delay of the exponential backoff."},
+    )
+    backoff_max_s: float = Field(
+        default=8.0,
+        metadata={"description": "The maximum delay between two attempts."},
+    )
+    hedge: bool = Field(
+        default=False,
+        metadata={
+            "description": "Send a duplicate request when an attempt is slower than "
+            "the observed hedge_quantile latency and take the first response."
+        },
+    )
+    hedge_quantile: float = Field(
+        default=0.95,
+        metadata={"description": "The latency quantile after which a call is hedged."},
+    )
+    hedge_min_samples: int = Field(
+        default=20,
+        metadata={
+            "description": "The number of observed latencies needed before hedging."
+        },
+    )
 
 
 class Configuration(BaseModel):
@@ -23,14 +110,295 @@ class Configuration(BaseModel):
     search_type: str = Field(
         default="tavily",
         metadata={
-            "description": "The search engine type to use: 'tavily' or 'google'."
+            "description": "The search engine type to use: 'tavily', 'google', 'local' "
+            "or 'fake'."
         },
     )
     model_type: str = Field(
         default="vllm",
-        metadata={"description": "The type of model to use: 'vllm' or 'gemini'."},
+        metadata={
+            "description": "The type of model to use: 'vllm', 'gemini' or 'fake'."
+        },
+    )
+
+    node_models: dict[str, ModelProfile] = Field(
+        default_factory=dict,
+        metadata={
+            "description": "Per-node model profiles keyed by node name "
+            "('generate_query', 'web_research', 'reflection', 'finalize_answer')."
+        },
+    )
+
+    stream_query_generation: bool = Field(
+        default=False,
+        metadata={
+            "description": "Stream the query generation output and start each "
+            "search as soon as its query has been decoded."
+        },
+    )
+
+    min_marginal_gain: float = Field(
+        default=0.0,
+        metadata={
+            "description": "Stop researching when a follow-up loop's marginal gain "
+            "(share of new source URLs and novel summary n-grams) falls below this "
+            "value. 0 disables the check."
+        },
+    )
+
+    gain_ngram_size: int = Field(
+        default=3,
+        metadata={
+            "description": "The n-gram length used to measure novel summary content."
+        },
+    )
+
+    pipelined_reflection: bool = Field(
+        default=False,
+        metadata={
+            "description": "Start reflection once a quorum of search branches has "
+            "finished instead of waiting for all of them."
+        },
+    )
+
+    reflection_quorum: float = Field(
+        default=0.67,
+        metadata={
+            "description": "The fraction of search branches that must finish before "
+            "reflection starts in pipelined mode."
+        },
+    )
+
+    reflection_deadline_s: float = Field(
+        default=30.0,
+        metadata={
+            "description": "Seconds to wait for the quorum before reflecting on the "
+            "branches finished so far in pipelined mode."
+        },
+    )
+
+    speculative_prefetch: bool = Field(
+        default=False,
+        metadata={
+            "description": "Stream reflection and prefetch Tavily results for each "
+            "follow-up query as soon as it is decoded. Results go to a short-lived "
+            "search cache that web_research consults first."
+        },
+    )
+
+    speculative_max_prefetches: int = Field(
+        default=3,
+        metadata={
+            "description": "The maximum number of searches prefetched per reflection."
+        },
+    )
+
+    share_search_cache: bool = Field(
+        default=False,
+        metadata={
+            "description": "Share Tavily results between runs through the search "
+            "cache, so identical or near-duplicate queries from different questions "
+            "are searched once. Only runs with the same memory_scope and Tavily "
+            "key share results. Used by the batch runner."
+        },
+    )
+
+    search_cache_ttl_s: float = Field(
+        default=120.0,
+        metadata={"description": "Seconds a cached search result stays usable."},
+    )
+
+    search_cache_similarity: float = Field(
+        default=0.8,
+        metadata={
+            "description": "The word-set Jaccard similarity at which a cached query "
+            "answers a different but near-duplicate query."
+        },
+    )
+
+    llm_failover_model_type: Optional[str] = Field(
+        default=None,
+        metadata={
+            "description": "The model type to fail over to when the node's model "
+            "fails or its circuit is open: 'vllm' or 'gemini'."
+        },
+    )
+
+    search_failover_type: Optional[str] = Field(
+        default=None,
+        metadata={
+            "description": "The search type to fail over to when the configured "
+            "search fails or its circuit is open: 'tavily' or 'google'."
+        },
+    )
+
+    run_budget_s: Optional[float] = Field(
+        default=None,
+        metadata={
+            "description": "The wall-clock budget of a research run in seconds. "
+            "Outbound calls never wait past the resulting deadline."
+        },
+    )
+
+    finalize_reserve_s: float = Field(
+        default=15.0,
+        metadata={
+            "description": "Seconds of the run budget kept free for finalize_answer. "
+            "Research stops once only this much time is left and the answer is "
+            "marked partial."
+        },
+    )
+
+    profile_run: bool = Field(
+        default=False,
+        metadata={
+            "description": "Profile the run with a sampling profiler and write a "
+            "flame graph (folded stacks) plus wall vs CPU time per node to "
+            "PROFILE_DIR."
+        },
+    )
+
+    cassette_mode: Optional[str] = Field(
+        default=None,
+        metadata={
+            "description": "'record' to write every LLM and search call of the run "
+            "to cassette_path, 'replay' to answer them from it without network."
+        },
     )
 
+    cassette_path: str = Field(
+        default="cassettes/run.jsonl.gz",
+        metadata={"description": "The cassette file; a .gz suffix compresses it."},
+    )
+
+    cassette_realtime: bool = Field(
+        default=False,
+        metadata={
+            "description": "Replay calls at their recorded latency instead of "
+            "returning immediately."
+        },
+    )
+
+    local_index_path: str = Field(
+        default="index/local",
+        metadata={
+            "description": "The index directory searched by the 'local' search "
+            "type, built with scripts/local_index.py index."
+        },
+    )
+
+    local_search_results: int = Field(
+        default=5,
+        metadata={"description": "The number of results per local search."},
+    )
+
+    research_memory: bool = Field(
+        default=False,
+        metadata={
+            "description": "Remember every web research summary across sessions and "
+            "answer near-duplicate queries from it instead of searching again."
+        },
+    )
+
+    memory_path: str = Field(
+        default="memory/research.sqlite",
+        metadata={"description": "The SQLite database of the research memory."},
+    )
+
+    memory_max_age_s: float = Field(
+        default=7 * 24 * 3600.0,
+        metadata={
+            "description": "Seconds a remembered summary stays usable for queries "
+            "that match no memory_freshness pattern."
+        },
+    )
+
+    memory_freshness: dict[str, float] = Field(
+        default_factory=lambda: {
+            r"\b(today|latest|current|now|news|price|prices|stock|weather)\b": 6
+            * 3600.0
+        },
+        metadata={
+            "description": "Maximum ages in seconds keyed by a regular expression; "
+            "the first pattern found in a query sets how old its remembered "
+            "summary may be."
+        },
+    )
+
+    memory_scope: str = Field(
+        default="",
+        metadata={
+            "description": "Runs only reuse research remembered under the same "
+            "scope. The research API sets it to the request's tenant; runs "
+            "without one share the empty scope."
+        },
+    )
+
+    memory_similarity: float = Field(
+        default=0.7,
+        metadata={
+            "description": "The word-set Jaccard similarity at which a remembered "
+            "query answers a new one."
+        },
+    )
+
+    fake_seed: int = Field(
+        default=0,
+        metadata={
+            "description": "The seed of the fake model and search; the same seed "
+            "and question always produce the same run."
+        },
+    )
+
+    fake_llm_latency_ms: float = Field(
+        default=0.0,
+        metadata={"description": "Milliseconds every fake model call takes."},
+    )
+
+    fake_search_latency_ms: float = Field(
+        default=0.0,
+        metadata={"description": "Milliseconds every fake search takes."},
+    )
+
+    fake_search_results: int = Field(
+        default=5,
+        metadata={"description": "The number of results per fake search."},
+    )
+
+    fake_result_chars: int = Field(
+        default=500,
+        metadata={"description": "The content length of each fake search result."},
+    )
+
+    call_policies: dict[str, CallPolicy] = Field(
+        default_factory=dict,
+        metadata={
+            "description": "Per-call policies keyed by call name ('generate_query', "
+            "'web_research', 'reflection', 'finalize_answer', 'tavily', "
+            "'google_search', 'local_search', 'fake_search'). Unlisted calls use the default policy."
+        },
+    )
+
+    @field_validator("node_models", "call_policies", "memory_freshness", mode="before")
+    @classmethod
+    def _parse_json_mapping(cls, value: Any) -> Any:
+        """Accept JSON strings so mappings can be set from environment variables."""
+        if isinstance(value, str):
+            return json.loads(value) if value.strip() else {}
+        return value
+
+    def get_model_profile(self, node: str) -> ModelProfile:
+        """Return the model profile for a node, or an empty profile if none is set."""
+        return self.node_models.get(node) or ModelProfile()
+
+    def get_call_policy(self, name: str) -> CallPolicy:
+        """Return the call policy for a call name, or the default policy."""
+        return self.call_policies.get(name) or CallPolicy()
+
+    def model_type_for(self, node: str) -> str:
+        """Return the model type a node resolves to after applying its profile."""
+        return self.get_model_profile(node).model_type or self.model_type
+
     @classmethod
     def from_runnable_config(
         cls, config: Optional[RunnableConfig] = None
@@ -0,0 +1,417 @@
+"""Deterministic offline stand-ins for the LLM and search providers.
+
+``model_type="fake"`` and ``search_type="fake"`` run the whole graph without
+API keys, network or GPU. Responses are derived from a seed and the request,
+so the same run always produces the same queries, searches and answer, which
+makes fake runs usable for load tests, profiling and regression benchmarks.
+"""
+
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, Iterator, Optional, Sequence
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import BaseTool, StructuredTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from agent.call_policy import call_with_policy, remaining_time
+from agent.configuration import CallPolicy
+from agent.prompts import (
+    answer_instructions,
+    get_current_date,
+    query_writer_instructions,
+    reflection_instructions,
+    web_searcher_instructions,
+)
+from agent.tools_and_schemas import Reflection, SearchQueryList, TavilyQuery
+from agent.usage import record_search_call
+
+# Schemas answered as JSON text when a prompt names all of their fields
+JSON_SCHEMAS = (SearchQueryList, Reflection)
+# Name of the fake search tool, recognized by get_sources
+FAKE_SEARCH_TOOL_NAME = "fake_search"
+
+# Words used when a request has too few of its own
+_FALLBACK_WORDS = (
+    "analysis data report market growth policy research study trend result "
+    "impact model source survey evidence review change system value"
+).split()
+# Prompts end with the question and context, so that is where words are taken
+_VOCABULARY_CHARS = 2000
+_WORD = re.compile(r"[^\W\d_]{3,}")
+# Instruction words would drown out the words of the question
+_TEMPLATE_WORDS = frozenset(
+    _WORD.findall(
+        " ".join(
+            (
+                query_writer_instructions,
+                web_searcher_instructions,
+                reflection_instructions,
+                answer_instructions,
+            )
+        ).lower()
+    )
+)
+_MARKDOWN_LINK = re.compile(r"\[[^\]\n]+\]\([^)\s]+\)")
+
+
+def _rng(seed: int, *parts: Any) -> random.Random:
+    """Return a generator seeded by ``seed`` and the request ``parts``."""
+    text = json.dumps(parts, sort_keys=True, default=str)
+    # Prompts embed today's date; fake responses must not change with it
+    text = text.replace(get_current_date(), "<current date>")
+    digest = hashlib.sha256(f"{seed}:{text}".encode()).hexdigest()
+    return random.Random(digest)
+
+
+def _vocabulary(text: str) -> list[str]:
+    text = text.replace(get_current_date(), "")
+    words = _WORD.findall(text[-_VOCABULARY_CHARS:].lower())
+    if len(text) > _VOCABULARY_CHARS:
+        # The first word may have been cut in half
+        words = words[1:]
+    # dict.fromkeys keeps the first-seen order, so the vocabulary is deterministic
+    words = list(dict.fromkeys(w for w in words if w not in _TEMPLATE_WORDS))
+    return words if len(words) >= 3 else words + _FALLBACK_WORDS
+
+
+def _phrase(rng: random.Random, words: Sequence[str], low: int, high: int) -> str:
+    return " ".join(rng.choice(words) for _ in range(rng.randint(low, high)))
+
+
+def _sentence(rng: random.Random, words: Sequence[str]) -> str:
+    text = _phrase(rng, words, 8, 16)
+    return text[:1].upper() + text[1:]
+
+
+def _count_tokens(text: str) -> int:
+    # Roughly four characters per token, like most BPE vocabularies on English
+    return max(1, len(text) // 4)
+
+
+def fake_value(
+    schema: dict,
+    rng: random.Random,
+    words: Sequence[str],
+    definitions: Optional[dict] = None,
+) -> Any:
+    """Generate a value that validates against the JSON ``schema``.
+
+    Supports the subset of JSON Schema that pydantic models and LangChain tool
+    schemas produce: objects, arrays, scalars, enums, ``anyOf`` and ``$ref``.
+    Strings are built from ``words``; arrays get one to three items unless the
+    schema asks for other bounds.
+    """
+    definitions = {**(definitions or {}), **schema.get("$defs", {})}
+    if "$ref" in schema:
+        return fake_value(
+            definitions[schema["$ref"].rsplit("/", 1)[-1]], rng, words, definitions
+        )
+    options = schema.get("anyOf") or schema.get("oneOf")
+    if options:
+        # Prefer a real value over null for optional fields
+        options = [o for o in options if o.get("type") != "null"] or options
+        return fake_value(options[0], rng, words, definitions)
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    if "const" in schema:
+        return schema["const"]
+    kind = schema.get("type", "object" if "properties" in schema else "string")
+    if isinstance(kind, list):
+        kind = next((k for k in kind if k != "null"), "null")
+    if kind == "object":
+        return {
+            name: fake_value(field, rng, words, definitions)
+            for name, field in schema.get("properties", {}).items()
+            if name in schema.get("required", ()) or rng.random() < 0.5
+        }
+    if kind == "array":
+        low = schema.get("minItems", 1)
+        high = schema.get("maxItems", max(low, 3))
+        return [
+            fake_value(schema.get("items", {}), rng, words, definitions)
+            for _ in range(rng.randint(low, high))
+        ]
+    if kind == "boolean":
+        return rng.random() < 0.5
+    if kind == "integer":
+        return rng.randint(schema.get("minimum", 0), schema.get("maximum", 10))
+    if kind == "number":
+        low = schema.get("minimum", 0.0)
+        return round(rng.uniform(low, schema.get("maximum", low + 1.0)), 3)
+    if kind == "null":
+        return None
+    return _phrase(rng, words, 3, 8)
+
+
+def _tool_choice_name(tool_choice: Any) -> Optional[str]:
+    if isinstance(tool_choice, dict):
+        return (tool_choice.get("function") or {}).get("name")
+    if isinstance(tool_choice, str) and tool_choice not in ("any", "auto", "required"):
+        return tool_choice
+    return None
+
+
+def _search_results(message: BaseMessage) -> list:
+    if not isinstance(message, ToolMessage):
+        return []
+    try:
+        return json.loads(message.content).get("results") or []
+    except (json.JSONDecodeError, AttributeError, TypeError):
+        return []
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers every request with seeded synthetic output.
+
+    The response is a pure function of ``seed`` and the request:
+      * Structured output and forced tool calls get arguments generated from
+        the tool's JSON schema, so they always validate.
+      * With tools bound, the model calls the first tool until it has seen a
+        tool result, then answers, which makes ReAct agents search once.
+      * Prompts that ask for a JSON object naming all fields of one of
+        ``JSON_SCHEMAS`` are answered with such an object as text.
+      * Other prompts get prose built from the words at the end of the prompt.
+        Search results are cited as ``[0]``, ``[1]``... and Markdown citation
+        links in the prompt are carried over, like a real summary would.
+
+    Every call waits ``latency_s``, spread over the chunks when streaming, and
+    reports estimated token usage.
+    """
+
+    seed: int = 0
+    latency_s: float = 0.0
+    temperature: float = 0.0
+    model_name: str = "fake"
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    @property
+    def _identifying_params(self) -> dict:
+        return {"model_name": self.model_name, "seed": self.seed}
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Any = None, **kwargs):
+        """Bind tools the model can call, like the OpenAI-compatible chat models."""
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs
+        )
+
+    def _respond(self, messages: list[BaseMessage], kwargs: dict) -> AIMessage:
+        tools = kwargs.get("tools") or []
+        tool_choice = kwargs.get("tool_choice")
+        rng = _rng(
+            self.seed,
+            [(m.type, m.content, getattr(m, "tool_calls", None)) for m in messages],
+            tools,
+            tool_choice,
+        )
+        last = messages[-1] if messages else AIMessage(content="")
+        prompt = last.content if isinstance(last.content, str) else str(last.content)
+        words = _vocabulary(prompt)
+
+        if tools and (tool_choice or not isinstance(last, ToolMessage)):
+            name = _tool_choice_name(tool_choice)
+            function = next(
+                (
+                    tool["function"]
+                    for tool in tools
+                    if tool["function"]["name"] == name
+                ),
+                tools[0]["function"],
+            )
+            args = fake_value(function.get("parameters", {}), rng, words)
+            content = ""
+            tool_calls = [
+                {
+                    "name": function["name"],
+                    "args": args,
+                    "id": f"call_fake_{rng.getrandbits(48):012x}",
+                }
+            ]
+        else:
+            content = self._text(prompt, last, rng, words)
+            tool_calls = []
+        prompt_chars = sum(len(str(m.content)) for m in messages)
+        output_tokens = _count_tokens(content or json.dumps(tool_calls))
+        input_tokens = max(1, prompt_chars // 4)
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            response_metadata={"model_name": self.model_name, "finish_reason": "stop"},
+            usage_metadata={
+                "input_tokens": input_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": input_tokens + output_tokens,
+            },
+        )
+
+    def _text(
+        self,
+        prompt: str,
+        last: BaseMessage,
+        rng: random.Random,
+        words: Sequence[str],
+    ) -> str:
+        if "json" in prompt.lower():
+            for schema in JSON_SCHEMAS:
+                if all(f'"{name}"' in prompt for name in schema.model_fields):
+                    return json.dumps(
+                        fake_value(schema.model_json_schema(), rng, words),
+                        ensure_ascii=False,
+                    )
+        results = _search_results(last)
+        if results:
+            sentences = [
+                f"{_sentence(rng, _vocabulary(result.get('content', '')))} [{idx}]."
+                for idx, result in enumerate(results)
+            ]
+        else:
+            links = list(dict.fromkeys(_MARKDOWN_LINK.findall(prompt)))
+            sentences = [f"{_sentence(rng, words)} {link}." for link in links[:8]] or [
+                f"{_sentence(rng, words)}." for _ in range(rng.randint(3, 5))
+            ]
+        return " ".join(sentences)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._respond(messages, kwargs)
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._respond(messages, kwargs)
+        if message.tool_calls:
+            chunks = [
+                AIMessageChunk(
+                    content="",
+                    tool_call_chunks=[
+                        {
+                            "name": call["name"],
+                            "args": json.dumps(call["args"]),
+                            "id": call["id"],
+                            "index": idx,
+                        }
+                        for idx, call in enumerate(message.tool_calls)
+                    ],
+                )
+            ]
+        else:
+            # One chunk per word, keeping the whitespace so chunks join back exactly
+            chunks = [
+                AIMessageChunk(content=piece)
+                for piece in re.split(r"(?<=\s)(?=\S)", message.content)
+            ]
+        chunks[-1].usage_metadata = message.usage_metadata
+        chunks[-1].response_metadata = message.response_metadata
+        delay = self.latency_s / len(chunks)
+        for chunk in chunks:
+            if delay:
+                time.sleep(delay)
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager is not None:
+                run_manager.on_llm_new_token(chunk.content, chunk=generation)
+            yield generation
+
+
+def fake_search(
+    query: str,
+    max_results: int = 5,
+    result_chars: int = 500,
+    latency_s: float = 0.0,
+    seed: int = 0,
+) -> dict:
+    """Return seeded synthetic search results in the shape of a Tavily response.
+
+    Each result has a title, a unique ``.example`` URL derived from the query,
+    ``result_chars`` characters of content and a descending score.
+    """
+    rng = _rng(seed, "search", query, max_results, result_chars)
+    words = _vocabulary(query)
+    if latency_s:
+        time.sleep(latency_s)
+    slug = "-".join(_WORD.findall(query.lower())[:6]) or "query"
+    results = []
+    for idx in range(max_results):
+        content = ""
+        while len(content) < result_chars:
+            content += _sentence(rng, words) + ". "
+        results.append(
+            {
+                "title": _phrase(rng, words, 3, 8).title(),
+                "url": f"https://{rng.choice(words)}.example/{slug}/{idx}",
+                # Cut at a word boundary, so the content is at most result_chars
+                "content": content[: result_chars + 1].rsplit(" ", 1)[0],
+                "score": round(0.99 - idx * 0.9 / max(1, max_results), 3),
+                "raw_content": None,
+            }
+        )
+    return {
+        "query": query,
+        "follow_up_questions": None,
+        "answer": None,
+        "images": [],
+        "results": results,
+        "response_time": latency_s,
+    }
+
+
+def make_fake_search_tool(
+    policy: Optional[CallPolicy] = None,
+    deadline: Optional[float] = None,
+    max_results: int = 5,
+    result_chars: int = 500,
+    latency_s: float = 0.0,
+    seed: int = 0,
+) -> BaseTool:
+    """Create a ``fake_search`` tool returning ``fake_search`` results.
+
+    Requests run under the call policy like real searches, so timeouts,
+    deadlines, spans and search-call accounting behave the same.
+    """
+
+    def _search(query: str) -> dict:
+        left = remaining_time(deadline)
+        if left is not None and left <= 0:
+            return {"query": query, "results": [], "error": "deadline exceeded"}
+        record_search_call()
+        return call_with_policy(
+            "fake_search",
+            lambda: fake_search(query, max_results, result_chars, latency_s, seed),
+            policy=policy,
+            deadline=deadline,
+            provider="fake",
+        )
+
+    return StructuredTool.from_function(
+        func=_search,
+        name=FAKE_SEARCH_TOOL_NAME,
+        description="A search engine returning synthetic results for offline runs. "
+        "Input should be a search query.",
+        args_schema=TavilyQuery,
+    )
@@ -1,20 +1,42 @@
 """LangGraph implementation for the agent."""
 
+import functools
+import hashlib
+import json
 import os
 
 # 로깅 설정 추가
 import sys
+import uuid
+from typing import Optional
 
 from dotenv import load_dotenv
 from google.genai import Client
-from langchain_core.messages import AIMessage
+from google.genai.types import GenerateContentResponse
+from langchain_core.messages import AIMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_tavily import TavilySearch
+from langchain_core.tools import ToolException
 from langgraph.graph import END, START, StateGraph
-from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt import ToolNode, create_react_agent
 from langgraph.types import Send
-
+from pydantic import ValidationError
+
+from agent.api_keys import use_api_keys, user_api_key
+from agent.call_policy import (
+    DeadlineExceeded,
+    call_with_policy,
+    deadline_from_budget,
+    remaining_time,
+)
+from agent.cassette import cassette_for, recorded, use_cassette
+from agent.circuit_breaker import CircuitOpenError, failover_order, get_breaker
 from agent.configuration import Configuration
+from agent.fakes import make_fake_search_tool
+from agent.local_search import make_local_search_tool
+from agent.marginal_gain import measure_gain
+from agent.pipeline import BRANCH_POOL, RUNNING_BRANCHES
+from agent.policy_model import PolicyChatModel
+from agent.profiling import active_profiler, end_graph_profile, start_graph_profile
 from agent.prompts import (
     answer_instructions,
     get_current_date,
@@ -22,14 +44,27 @@ from agent.prompts import (
     reflection_instructions,
     web_searcher_instructions,
 )
+from agent.reducers import add_research_results, add_sources, appended_count
+from agent.research_memory import recall_answers, remember_research
+from agent.search_cache import SearchCache, get_search_cache
 from agent.state import (
     OverallState,
+    PipelinedResearchState,
     QueryGenerationState,
     ReflectionState,
     WebSearchState,
 )
-from agent.tools_and_schemas import Reflection, SearchQueryList
+from agent.tools_and_schemas import (
+    Reflection,
+    SearchQueryList,
+    lookup_cached_search,
+    make_tavily_search_tool,
+    search_tavily,
+)
+from agent.usage import merge_usage, metered, record_usage, usage_totals
 from agent.utils import (
+    StreamingQueryListParser,
+    extract_json_object,
     get_citations,
     get_llm_model,
     get_research_topic,
@@ -37,6 +72,7 @@ from agent.utils import (
     insert_citation,
     insert_citation_markers,
     resolve_urls,
+    strip_thinking,
 )
 
 sys.path.append(
@@ -48,12 +84,80 @@ from components.logging_config import (
     log_error_with_context,
     log_graph_transition,
     log_tool_usage,
+    span,
 )
 
 load_dotenv()
 
 
+def _instrumented(node: str):
+    """Trace a node as a ``node.<name>`` span and account its token usage.
+
+    When the run is being profiled, the node also joins its profiler and its
+    wall and CPU time are recorded on the span. Runs with ``profile_run`` set
+    that no caller profiles are profiled from the first node on, and their
+    profile is written when ``finalize_answer`` is done. With ``cassette_mode``
+    set, the node's LLM and search calls are recorded to or replayed from the
+    cassette. API keys passed in ``configurable`` are handed to the clients the
+    node creates, without touching the environment.
+
+    The LLM tokens and search calls made while the node runs, including those
+    of nested agents, are returned in the ``token_usage`` channel under the
+    node's name. Applied where the node is defined, so searches started in
+    ``BRANCH_POOL`` outside of a graph step are accounted the same way.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(state, config: RunnableConfig):
+            thread_id = (config.get("configurable") or {}).get("thread_id")
+            with (
+                span(f"node.{node}", trace_id=thread_id) as node_span,
+                metered() as meter,
+                use_cassette(cassette_for(config)),
+                use_api_keys(config),
+            ):
+                profiler = active_profiler(thread_id)
+                if profiler is None and thread_id and _profile_requested(config):
+                    profiler = start_graph_profile(thread_id)
+                if profiler is None:
+                    result = fn(state, config)
+                else:
+                    with profiler.attach(f"node.{node}") as timing:
+                        result = fn(state, config)
+                    node_span.set(**timing)
+                counts = meter.as_dict()
+                node_span.set(usage=counts)
+                usage = {node: counts} if counts else {}
+                if isinstance(result, dict):
+                    result = dict(result)
+                    result["token_usage"] = merge_usage(
+                        result.get("token_usage"), usage
+                    )
+                    if node == "finalize_answer":
+                        end_graph_profile(thread_id)
+                        totals = usage_totals(
+                            merge_usage(state.get("token_usage"), result["token_usage"])
+                        )
+                        node_span.set(run_usage=totals)
+                        GRAPH_LOGGER.info("🧮 Run token usage: %s", totals)
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def _profile_requested(config: RunnableConfig) -> bool:
+    """Return whether ``profile_run`` is set for the run, without the full config."""
+    value = os.environ.get(
+        "PROFILE_RUN", (config.get("configurable") or {}).get("profile_run")
+    )
+    return str(value).lower() in ("1", "true", "yes")
+
+
 # Nodes
+@_instrumented("generate_query")
 def generate_query(state: OverallState, config: RunnableConfig) -> QueryGenerationState:
     """LangGraph node that generates a search queries based on the User's question.
 
@@ -68,37 +172,23 @@ def generate_query(state: OverallState, config: RunnableConfig) -> QueryGenerati
         Dictionary with state update, including search_query key containing the generated query
     """
     GRAPH_LOGGER.info("🔄 Starting generate_query node")
+    research_run_id = uuid.uuid4().hex
+    deadline = None
+    # Branch ids of the searches started while streaming, kept across attempts
+    started: dict[str, int] = {}
 
     try:
-        import streamlit as st
-
         configurable = Configuration.from_runnable_config(config)
-        os.environ["GOOGLE_API_KEY"] = st.session_state.user_google_api_key.strip()
-        os.environ["TAVILY_API_KEY"] = st.session_state.user_tavily_api_key.strip()
+        # The run budget starts with the first node and bounds every outbound call
+        deadline = deadline_from_budget(configurable.run_budget_s)
+        research_deadline = _research_deadline(deadline, configurable)
         # check for custom initial search query count
         if state.get("initial_search_query_count") is None:
             state["initial_search_query_count"] = configurable.number_of_initial_queries
 
         # 사용자 질문 로깅
         user_question = get_research_topic(state["messages"])
-        GRAPH_LOGGER.info(f"📝 User question: {user_question[:100]}...")
-
-        # Get model configuration dynamically
-
-        llm = get_llm_model(
-            model_type=configurable.model_type,
-            temperature=1.0,
-            max_retries=2,
-        )
-
-        log_api_call(
-            GRAPH_LOGGER,
-            "ChatModel",
-            "INIT",
-            f"Type: {configurable.model_type}",
-        )
-
-        structured_llm = llm.with_structured_output(SearchQueryList)
+        GRAPH_LOGGER.info("📝 User question: %.100s...", user_question)
 
         # 프롬프트 로깅
         formatted_prompt = query_writer_instructions.format(
@@ -106,15 +196,42 @@ def generate_query(state: OverallState, config: RunnableConfig) -> QueryGenerati
             number_queries=state["initial_search_query_count"],
             research_topic=user_question,
         )
-        GRAPH_LOGGER.debug(f"📋 Query generation prompt: {formatted_prompt[:200]}...")
+        GRAPH_LOGGER.debug("📋 Query generation prompt: %.200s...", formatted_prompt)
 
         # LLM 호출
         GRAPH_LOGGER.info("🤖 Calling LLM for query generation...")
-        response = structured_llm.invoke(formatted_prompt)
+        if configurable.stream_query_generation:
+            queries, remembered = _call_llm(
+                "generate_query",
+                configurable,
+                research_deadline,
+                1.0,
+                lambda llm: _stream_queries(
+                    llm,
+                    formatted_prompt,
+                    research_run_id,
+                    research_deadline,
+                    config,
+                    configurable,
+                    started,
+                ),
+            )
+            _cancel_unused_prefetches(research_run_id, started, queries)
+        else:
+            response = _call_llm(
+                "generate_query",
+                configurable,
+                research_deadline,
+                1.0,
+                lambda llm: llm.with_structured_output(SearchQueryList).invoke(
+                    formatted_prompt
+                ),
+            )
+            # Queries the research memory already answers are not searched again
+            queries, remembered = recall_answers(response.query, configurable)
 
         # 생성된 쿼리 로깅
-        queries = response.query
-        GRAPH_LOGGER.info(f"✅ Generated {len(queries)} queries: {queries}")
+        GRAPH_LOGGER.info("✅ Generated %s queries: %s", len(queries), queries)
 
         log_graph_transition(
             GRAPH_LOGGER,
@@ -126,7 +243,14 @@ def generate_query(state: OverallState, config: RunnableConfig) -> QueryGenerati
             },
         )
 
-        return {"query_list": queries}
+        return {
+            "query_list": queries,
+            "query_ids": [started[query] for query in queries] if started else None,
+            "number_of_ran_queries": len(started),
+            "research_run_id": research_run_id,
+            "deadline": deadline,
+            **remembered,
+        }
 
     except Exception as e:
         log_error_with_context(
@@ -140,28 +264,510 @@ def generate_query(state: OverallState, config: RunnableConfig) -> QueryGenerati
             },
         )
         # 에러 발생 시 기본 쿼리 반환
+        BRANCH_POOL.discard(research_run_id)
         fallback_query = (
             user_question if "user_question" in locals() else "research topic"
         )
-        GRAPH_LOGGER.warning(f"🔄 Using fallback query: {fallback_query}")
-        return {"query_list": [fallback_query]}
+        GRAPH_LOGGER.warning("🔄 Using fallback query: %s", fallback_query)
+        return {
+            "query_list": [fallback_query],
+            "query_ids": None,
+            "number_of_ran_queries": 0,
+            "research_run_id": research_run_id,
+            "deadline": deadline,
+        }
+
+
+def _stream_queries(
+    llm,
+    prompt: str,
+    research_run_id: str,
+    deadline: Optional[float],
+    config: RunnableConfig,
+    configurable: Configuration,
+    started: dict[str, int],
+) -> tuple[list, dict]:
+    """Stream the query list and start a search for each query as soon as it is decoded.
+
+    The searches run in ``BRANCH_POOL`` and are claimed by the ``web_research``
+    branches that ``continue_to_web_research`` sends for the same queries.
+    Queries the research memory answers are not searched, and repeated
+    queries are searched once.
+
+    ``started`` maps each query searched so far in the run to its branch id.
+    The caller keeps it across retried and failed-over attempts, so a query an
+    earlier attempt already started is not searched again, and a new query
+    never takes the id of another attempt's search.
+
+    Returns:
+        tuple: The decoded queries to search, and the state update with the
+            queries answered from memory
+    """
+    parser = StreamingQueryListParser()
+    queries = []
+    remembered = {"search_query": [], "web_research_result": [], "sources_gathered": []}
+
+    def start_searches(decoded):
+        decoded, answered = recall_answers(decoded, configurable)
+        for key, values in answered.items():
+            remembered[key].extend(values)
+        for query in decoded:
+            if query in queries:
+                continue
+            queries.append(query)
+            if query in started:
+                GRAPH_LOGGER.info("⏩ Search already started: %s", query)
+                continue
+            branch_id = started[query] = len(started)
+            BRANCH_POOL.prefetch(
+                research_run_id,
+                (branch_id, query),
+                web_research,
+                {"search_query": query, "id": branch_id, "deadline": deadline},
+                config,
+            )
+            GRAPH_LOGGER.info(
+                "🚀 Started search %s while decoding: %s", branch_id, query
+            )
 
+    for chunk in llm.stream(prompt):
+        start_searches(parser.feed(chunk.text()))
+    start_searches(parser.close())
+    if not queries and not remembered["search_query"]:
+        raise ValueError(f"No search queries decoded from: {parser.text[:200]}")
+    return queries, remembered
 
-def continue_to_web_research(state: QueryGenerationState):
+
+def _cancel_unused_prefetches(
+    research_run_id: str, started: dict[str, int], queries: list
+) -> None:
+    """Drop the searches of failed attempts whose queries the final attempt dropped."""
+    for query, branch_id in started.items():
+        if query not in queries:
+            future = BRANCH_POOL.claim(research_run_id, (branch_id, query))
+            if future is not None:
+                future.cancel()
+
+
+def continue_to_web_research(state: QueryGenerationState, config: RunnableConfig):
     """LangGraph node that sends the search queries to the web research node.
 
     This is used to spawn n number of web research nodes, one for each search query.
+    In pipelined mode all queries go to a single ``web_research_pipelined`` node
+    instead, which hands over to reflection once a quorum has finished. When the
+    research memory answered every query, reflection follows directly.
+    """
+    if not state["query_list"]:
+        return "reflection"
+    return _dispatch_web_research(
+        state["query_list"],
+        0,
+        state.get("research_run_id", ""),
+        state.get("deadline"),
+        config,
+        state.get("query_ids"),
+    )
+
+
+def _dispatch_web_research(
+    queries: list,
+    start_id: int,
+    research_run_id: str,
+    deadline: Optional[float],
+    config: RunnableConfig,
+    branch_ids: Optional[list] = None,
+):
+    """Create the Send packets that run web research for ``queries``.
+
+    Branches are numbered from ``start_id`` unless ``branch_ids`` gives the
+    ids their searches were started with. They get the research deadline,
+    which keeps ``finalize_reserve_s`` of the run budget free for writing the
+    answer.
+    """
+    configurable = Configuration.from_runnable_config(config)
+    deadline = _research_deadline(deadline, configurable)
+    if branch_ids is None:
+        branch_ids = [start_id + idx for idx in range(len(queries))]
+    if configurable.pipelined_reflection:
+        return [
+            Send(
+                "web_research_pipelined",
+                {
+                    "search_queries": list(queries),
+                    "branch_ids": list(branch_ids),
+                    "research_run_id": research_run_id,
+                    "deadline": deadline,
+                },
+            )
+        ]
+    return [
+        Send(
+            "web_research",
+            {
+                "search_query": search_query,
+                "id": branch_id,
+                "research_run_id": research_run_id,
+                "deadline": deadline,
+            },
+        )
+        for search_query, branch_id in zip(queries, branch_ids)
+    ]
+
+
+def _research_deadline(
+    deadline: Optional[float], configurable: Configuration
+) -> Optional[float]:
+    """Return the deadline for research work, leaving time for finalize_answer."""
+    if deadline is None:
+        return None
+    return deadline - configurable.finalize_reserve_s
+
+
+def _out_of_research_time(
+    deadline: Optional[float], configurable: Configuration
+) -> bool:
+    """Return True once the research share of the run budget is used up."""
+    left = remaining_time(_research_deadline(deadline, configurable))
+    return left is not None and left <= 0
+
+
+def _best_effort_report(web_research_results: list) -> str:
+    """Join the gathered summaries into an answer when there is no time for the LLM."""
+    report = "\n\n---\n\n".join(result for result in web_research_results if result)
+    return report or "시간 제한 내에 수집된 리서치 결과가 없습니다."
+
+
+def _merge_branch_results(results: list, include_queries: bool = True) -> dict:
+    """Concatenate the state updates of several web_research branches."""
+    merged = {"sources_gathered": [], "web_research_result": []}
+    if include_queries:
+        merged["search_query"] = []
+    for result in results:
+        for key in merged:
+            merged[key].extend(result.get(key, []))
+    merged["is_partial"] = any(result.get("is_partial") for result in results)
+    merged["token_usage"] = functools.reduce(
+        merge_usage, (result.get("token_usage") for result in results), {}
+    )
+    return merged
+
+
+def _call_llm(node, configurable, deadline, temperature, invoke):
+    """Call a node's LLM under its call policy and circuit breaker.
+
+    When ``llm_failover_model_type`` is set and the node's model fails or its
+    circuit is open, the call is retried once on the alternate model type.
+
+    Args:
+        node: The node name used to resolve the model profile and call policy
+        configurable: The resolved run configuration
+        deadline: The absolute epoch deadline of the run
+        temperature: The default sampling temperature of the node
+        invoke: Callable receiving the chat model and performing the request
+
+    Returns:
+        The return value of ``invoke``
+    """
+    primary = configurable.model_type_for(node)
+    policy = configurable.get_call_policy(node)
+    # Profiles with their own endpoint get a circuit of their own
+    api_base = configurable.get_model_profile(node).api_base
+    primary_provider = f"{primary}:{api_base}" if api_base else primary
+    model_types = failover_order(
+        primary, configurable.llm_failover_model_type, breaker=primary_provider
+    )
+    for idx, model_type in enumerate(model_types):
+        is_primary = model_type == primary
+        llm = get_llm_model(
+            model_type,
+            temperature=temperature,
+            max_retries=0,
+            node=node if is_primary else None,
+            configurable=configurable,
+            timeout=policy.timeout_s,
+        )
+        log_api_call(GRAPH_LOGGER, "ChatModel", "INIT", f"Type: {model_type}")
+        try:
+            return call_with_policy(
+                node,
+                lambda: invoke(llm),
+                policy=policy,
+                deadline=deadline,
+                provider=primary_provider if is_primary else model_type,
+            )
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            if idx == len(model_types) - 1:
+                raise
+            GRAPH_LOGGER.warning(
+                "🔀 %s failed on %s (%s), failing over to %s",
+                node,
+                model_type,
+                type(e).__name__,
+                model_types[idx + 1],
+            )
+
+
+def _search_cache(configurable: Configuration) -> Optional[SearchCache]:
+    """Return the shared search cache when prefetching or search sharing is on."""
+    if not (configurable.speculative_prefetch or configurable.share_search_cache):
+        return None
+    return get_search_cache(
+        configurable.search_cache_ttl_s, configurable.search_cache_similarity
+    )
+
+
+def _search_cache_scope(configurable: Configuration) -> str:
+    """Return the search cache scope of the current run.
+
+    Like research memory, cached searches are only shared within the run's
+    ``memory_scope``, and only between runs searching with the same Tavily
+    key, which enters the scope as a fingerprint.
     """
+    api_key = user_api_key("tavily_api_key")
+    fingerprint = hashlib.sha256(api_key.encode()).hexdigest() if api_key else ""
+    return f"{configurable.memory_scope}:{fingerprint}"
+
+
+def _prefetched_search_messages(
+    state: WebSearchState, configurable: Configuration
+) -> list:
+    """Replay a cached search for the branch query as the agent's first tool call.
+
+    The agent then starts from the search results instead of spending an LLM
+    turn on deciding to run the search it was asked to run.
+    """
+    cache = _search_cache(configurable)
+    if cache is None:
+        return []
+    query = state["search_query"]
+    cached = lookup_cached_search(
+        cache,
+        query,
+        configurable.get_call_policy("tavily"),
+        state.get("deadline"),
+        scope=_search_cache_scope(configurable),
+    )
+    if cached is None:
+        return []
+    GRAPH_LOGGER.info("🎯 Using prefetched search results for: %s", query)
+    call_id = f"prefetched-{state['id']}"
     return [
-        Send("web_research", {"search_query": search_query, "id": int(idx)})
-        for idx, search_query in enumerate(state["query_list"])
+        AIMessage(
+            content="",
+            tool_calls=[
+                {"name": "tavily_search", "args": {"query": query}, "id": call_id}
+            ],
+        ),
+        ToolMessage(
+            content=json.dumps(cached, ensure_ascii=False),
+            name="tavily_search",
+            tool_call_id=call_id,
+        ),
+    ]
+
+
+def _tavily_research(state: WebSearchState, configurable: Configuration, prompt: str):
+    """Research a query with a ReAct agent that searches Tavily.
+
+    Returns:
+        tuple: The summary with citation links and the list of sources
+    """
+    if get_breaker("tavily").is_open():
+        raise CircuitOpenError("Circuit for tavily is open")
+
+    tavily_search_tool = make_tavily_search_tool(
+        policy=configurable.get_call_policy("tavily"),
+        deadline=state.get("deadline"),
+        cache=_search_cache(configurable),
+        cache_scope=_search_cache_scope(configurable),
+    )
+    return _agent_research(
+        state,
+        configurable,
+        prompt,
+        tavily_search_tool,
+        _prefetched_search_messages(state, configurable),
+    )
+
+
+def _local_research(state: WebSearchState, configurable: Configuration, prompt: str):
+    """Research a query with a ReAct agent that searches the local BM25 index.
+
+    Returns:
+        tuple: The summary with citation links and the list of sources
+    """
+    local_search_tool = make_local_search_tool(
+        configurable.local_index_path,
+        policy=configurable.get_call_policy("local_search"),
+        deadline=state.get("deadline"),
+        max_results=configurable.local_search_results,
+    )
+    return _agent_research(state, configurable, prompt, local_search_tool)
+
+
+def _fake_research(state: WebSearchState, configurable: Configuration, prompt: str):
+    """Research a query with a ReAct agent that searches seeded synthetic results.
+
+    Returns:
+        tuple: The summary with citation links and the list of sources
+    """
+    fake_search_tool = make_fake_search_tool(
+        policy=configurable.get_call_policy("fake_search"),
+        deadline=state.get("deadline"),
+        max_results=configurable.fake_search_results,
+        result_chars=configurable.fake_result_chars,
+        latency_s=configurable.fake_search_latency_ms / 1000,
+        seed=configurable.fake_seed,
+    )
+    return _agent_research(state, configurable, prompt, fake_search_tool)
+
+
+# Tool errors the research agent answers itself instead of failing over
+AGENT_TOOL_ERRORS = (ToolException, ValidationError)
+
+
+def _agent_research(
+    state: WebSearchState,
+    configurable: Configuration,
+    prompt: str,
+    search_tool,
+    prefetched_messages: Optional[list] = None,
+):
+    """Run the web_research ReAct agent with ``search_tool`` and cite its sources.
+
+    Returns:
+        tuple: The summary with citation links and the list of sources
+    """
+    agent_input = [
+        {"role": "user", "content": prompt},
+        *(prefetched_messages or []),
     ]
 
+    # Each model turn runs under the call policy on its own; the search tool
+    # applies its own policy, so a failed turn never repeats earlier searches
+    model = PolicyChatModel(
+        call=lambda invoke: _call_llm(
+            "web_research",
+            configurable,
+            state.get("deadline"),
+            0.7,
+            invoke,
+        )
+    )
+    # Bad tool arguments go back to the model; search failures that outlast
+    # the tool's call policy end the run so web_research can fail over
+    tool_node = ToolNode([search_tool], handle_tool_errors=AGENT_TOOL_ERRORS)
+    GRAPH_LOGGER.info("🤖 Invoking web research agent...")
+    agent = create_react_agent(model, tools=tool_node)
+    out = agent.invoke(input={"messages": agent_input})
+    messages = out["messages"]
+
+    log_tool_usage(
+        GRAPH_LOGGER,
+        "react_agent",
+        state["search_query"],
+        f"Messages count: {len(messages)}",
+        True,
+    )
+
+    # sources 추출 시 에러 처리
+    try:
+        sources = get_sources(messages, state["id"])
+        GRAPH_LOGGER.info("📚 Extracted %s sources", len(sources))
+    except Exception as e:
+        log_error_with_context(
+            GRAPH_LOGGER, e, "get_sources", {"query": state["search_query"]}
+        )
+        sources = []  # 빈 소스 목록으로 계속 진행
+
+    # Reasoning of the summarization step is discarded, only the answer is kept
+    summary_text, _ = strip_thinking(messages[-1].content)
+
+    # citation 삽입 시 에러 처리
+    try:
+        summarized_text = insert_citation(summary_text, sources)
+        GRAPH_LOGGER.info(
+            "📝 Generated summarized text with citations (%s chars)",
+            len(summarized_text),
+        )
+    except Exception as e:
+        log_error_with_context(
+            GRAPH_LOGGER, e, "insert_citation", {"sources_count": len(sources)}
+        )
+        # citation 없이 원본 텍스트 사용
+        summarized_text = summary_text
+    return summarized_text, sources
+
+
+def _google_research(state: WebSearchState, configurable: Configuration, prompt: str):
+    """Research a query with Gemini's native Google Search grounding.
+
+    Uses the google genai client as the langchain client doesn't return grounding metadata.
+
+    Returns:
+        tuple: The summary with citation markers and the list of sources
+    """
+    model = os.getenv("GEMINI_MODEL_NAME")
+    response = call_with_policy(
+        "google_search",
+        lambda: recorded(
+            "google_search",
+            {"model": model, "prompt": prompt},
+            lambda: Client(
+                api_key=user_api_key("google_api_key") or os.getenv("GOOGLE_API_KEY")
+            ).models.generate_content(
+                model=model,
+                contents=prompt,
+                config={
+                    "tools": [{"google_search": {}}],
+                    "temperature": 0,
+                },
+            ),
+            encode=lambda response: response.model_dump(mode="json", exclude_none=True),
+            decode=GenerateContentResponse.model_validate,
+        ),
+        policy=configurable.get_call_policy("google_search"),
+        deadline=state.get("deadline"),
+        provider="google",
+    )
+    # The genai client bypasses LangChain callbacks, so report its usage directly
+    usage = response.usage_metadata
+    record_usage(
+        search_calls=1,
+        llm_calls=1,
+        prompt_tokens=(usage and usage.prompt_token_count) or 0,
+        completion_tokens=(usage and usage.candidates_token_count) or 0,
+        reasoning_tokens=(usage and usage.thoughts_token_count) or 0,
+    )
+    # resolve the urls to short urls for saving tokens and time
+    resolved_urls = resolve_urls(
+        response.candidates[0].grounding_metadata.grounding_chunks,
+        state["id"],
+    )
+    # Gets the citations and adds them to the generated text
+    citations = get_citations(response, resolved_urls)
+    summarized_text = insert_citation_markers(response.text, citations)
+    sources = [item for citation in citations for item in citation["segments"]]
+    return summarized_text, sources
+
+
+SEARCH_BACKENDS = {
+    "tavily": _tavily_research,
+    "google": _google_research,
+    "local": _local_research,
+    "fake": _fake_research,
+}
 
+
+@_instrumented("web_research")
 def web_research(state: WebSearchState, config: RunnableConfig) -> OverallState:
     """LangGraph node that performs web research using the native Google Search API tool.
 
     Executes a web search using the native Google Search API tool in combination with Gemini 2.0 Flash.
+    If the configured search type fails or its circuit is open and
+    ``search_failover_type`` is set, the alternate search type is used instead.
 
     Args:
         state: Current graph state containing the search query and research loop count
@@ -171,134 +777,169 @@ def web_research(state: WebSearchState, config: RunnableConfig) -> OverallState:
         Dictionary with state update, including sources_gathered, research_loop_count, and web_research_results
     """
     GRAPH_LOGGER.info(
-        f"🔍 Starting web_research node for query: '{state['search_query']}'"
+        "🔍 Starting web_research node for query: '%s'", state["search_query"]
     )
 
-    try:
-        # Configure
-        configurable = Configuration.from_runnable_config(config)
-        formatted_prompt = web_searcher_instructions.format(
-            current_date=get_current_date(),
-            research_topic=state["search_query"],
-        )
-
-        GRAPH_LOGGER.debug(f"📋 Web search prompt: {formatted_prompt[:200]}...")
-
-        message = {"role": "user", "content": formatted_prompt}
-
-        # Get search type from session state (safe import)
-        if configurable.search_type == "tavily":
-            # Get model configuration dynamically
-            llm = get_llm_model(
-                model_type=configurable.model_type,
-                max_retries=2,
-                temperature=0.7,
+    # The search may already be running since query generation was streamed
+    prefetched = BRANCH_POOL.claim(
+        state.get("research_run_id", ""), (int(state["id"]), state["search_query"])
+    )
+    if prefetched is not None and not prefetched.cancelled():
+        GRAPH_LOGGER.info("⏩ Waiting for the search started during query generation")
+        return prefetched.result()
+
+    # Counted while it searches; a claimed prefetch is counted where it runs
+    with RUNNING_BRANCHES.track():
+        try:
+            # Configure
+            configurable = Configuration.from_runnable_config(config)
+            formatted_prompt = web_searcher_instructions.format(
+                current_date=get_current_date(),
+                research_topic=state["search_query"],
             )
 
-            log_api_call(
-                GRAPH_LOGGER,
-                "ChatModel",
-                "INIT",
-                f"Type: {configurable.model_type}",
+            GRAPH_LOGGER.debug("📋 Web search prompt: %.200s...", formatted_prompt)
+
+            search_types = failover_order(
+                configurable.search_type, configurable.search_failover_type
             )
-            tavily_search_tool = TavilySearch(max_results=5)
-            agent = create_react_agent(
-                llm,
-                tools=[tavily_search_tool],
+            for idx, search_type in enumerate(search_types):
+                if search_type not in SEARCH_BACKENDS:
+                    raise ValueError(f"Unsupported search type: {search_type}")
+                try:
+                    summarized_text, sources = SEARCH_BACKENDS[search_type](
+                        state, configurable, formatted_prompt
+                    )
+                    break
+                except DeadlineExceeded:
+                    raise
+                except Exception as e:
+                    if idx == len(search_types) - 1:
+                        raise
+                    GRAPH_LOGGER.warning(
+                        "🔀 %s search failed (%s), failing over to %s",
+                        search_type,
+                        type(e).__name__,
+                        search_types[idx + 1],
+                    )
+
+            result = {
+                "sources_gathered": sources,
+                "search_query": [state["search_query"]],
+                "web_research_result": [summarized_text],
+            }
+            remember_research(
+                configurable,
+                search_type,
+                state["search_query"],
+                summarized_text,
+                sources,
             )
 
-            GRAPH_LOGGER.info("🤖 Invoking web research agent...")
-
-            out = agent.invoke(input={"messages": [message]})
-            message = out["messages"]
-
-            # Uses the google genai client as the langchain client doesn't return grounding metadata
-
-            log_tool_usage(
+            log_graph_transition(
                 GRAPH_LOGGER,
-                "react_agent",
-                state["search_query"],
-                f"Messages count: {len(message)}",
-                True,
+                "web_research",
+                "reflection",
+                {"sources_count": len(sources), "query": state["search_query"]},
             )
 
-            # sources 추출 시 에러 처리
-            try:
-                sources = get_sources(message, state["id"])
-                GRAPH_LOGGER.info(f"📚 Extracted {len(sources)} sources")
-            except Exception as e:
-                log_error_with_context(
-                    GRAPH_LOGGER, e, "get_sources", {"query": state["search_query"]}
-                )
-                sources = []  # 빈 소스 목록으로 계속 진행
+            GRAPH_LOGGER.info("✅ Web research completed successfully")
+            return result
 
-            # citation 삽입 시 에러 처리
-            try:
-                summarized_text = insert_citation(message[-1].content, sources)
-                GRAPH_LOGGER.info(
-                    f"📝 Generated summarized text with citations ({len(summarized_text)} chars)"
-                )
-            except Exception as e:
-                log_error_with_context(
-                    GRAPH_LOGGER, e, "insert_citation", {"sources_count": len(sources)}
-                )
-                # citation 없이 원본 텍스트 사용
-                summarized_text = (
-                    message[-1].content
-                    if message
-                    else "검색 결과를 가져올 수 없습니다."
-                )
-        elif configurable.search_type == "google":
-            google_api_key = os.getenv("GOOGLE_API_KEY")
-            genai_client = Client(api_key=google_api_key)
-            response = genai_client.models.generate_content(
-                model=os.getenv("GEMINI_MODEL_NAME"),
-                contents=formatted_prompt,
-                config={
-                    "tools": [{"google_search": {}}],
-                    "temperature": 0,
-                },
-            )
-            # resolve the urls to short urls for saving tokens and time
-            resolved_urls = resolve_urls(
-                response.candidates[0].grounding_metadata.grounding_chunks,
-                state["id"],
+        except Exception as e:
+            log_error_with_context(
+                GRAPH_LOGGER, e, "web_research", {"query": state["search_query"]}
             )
-            # Gets the citations and adds them to the generated text
-            citations = get_citations(response, resolved_urls)
-            summarized_text = insert_citation_markers(response.text, citations)
-            sources = [item for citation in citations for item in citation["segments"]]
-
-        result = {
-            "sources_gathered": sources,
-            "search_query": [state["search_query"]],
-            "web_research_result": [summarized_text],
-        }
+            # 실패한 검색은 결과 없이 반환하여 reflection과 최종 답변에 오류 문구가 섞이지 않도록 함
+            left = remaining_time(state.get("deadline"))
+            error_result = {
+                "sources_gathered": [],
+                "search_query": [state["search_query"]],
+                "web_research_result": [],
+                # A search cut short by the deadline makes the answer partial
+                "is_partial": isinstance(e, DeadlineExceeded)
+                or (left is not None and left <= 0),
+            }
+            GRAPH_LOGGER.warning("⚠️ Web research failed, returning empty result")
+            return error_result
+
+
+@_instrumented("web_research_pipelined")
+def web_research_pipelined(
+    state: PipelinedResearchState, config: RunnableConfig
+) -> OverallState:
+    """LangGraph node that runs several web searches and returns once a quorum is done.
 
-        log_graph_transition(
-            GRAPH_LOGGER,
-            "web_research",
-            "reflection",
-            {"sources_count": len(sources), "query": state["search_query"]},
-        )
+    Each query runs through ``web_research`` in the background. When
+    ``reflection_quorum`` of them have finished, or ``reflection_deadline_s`` has
+    passed, the finished results are returned so reflection can start. The
+    remaining branches keep running as stragglers and are merged by the next
+    reflection or by ``finalize_answer``.
 
-        GRAPH_LOGGER.info("✅ Web research completed successfully")
-        return result
+    Args:
+        state: The queries to search, their branch ids and the research run id
+        config: Configuration for the runnable, including quorum settings
 
-    except Exception as e:
-        log_error_with_context(
-            GRAPH_LOGGER, e, "web_research", {"query": state["search_query"]}
+    Returns:
+        Dictionary with state update, including sources_gathered, search_query and web_research_result
+    """
+    configurable = Configuration.from_runnable_config(config)
+    queries = state["search_queries"]
+    GRAPH_LOGGER.info("🔍 Starting pipelined web research for %s queries", len(queries))
+
+    deadline_s = configurable.reflection_deadline_s
+    left = remaining_time(state.get("deadline"))
+    if left is not None:
+        deadline_s = max(0.0, min(deadline_s, left))
+
+    futures = []
+    for query, branch_id in zip(queries, state["branch_ids"]):
+        # Reuse searches already started while the queries were being decoded
+        future = BRANCH_POOL.claim(state["research_run_id"], (branch_id, query))
+        if future is None or future.cancelled():
+            future = BRANCH_POOL.submit(
+                web_research,
+                {
+                    "search_query": query,
+                    "id": branch_id,
+                    "deadline": state.get("deadline"),
+                },
+                config,
+            )
+        futures.append(future)
+    done, pending = BRANCH_POOL.wait_for_quorum(
+        futures,
+        quorum=configurable.reflection_quorum,
+        deadline_s=deadline_s,
+    )
+    left = remaining_time(state.get("deadline"))
+    out_of_time = bool(pending) and left is not None and left <= 0
+    if out_of_time:
+        # No later node has time to use them, so stop what hasn't started yet
+        for future in pending:
+            future.cancel()
+        GRAPH_LOGGER.warning(
+            "⏱️ Research deadline reached, cancelled %s search branches", len(pending)
         )
-        # 에러 발생 시 기본값 반환
-        error_result = {
-            "sources_gathered": [],
-            "search_query": [state["search_query"]],
-            "web_research_result": [f"검색 중 오류가 발생했습니다: {str(e)}"],
-        }
-        GRAPH_LOGGER.warning("⚠️ Web research failed, returning error result")
-        return error_result
+    else:
+        BRANCH_POOL.add_stragglers(state["research_run_id"], pending)
+
+    result = _merge_branch_results([future.result() for future in done])
+    result["is_partial"] = result["is_partial"] or out_of_time
+    # All dispatched queries count as ran so follow-up ids never collide with
+    # stragglers; finished queries come first, aligned with web_research_result
+    result["search_query"] += [queries[futures.index(future)] for future in pending]
+
+    log_graph_transition(
+        GRAPH_LOGGER,
+        "web_research_pipelined",
+        "reflection",
+        {"completed": len(done), "stragglers": len(pending)},
+    )
+    return result
 
 
+@_instrumented("reflection")
 def reflection(state: OverallState, config: RunnableConfig) -> ReflectionState:
     """LangGraph node that identifies knowledge gaps and generates potential follow-up queries.
 
@@ -320,17 +961,62 @@ def reflection(state: OverallState, config: RunnableConfig) -> ReflectionState:
         # Increment the research loop count and get the reasoning model
         state["research_loop_count"] = state.get("research_loop_count", 0) + 1
 
-        GRAPH_LOGGER.info(f"🔄 Research loop count: {state['research_loop_count']}")
+        GRAPH_LOGGER.info("🔄 Research loop count: %s", state["research_loop_count"])
+
+        # Pick up pipelined search branches that finished after the last quorum
+        late_results = _merge_branch_results(
+            BRANCH_POOL.take_finished(state.get("research_run_id", "")),
+            include_queries=False,
+        )
+        web_research_results = add_research_results(
+            state["web_research_result"], late_results["web_research_result"]
+        )
+
+        # Measure what this loop added on top of the earlier ones
+        previous_gain = (state.get("research_gain") or [{}])[-1]
+        gain = measure_gain(
+            web_research_results,
+            add_sources(
+                state.get("sources_gathered", []), late_results["sources_gathered"]
+            ),
+            seen_summaries=previous_gain.get("total_results", 0),
+            seen_sources=previous_gain.get("total_sources", 0),
+            loop=state["research_loop_count"],
+            ngram_size=configurable.gain_ngram_size,
+            seen_duplicate_sources=previous_gain.get("total_duplicate_sources", 0),
+        )
+        GRAPH_LOGGER.info(
+            "📈 Marginal gain of loop %s: %.2f (%s new urls, %.0f%% novel content)",
+            gain["loop"],
+            gain["gain"],
+            gain["new_unique_urls"],
+            gain["content_novelty"] * 100,
+        )
+        out_of_time = _out_of_research_time(state.get("deadline"), configurable)
+        if out_of_time:
+            GRAPH_LOGGER.warning("⏱️ Research deadline reached, skipping reflection")
+            late_results["is_partial"] = True
+        if out_of_time or _gain_too_low(gain, configurable):
+            # The loop will end regardless of the reflection, so don't pay for it
+            GRAPH_LOGGER.info("⏹️ Research is ending, skipping reflection")
+            return {
+                "is_sufficient": False,
+                "knowledge_gap": "",
+                "follow_up_queries": [],
+                "recalled_from_memory": 0,
+                "research_loop_count": state["research_loop_count"],
+                "number_of_ran_queries": _ran_queries(state),
+                "research_gain": [gain],
+                **late_results,
+            }
 
         # Format the prompt
         current_date = get_current_date()
         research_topic = get_research_topic(state["messages"])
-        summaries = "\n\n---\n\n".join(state["web_research_result"])
+        summaries = "\n\n---\n\n".join(web_research_results)
 
-        GRAPH_LOGGER.info(
-            f"📊 Analyzing {len(state['web_research_result'])} research results"
-        )
-        GRAPH_LOGGER.debug(f"📝 Research topic: {research_topic[:100]}...")
+        GRAPH_LOGGER.info("📊 Analyzing %s research results", len(web_research_results))
+        GRAPH_LOGGER.debug("📝 Research topic: %.100s...", research_topic)
 
         formatted_prompt = reflection_instructions.format(
             current_date=current_date,
@@ -338,32 +1024,51 @@ def reflection(state: OverallState, config: RunnableConfig) -> ReflectionState:
             summaries=summaries,
         )
 
-        # Get model configuration dynamically
-        llm = get_llm_model(
-            configurable.model_type,
-            max_retries=2,
-            temperature=0.7,
-        )
-
-        log_api_call(
-            GRAPH_LOGGER,
-            "ChatModel",
-            "INIT",
-            f"Type: {configurable.model_type}",
-        )
-
         GRAPH_LOGGER.info("🤖 Calling LLM for reflection analysis...")
-        result = llm.with_structured_output(Reflection).invoke(formatted_prompt)
+        research_deadline = _research_deadline(state.get("deadline"), configurable)
+        if configurable.speculative_prefetch and configurable.search_type == "tavily":
+            result = _call_llm(
+                "reflection",
+                configurable,
+                research_deadline,
+                0.7,
+                lambda llm: _stream_reflection(
+                    llm, formatted_prompt, configurable, research_deadline
+                ),
+            )
+        else:
+            result = _call_llm(
+                "reflection",
+                configurable,
+                research_deadline,
+                0.7,
+                lambda llm: llm.with_structured_output(Reflection).invoke(
+                    formatted_prompt
+                ),
+            )
 
         # 결과 로깅
         GRAPH_LOGGER.info(
-            f"✅ Reflection completed - Is sufficient: {result.is_sufficient}"
+            "✅ Reflection completed - Is sufficient: %s", result.is_sufficient
         )
         if not result.is_sufficient:
             GRAPH_LOGGER.info(
-                f"🔍 Knowledge gap identified: {result.knowledge_gap[:100]}..."
+                "🔍 Knowledge gap identified: %.100s...", result.knowledge_gap
             )
 
+        # Research that still has gaps but no time left ends with a partial answer
+        if not result.is_sufficient and _out_of_research_time(
+            state.get("deadline"), configurable
+        ):
+            late_results["is_partial"] = True
+
+        # Follow-ups the research memory already answers are not searched again
+        follow_up_queries, remembered = recall_answers(
+            [] if result.is_sufficient else result.follow_up_queries, configurable
+        )
+        late_results["web_research_result"] += remembered["web_research_result"]
+        late_results["sources_gathered"] += remembered["sources_gathered"]
+
         # 다음 노드 결정 로깅
         next_node = "finalize_answer" if result.is_sufficient else "web_research"
         log_graph_transition(
@@ -379,9 +1084,15 @@ def reflection(state: OverallState, config: RunnableConfig) -> ReflectionState:
         return {
             "is_sufficient": result.is_sufficient,
             "knowledge_gap": result.knowledge_gap,
-            "follow_up_queries": result.follow_up_queries,
+            "follow_up_queries": (
+                result.follow_up_queries if result.is_sufficient else follow_up_queries
+            ),
+            "recalled_from_memory": len(remembered["search_query"]),
+            "search_query": remembered["search_query"],
             "research_loop_count": state["research_loop_count"],
-            "number_of_ran_queries": len(state["search_query"]),
+            "number_of_ran_queries": _ran_queries(state),
+            "research_gain": [gain],
+            **late_results,
         }
 
     except Exception as e:
@@ -398,13 +1109,76 @@ def reflection(state: OverallState, config: RunnableConfig) -> ReflectionState:
         GRAPH_LOGGER.warning("⚠️ Reflection failed, assuming sufficient information")
         return {
             "is_sufficient": True,
-            "knowledge_gap": result.knowledge_gap,
-            "follow_up_queries": result.follow_up_queries,
-            "research_loop_count": state["research_loop_count"],
-            "number_of_ran_queries": len(state["search_query"]),
+            "knowledge_gap": "",
+            "follow_up_queries": [],
+            "recalled_from_memory": 0,
+            "is_partial": isinstance(e, TimeoutError),
+            "research_loop_count": state.get("research_loop_count", 1),
+            "number_of_ran_queries": _ran_queries(state),
         }
 
 
+def _ran_queries(state: OverallState) -> int:
+    """Return the first branch id that no search of the run has used yet.
+
+    Searches started for queries a retried query generation dropped used ids
+    too, so follow-up branches start after them.
+    """
+    return max(
+        appended_count(state.get("search_query", [])),
+        state.get("number_of_ran_queries") or 0,
+    )
+
+
+def _stream_reflection(
+    llm, prompt: str, configurable: Configuration, deadline: Optional[float]
+) -> Reflection:
+    """Stream the reflection and prefetch a search for each follow-up query.
+
+    Follow-up queries are decoded from the streamed JSON as they appear and
+    searched (without summarization) into the search cache, so the next
+    web_research branches find their results ready.
+
+    Returns:
+        Reflection: The parsed reflection
+    """
+    cache = _search_cache(configurable)
+    scope = _search_cache_scope(configurable)
+    policy = configurable.get_call_policy("tavily")
+    parser = StreamingQueryListParser(key="follow_up_queries")
+    prefetched = []
+
+    def prefetch(decoded):
+        for query in decoded:
+            if len(prefetched) >= configurable.speculative_max_prefetches:
+                return
+            cache.prefetch(
+                query,
+                lambda q: search_tavily(q, policy=policy, deadline=deadline),
+                scope=scope,
+            )
+            prefetched.append(query)
+
+    for chunk in llm.stream(prompt):
+        prefetch(parser.feed(chunk.text()))
+    prefetch(parser.close())
+
+    data = json.loads(extract_json_object(parser.text))
+    # The prompt asks for "a specific question", which models may write as a string
+    if isinstance(data.get("follow_up_queries"), str):
+        data["follow_up_queries"] = [data["follow_up_queries"]]
+    return Reflection.model_validate(data)
+
+
+def _gain_too_low(gain: dict, configurable: Configuration) -> bool:
+    """Return True when a follow-up loop added less than ``min_marginal_gain``."""
+    return (
+        configurable.min_marginal_gain > 0
+        and gain.get("loop", 0) > 1
+        and gain.get("gain", 1.0) < configurable.min_marginal_gain
+    )
+
+
 def evaluate_research(
     state: ReflectionState,
     config: RunnableConfig,
@@ -413,6 +1187,8 @@ def evaluate_research(
 
     Controls the research loop by deciding whether to continue gathering information
     or to finalize the summary based on the configured maximum number of research loops.
+    The loop also ends once a follow-up loop's marginal gain, as recorded in
+    ``research_gain``, drops below ``min_marginal_gain``.
 
     Args:
         state: Current graph state containing the research loop count
@@ -427,27 +1203,42 @@ def evaluate_research(
         if state.get("max_research_loops") is not None
         else configurable.max_research_loops
     )
+    gain = (state.get("research_gain") or [{}])[-1]
+    if _gain_too_low(gain, configurable):
+        GRAPH_LOGGER.info(
+            "⏹️ Ending research after loop %s: gain %.2f < %.2f",
+            gain["loop"],
+            gain["gain"],
+            configurable.min_marginal_gain,
+        )
+        return "finalize_answer"
     if state["is_sufficient"] or state["research_loop_count"] >= max_research_loops:
         return "finalize_answer"
+    if _out_of_research_time(state.get("deadline"), configurable):
+        GRAPH_LOGGER.info("⏱️ Research deadline reached, finalizing a partial answer")
+        return "finalize_answer"
+    if not state["follow_up_queries"]:
+        # Reflect on follow-ups answered from memory; without any, nothing is left to do
+        return "reflection" if state.get("recalled_from_memory") else "finalize_answer"
     else:
-        return [
-            Send(
-                "web_research",
-                {
-                    "search_query": follow_up_query,
-                    "id": state["number_of_ran_queries"] + int(idx),
-                },
-            )
-            for idx, follow_up_query in enumerate(state["follow_up_queries"])
-        ]
+        return _dispatch_web_research(
+            state["follow_up_queries"],
+            state["number_of_ran_queries"],
+            state.get("research_run_id", ""),
+            state.get("deadline"),
+            config,
+        )
 
 
+@_instrumented("finalize_answer")
 def finalize_answer(state: OverallState, config: RunnableConfig):
     """LangGraph node that finalizes the research summary.
 
     Prepares the final output by deduplicating and formatting sources, then
     combining them with the running summary to create a well-structured
-    research report with proper citations.
+    research report with proper citations. When the run deadline leaves no time
+    for the LLM, the gathered summaries are returned as a best-effort report and
+    ``is_partial`` is set.
 
     Args:
         state: Current graph state containing the running summary and sources gathered
@@ -460,42 +1251,68 @@ def finalize_answer(state: OverallState, config: RunnableConfig):
     try:
         configurable = Configuration.from_runnable_config(config)
 
+        # Merge pipelined stragglers that have finished and stop waiting for the rest
+        research_run_id = state.get("research_run_id", "")
+        late_results = _merge_branch_results(
+            BRANCH_POOL.take_finished(research_run_id), include_queries=False
+        )
+        dropped = BRANCH_POOL.discard(research_run_id)
+        if dropped:
+            GRAPH_LOGGER.info("⏭️ Dropped %s unfinished search branches", dropped)
+        is_partial = bool(
+            state.get("is_partial")
+            or late_results["is_partial"]
+            or (dropped and _out_of_research_time(state.get("deadline"), configurable))
+        )
+        search_cache = _search_cache(configurable)
+        if search_cache is not None:
+            GRAPH_LOGGER.info("🔮 Search cache stats: %s", search_cache.stats())
+        web_research_results = add_research_results(
+            state.get("web_research_result", []), late_results["web_research_result"]
+        )
+        sources_gathered = add_sources(
+            state.get("sources_gathered", []), late_results["sources_gathered"]
+        )
+
         research_topic = get_research_topic(state["messages"])
-        summaries_count = len(state.get("web_research_result", []))
-        sources_count = len(state.get("sources_gathered", []))
+        summaries_count = len(web_research_results)
+        sources_count = len(sources_gathered)
 
         GRAPH_LOGGER.info(
-            f"📊 Finalizing answer with {summaries_count} summaries and {sources_count} sources"
+            "📊 Finalizing answer with %s summaries and %s sources",
+            summaries_count,
+            sources_count,
         )
-        GRAPH_LOGGER.debug(f"📝 Research topic: {research_topic[:100]}...")
+        GRAPH_LOGGER.debug("📝 Research topic: %.100s...", research_topic)
 
         # Format the prompt
         current_date = get_current_date()
         formatted_prompt = answer_instructions.format(
             current_date=current_date,
             research_topic=research_topic,
-            summaries="\n---\n\n".join(state["web_research_result"]),
-        )
-
-        llm = get_llm_model(
-            configurable.model_type,
-            max_retries=2,
-            temperature=0.7,
-        )
-
-        log_api_call(
-            GRAPH_LOGGER,
-            "ChatModel",
-            "INIT",
-            f"Type: {configurable.model_type}",
+            summaries="\n---\n\n".join(web_research_results),
         )
 
         GRAPH_LOGGER.info("🤖 Calling LLM for final answer generation...")
-        result = llm.invoke(formatted_prompt)
+        try:
+            answer = _call_llm(
+                "finalize_answer",
+                configurable,
+                state.get("deadline"),
+                0.7,
+                lambda llm: llm.invoke(formatted_prompt),
+            ).content
+        except TimeoutError as e:
+            GRAPH_LOGGER.warning(
+                "⏱️ No time left for the final answer (%s), returning the gathered summaries",
+                e,
+            )
+            answer = _best_effort_report(web_research_results)
+            is_partial = True
 
         # 결과 로깅
-        answer_length = len(result.content) if hasattr(result, "content") else 0
-        GRAPH_LOGGER.info(f"✅ Final answer generated ({answer_length} characters)")
+        answer_length = len(answer)
+        GRAPH_LOGGER.info("✅ Final answer generated (%s characters)", answer_length)
 
         log_graph_transition(
             GRAPH_LOGGER,
@@ -505,6 +1322,7 @@ def finalize_answer(state: OverallState, config: RunnableConfig):
                 "answer_length": answer_length,
                 "summaries_used": summaries_count,
                 "sources_used": sources_count,
+                "is_partial": is_partial,
             },
         )
 
@@ -516,9 +1334,13 @@ def finalize_answer(state: OverallState, config: RunnableConfig):
         #         )
         #         unique_sources.append(source)
 
+        # Only the stragglers are new; the channel reducers append them
         return {
-            "messages": [AIMessage(content=result.content)],
-            "sources_gathered": state["sources_gathered"],
+            "messages": [AIMessage(content=answer)],
+            "sources_gathered": late_results["sources_gathered"],
+            "web_research_result": late_results["web_research_result"],
+            "is_partial": is_partial,
+            "token_usage": late_results["token_usage"],
         }
 
     except Exception as e:
@@ -533,11 +1355,8 @@ def finalize_answer(state: OverallState, config: RunnableConfig):
         )
         # 에러 발생 시 기본 답변 반환
         error_message = f"최종 답변 생성 중 오류가 발생했습니다: {str(e)}"
-        GRAPH_LOGGER.warning(f"⚠️ {error_message}")
-        return {
-            "messages": [AIMessage(content=error_message)],
-            "sources_gathered": state.get("sources_gathered", []),
-        }
+        GRAPH_LOGGER.warning("⚠️ %s", error_message)
+        return {"messages": [AIMessage(content=error_message)], "answer_error": str(e)}
 
 
 # Create our Agent Graph
@@ -546,6 +1365,7 @@ builder = StateGraph(OverallState, config_schema=Configuration)
 # Define the nodes we will cycle between
 builder.add_node("generate_query", generate_query)
 builder.add_node("web_research", web_research)
+builder.add_node("web_research_pipelined", web_research_pipelined)
 builder.add_node("reflection", reflection)
 builder.add_node("finalize_answer", finalize_answer)
 
@@ -554,13 +1374,18 @@ builder.add_node("finalize_answer", finalize_answer)
 builder.add_edge(START, "generate_query")
 # Add conditional edge to continue with search queries in a parallel branch
 builder.add_conditional_edges(
-    "generate_query", continue_to_web_research, ["web_research"]
+    "generate_query",
+    continue_to_web_research,
+    ["web_research", "web_research_pipelined", "reflection"],
 )
 # Reflect on the web research
 builder.add_edge("web_research", "reflection")
+builder.add_edge("web_research_pipelined", "reflection")
 # Evaluate the research
 builder.add_conditional_edges(
-    "reflection", evaluate_research, ["web_research", "finalize_answer"]
+    "reflection",
+    evaluate_research,
+    ["web_research", "web_research_pipelined", "reflection", "finalize_answer"],
 )
 # Finalize the answer
 builder.add_edge("finalize_answer", END)
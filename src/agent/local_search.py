@@ -0,0 +1,472 @@
+"""Search over a local document corpus with a memory-mapped BM25 inverted index.
+
+An index directory holds immutable segments plus a ``manifest.json`` listing
+the segments and the source files they were built from. Indexing only reads
+files that are new or changed since the last run: their documents go to new
+segments, built in parallel by worker processes, and the documents of changed
+or deleted files are marked as deleted in their old segments.
+
+``scripts/local_index.py`` builds and queries an index from the command line.
+"""
+
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterator, Optional
+
+from langchain_core.tools import BaseTool, StructuredTool
+
+from agent.call_policy import call_with_policy, remaining_time
+from agent.configuration import CallPolicy
+from agent.tools_and_schemas import TavilyQuery
+from agent.usage import record_search_call
+from components.logging_config import TOOLS_LOGGER
+
+# BM25 term frequency saturation and document length normalization
+K1 = 1.2
+B = 0.75
+# Text files are split into passages of this many words, one search result each
+PASSAGE_WORDS = 200
+# Files picked up when a directory is indexed
+DOCUMENT_SUFFIXES = (".txt", ".md", ".markdown", ".rst", ".jsonl")
+# Past this many segments a search visits, a rebuild is suggested
+MAX_SEGMENTS = 64
+# Name of the local search tool, recognized by get_sources
+LOCAL_SEARCH_TOOL_NAME = "local_search"
+
+_TOKEN_RE = re.compile(r"\w+")
+_MANIFEST = "manifest.json"
+_FORMAT_VERSION = 1
+
+
+def tokenize(text: str) -> list[str]:
+    """Return the lower-cased word tokens of ``text``."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def read_documents(path: Path) -> Iterator[dict]:
+    """Yield the searchable documents of one corpus file.
+
+    Each line of a ``.jsonl`` file is a document with ``content`` (or ``text``)
+    and optionally ``title`` and ``url``. Other files are split into passages
+    of ``PASSAGE_WORDS`` words titled by the file's first line.
+    """
+    uri = path.resolve().as_uri()
+    if path.suffix == ".jsonl":
+        with open(path, encoding="utf-8") as f:
+            for lineno, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                yield {
+                    "title": record.get("title") or path.stem,
+                    "url": record.get("url") or f"{uri}#L{lineno}",
+                    "content": record.get("content") or record.get("text") or "",
+                }
+        return
+    text = path.read_text(encoding="utf-8", errors="replace")
+    first_line = next((line for line in text.splitlines() if line.strip()), "")
+    title = first_line.strip().lstrip("#").strip()[:200] or path.stem
+    words = text.split()
+    for number, start in enumerate(range(0, len(words), PASSAGE_WORDS)):
+        yield {
+            "title": title,
+            "url": f"{uri}#passage-{number}",
+            "content": " ".join(words[start : start + PASSAGE_WORDS]),
+        }
+
+
+def _write_array(path: Path, values: array) -> None:
+    with open(path, "wb") as f:
+        values.tofile(f)
+
+
+def build_segment(directory: Path, paths: list[str]) -> dict:
+    """Index the files ``paths`` into a new segment at ``directory``.
+
+    Runs in an indexing worker process. The segment is written next to its
+    final location and renamed into place, so readers never see it half done.
+
+    Segment files, all in native byte order:
+      * ``postings.bin``: ``(doc, term frequency)`` uint32 pairs, grouped by term
+      * ``lexicon.json``: term -> ``[offset into postings in uint32s, doc count]``
+      * ``lengths.bin``: uint32 token count per document
+      * ``docs.bin`` / ``offsets.bin``: JSON documents and their uint64 offsets
+
+    Returns:
+        dict: The segment's manifest entry, with the document range of each file
+    """
+    postings: dict[str, array] = {}
+    lengths = array("I")
+    offsets = array("Q", [0])
+    files = {}
+    tmp = directory.with_name(directory.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    with open(tmp / "docs.bin", "wb") as docs:
+        for name in paths:
+            path = Path(name)
+            stat = path.stat()
+            start = len(lengths)
+            for document in read_documents(path):
+                doc_id = len(lengths)
+                tokens = tokenize(f"{document['title']} {document['content']}")
+                for term, tf in Counter(tokens).items():
+                    postings.setdefault(term, array("I")).extend((doc_id, tf))
+                lengths.append(len(tokens))
+                offsets.append(
+                    offsets[-1]
+                    + docs.write(json.dumps(document, ensure_ascii=False).encode())
+                )
+            files[name] = {
+                "mtime_ns": stat.st_mtime_ns,
+                "size": stat.st_size,
+                "docs": [start, len(lengths)],
+            }
+    lexicon = {}
+    with open(tmp / "postings.bin", "wb") as f:
+        position = 0
+        for term in sorted(postings):
+            pairs = postings[term]
+            lexicon[term] = [position, len(pairs) // 2]
+            pairs.tofile(f)
+            position += len(pairs)
+    _write_array(tmp / "lengths.bin", lengths)
+    _write_array(tmp / "offsets.bin", offsets)
+    (tmp / "lexicon.json").write_text(
+        json.dumps(lexicon, ensure_ascii=False), encoding="utf-8"
+    )
+    os.replace(tmp, directory)
+    return {
+        "name": directory.name,
+        "docs": len(lengths),
+        "total_length": sum(lengths),
+        "deleted": [],
+        "files": files,
+    }
+
+
+def _corpus_files(sources: list[Path]) -> list[Path]:
+    files = []
+    for source in sources:
+        if source.is_dir():
+            files.extend(
+                p
+                for p in sorted(source.rglob("*"))
+                if p.suffix in DOCUMENT_SUFFIXES and p.is_file()
+            )
+        else:
+            files.append(source)
+    return [p.resolve() for p in files]
+
+
+def _load_manifest(index_dir: Path) -> dict:
+    path = index_dir / _MANIFEST
+    if not path.exists():
+        return {
+            "version": _FORMAT_VERSION,
+            "byteorder": sys.byteorder,
+            "next_segment": 0,
+            "segments": [],
+        }
+    manifest = json.loads(path.read_text(encoding="utf-8"))
+    if manifest.get("version") != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported local index version in {path}")
+    if manifest.get("byteorder") != sys.byteorder:
+        raise ValueError(f"{path} was built on a {manifest['byteorder']}-endian host")
+    return manifest
+
+
+def _save_manifest(index_dir: Path, manifest: dict) -> None:
+    tmp = index_dir / (_MANIFEST + ".tmp")
+    tmp.write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    os.replace(tmp, index_dir / _MANIFEST)
+
+
+def _delete_file(segment: dict, name: str, entry: dict) -> None:
+    """Mark the documents of a re-indexed or removed file as deleted."""
+    start, end = entry["docs"]
+    segment["deleted"].extend(range(start, end))
+    del segment["files"][name]
+
+
+def _live_segments(segments: list) -> tuple[list, list]:
+    live, dead = [], []
+    for segment in segments:
+        (live if len(segment["deleted"]) < segment["docs"] else dead).append(segment)
+    return live, dead
+
+
+def _split_by_size(paths: list[Path], parts: int) -> list[list[str]]:
+    """Deal files into ``parts`` groups of roughly equal total size."""
+    groups = [[] for _ in range(max(1, min(parts, len(paths))))]
+    sizes = [0] * len(groups)
+    for path in sorted(paths, key=lambda p: p.stat().st_size, reverse=True):
+        smallest = sizes.index(min(sizes))
+        groups[smallest].append(str(path))
+        sizes[smallest] += path.stat().st_size
+    return [group for group in groups if group]
+
+
+def build_index(
+    sources: list[Path],
+    index_dir: Path,
+    workers: Optional[int] = None,
+    rebuild: bool = False,
+) -> dict:
+    """Add new and changed corpus files under ``sources`` to the index.
+
+    Files whose size and modification time match the manifest are skipped.
+    Documents of changed or deleted files are marked deleted in their old
+    segments. New documents are split across ``workers`` processes (default:
+    one per core), each writing its own segment. ``rebuild`` starts over from
+    an empty index, which also drops deleted documents from disk.
+
+    Returns:
+        dict: Counts of indexed, unchanged and removed files and of documents
+    """
+    if rebuild:
+        shutil.rmtree(index_dir, ignore_errors=True)
+    index_dir.mkdir(parents=True, exist_ok=True)
+    manifest = _load_manifest(index_dir)
+    files = _corpus_files(sources)
+    indexed = {
+        name: (segment, entry)
+        for segment in manifest["segments"]
+        for name, entry in segment["files"].items()
+    }
+
+    changed = []
+    for path in files:
+        segment, entry = indexed.pop(str(path), (None, None))
+        stat = path.stat()
+        if entry is not None and (entry["mtime_ns"], entry["size"]) == (
+            stat.st_mtime_ns,
+            stat.st_size,
+        ):
+            continue
+        changed.append(path)
+        if entry is not None:
+            _delete_file(segment, str(path), entry)
+    # Whatever is left was indexed before but no longer exists
+    removed = [name for name in indexed if not Path(name).exists()]
+    for name in removed:
+        _delete_file(indexed[name][0], name, indexed[name][1])
+
+    groups = _split_by_size(changed, workers or os.cpu_count() or 1)
+    directories = []
+    for _ in groups:
+        directories.append(index_dir / f"seg-{manifest['next_segment']:06d}")
+        manifest["next_segment"] += 1
+    if len(groups) > 1:
+        with ProcessPoolExecutor(max_workers=len(groups)) as executor:
+            segments = list(executor.map(build_segment, directories, groups))
+    else:
+        segments = [build_segment(d, g) for d, g in zip(directories, groups)]
+    manifest["segments"].extend(segments)
+    # Segments left without live documents are dropped from the manifest
+    manifest["segments"], dead = _live_segments(manifest["segments"])
+    _save_manifest(index_dir, manifest)
+    for segment in dead:
+        shutil.rmtree(index_dir / segment["name"], ignore_errors=True)
+
+    stats = {
+        "files_indexed": len(changed),
+        "files_unchanged": len(files) - len(changed),
+        "files_removed": len(removed),
+        "documents_added": sum(segment["docs"] for segment in segments),
+        "segments": len(manifest["segments"]),
+    }
+    TOOLS_LOGGER.info("🗂️ Local index %s updated: %s", index_dir, stats)
+    if len(manifest["segments"]) > MAX_SEGMENTS:
+        TOOLS_LOGGER.warning(
+            "⚠️ Local index %s has %s segments, rebuild it to speed up searches",
+            index_dir,
+            len(manifest["segments"]),
+        )
+    return stats
+
+
+def _map(path: Path) -> memoryview:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return memoryview(b"")
+        # The mapping stays valid after the file is closed
+        return memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+class _Segment:
+    """A read-only segment with its postings, lengths and documents memory-mapped."""
+
+    def __init__(self, directory: Path, entry: dict):
+        self.docs = entry["docs"]
+        self.deleted = frozenset(entry["deleted"])
+        self.lexicon = json.loads(
+            (directory / "lexicon.json").read_text(encoding="utf-8")
+        )
+        self._postings = _map(directory / "postings.bin").cast("I")
+        self.lengths = _map(directory / "lengths.bin").cast("I")
+        self._offsets = _map(directory / "offsets.bin").cast("Q")
+        self._documents = _map(directory / "docs.bin")
+
+    def doc_count(self, term: str) -> int:
+        """Return the number of documents containing ``term``, deleted ones included."""
+        entry = self.lexicon.get(term)
+        return entry[1] if entry else 0
+
+    def postings(self, term: str) -> memoryview:
+        """Return the flat ``doc, tf, doc, tf...`` postings of ``term``."""
+        entry = self.lexicon.get(term)
+        if not entry:
+            return memoryview(array("I"))
+        offset, count = entry
+        return self._postings[offset : offset + 2 * count]
+
+    def document(self, doc_id: int) -> dict:
+        """Return the stored document ``doc_id``."""
+        start, end = self._offsets[doc_id], self._offsets[doc_id + 1]
+        return json.loads(bytes(self._documents[start:end]))
+
+
+class LocalIndex:
+    """BM25 search over the segments of an index directory.
+
+    Segment files are memory-mapped, so opening an index reads only the
+    manifest and the term lexicons, and searches page in just the postings of
+    the query terms. Document frequencies are summed over segments and, like
+    in most segmented indexes, still count deleted documents until a rebuild.
+    """
+
+    def __init__(self, index_dir: Path):
+        """Open the index at ``index_dir``.
+
+        Raises:
+            FileNotFoundError: If no index has been built there.
+        """
+        path = index_dir / _MANIFEST
+        if not path.exists():
+            raise FileNotFoundError(f"No local search index at {index_dir}")
+        self.index_dir = index_dir
+        self.version = path.stat().st_mtime_ns
+        manifest = _load_manifest(index_dir)
+        self.segments = [
+            _Segment(index_dir / entry["name"], entry) for entry in manifest["segments"]
+        ]
+        self.doc_count = sum(s.docs - len(s.deleted) for s in self.segments)
+        total_length = sum(
+            entry["total_length"] - sum(segment.lengths[d] for d in segment.deleted)
+            for entry, segment in zip(manifest["segments"], self.segments)
+        )
+        self.avg_length = total_length / self.doc_count if self.doc_count else 0.0
+
+    def search(self, query: str, max_results: int = 5) -> list[dict]:
+        """Return the ``max_results`` best documents for ``query`` by BM25 score.
+
+        Returns:
+            list: Documents with ``title``, ``url``, ``content`` and ``score``
+        """
+        scores: dict[tuple, float] = {}
+        for term in set(tokenize(query)):
+            df = sum(segment.doc_count(term) for segment in self.segments)
+            if not df:
+                continue
+            idf = math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+            for number, segment in enumerate(self.segments):
+                postings = segment.postings(term)
+                lengths, deleted = segment.lengths, segment.deleted
+                for doc_id, tf in zip(postings[0::2], postings[1::2]):
+                    if doc_id in deleted:
+                        continue
+                    norm = K1 * (1 - B + B * lengths[doc_id] / self.avg_length)
+                    key = (number, doc_id)
+                    scores[key] = scores.get(key, 0.0) + idf * tf * (K1 + 1) / (
+                        tf + norm
+                    )
+        best = heapq.nlargest(max_results, scores.items(), key=itemgetter(1))
+        return [
+            {
+                **self.segments[number].document(doc_id),
+                "score": round(score, 4),
+                "raw_content": None,
+            }
+            for (number, doc_id), score in best
+        ]
+
+
+_INDEXES: dict[str, LocalIndex] = {}
+_INDEXES_LOCK = threading.Lock()
+
+
+def get_local_index(index_path: str) -> LocalIndex:
+    """Return the process-wide index at ``index_path``, reopened after re-indexing."""
+    index_dir = Path(index_path).resolve()
+    manifest = index_dir / _MANIFEST
+    with _INDEXES_LOCK:
+        index = _INDEXES.get(str(index_dir))
+        if (
+            index is None
+            or not manifest.exists()
+            or index.version != manifest.stat().st_mtime_ns
+        ):
+            index = _INDEXES[str(index_dir)] = LocalIndex(index_dir)
+        return index
+
+
+def search_local(
+    query: str,
+    index_path: str,
+    max_results: int = 5,
+    policy: Optional[CallPolicy] = None,
+    deadline: Optional[float] = None,
+) -> dict:
+    """Search the local index under a call policy.
+
+    Returns:
+        dict: A response shaped like Tavily's, with ``query`` and ``results`` keys
+    """
+    left = remaining_time(deadline)
+    if left is not None and left <= 0:
+        return {"query": query, "results": [], "error": "deadline exceeded"}
+    record_search_call()
+    start = time.monotonic()
+    results = call_with_policy(
+        "local_search",
+        lambda: get_local_index(index_path).search(query, max_results),
+        policy=policy,
+        deadline=deadline,
+    )
+    return {
+        "query": query,
+        "results": results,
+        "response_time": round(time.monotonic() - start, 4),
+    }
+
+
+def make_local_search_tool(
+    index_path: str,
+    policy: Optional[CallPolicy] = None,
+    deadline: Optional[float] = None,
+    max_results: int = 5,
+) -> BaseTool:
+    """Create a ``local_search`` tool over the index at ``index_path``."""
+    return StructuredTool.from_function(
+        func=lambda query: search_local(
+            query, index_path, max_results, policy, deadline
+        ),
+        name=LOCAL_SEARCH_TOOL_NAME,
+        description="A search engine over the local document corpus. "
+        "Input should be a search query.",
+        args_schema=TavilyQuery,
+    )
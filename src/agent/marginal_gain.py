@@ -0,0 +1,79 @@
+"""Marginal information gain of a research loop."""
+
+import re
+from typing import Iterable
+
+from agent.reducers import appended_count, duplicate_count
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def ngrams(texts: Iterable[str], size: int = 3) -> set:
+    """Return the set of lower-cased word ``size``-grams found in ``texts``."""
+    grams = set()
+    for text in texts:
+        words = _WORD_RE.findall(text.lower())
+        grams.update(
+            tuple(words[idx : idx + size]) for idx in range(len(words) - size + 1)
+        )
+    return grams
+
+
+def measure_gain(
+    summaries: list,
+    sources: list,
+    seen_summaries: int,
+    seen_sources: int,
+    loop: int,
+    ngram_size: int = 3,
+    seen_duplicate_sources: int = 0,
+) -> dict:
+    """Measure how much the research results after the seen prefix add.
+
+    Two signals are combined with equal weight: the share of this loop's
+    source URLs that no earlier loop returned, and the share of this loop's
+    summary n-grams that do not occur in any earlier summary. Sources the
+    state dropped as duplicates count as this loop's repeated URLs.
+
+    The ``seen`` counts are totals of appended items, so results evicted from
+    the state since the last loop shift the split but not the count of new
+    results, which are always the last ones.
+
+    Args:
+        summaries: All web research summaries so far, in arrival order.
+        sources: All gathered sources so far, in arrival order.
+        seen_summaries: How many summaries earlier loops already produced.
+        seen_sources: How many sources earlier loops already produced.
+        loop: The research loop the new results belong to.
+        ngram_size: The n-gram length used to compare summary content.
+        seen_duplicate_sources: How many duplicate sources earlier loops dropped.
+
+    Returns:
+        dict: The gain record, including ``gain`` in ``[0, 1]`` and the totals
+        the next loop has to treat as seen.
+    """
+    new_results = min(len(summaries), appended_count(summaries) - seen_summaries)
+    split = len(sources) - min(len(sources), appended_count(sources) - seen_sources)
+    old_urls = {source["value"] for source in sources[:split]}
+    new_urls = {source["value"] for source in sources[split:]}
+    unique_urls = new_urls - old_urls
+    repeated = duplicate_count(sources) - seen_duplicate_sources
+    offered = len(new_urls) + repeated
+    url_novelty = len(unique_urls) / offered if offered else 0.0
+
+    split = len(summaries) - new_results
+    new_grams = ngrams(summaries[split:], ngram_size)
+    old_grams = ngrams(summaries[:split], ngram_size)
+    content_novelty = len(new_grams - old_grams) / len(new_grams) if new_grams else 0.0
+
+    return {
+        "loop": loop,
+        "new_results": new_results,
+        "new_unique_urls": len(unique_urls),
+        "url_novelty": round(url_novelty, 4),
+        "content_novelty": round(content_novelty, 4),
+        "gain": round((url_novelty + content_novelty) / 2, 4),
+        "total_results": appended_count(summaries),
+        "total_sources": appended_count(sources),
+        "total_duplicate_sources": duplicate_count(sources),
+    }
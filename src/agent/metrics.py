@@ -0,0 +1,342 @@
+"""Metrics registry rendered in the Prometheus text exposition format."""
+
+import bisect
+import logging
+import math
+import threading
+from typing import Callable, Iterable, Iterator
+
+from agent.admission import ADMISSION
+from agent.pipeline import BRANCH_POOL, RUNNING_BRANCHES
+from agent.search_cache import search_caches
+from components.logging_config import LATENCY_BUCKETS_MS, span_histograms
+
+logger = logging.getLogger(__name__)
+
+# Content type of the text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Histogram bucket bounds in seconds, the same as the span histograms
+LATENCY_BUCKETS_S = tuple(bound / 1000 for bound in LATENCY_BUCKETS_MS)
+
+
+def _escape(value: object) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+class Metric:
+    """A metric family with one value per combination of label values.
+
+    Updates take a single lock held for a dictionary update, so metrics can be
+    updated on every call.
+    """
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        """Create a metric family called ``name`` with the given label names."""
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterator[tuple[str, tuple, tuple, float]]:
+        """Yield ``(suffix, label names, label values, value)`` of every sample."""
+        with self._lock:
+            values = list(self._values.items())
+        for key, value in values:
+            yield "", self.labelnames, key, value
+
+    def render(self) -> list[str]:
+        """Return the exposition lines of the family."""
+        lines = [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, names, values, value in self.samples():
+            labels = _format_labels(names, values)
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        """Add ``amount`` to the counter of the given labels."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(Metric):
+    """A value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: object) -> None:
+        """Set the gauge of the given labels to ``value``."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Counts of observations in cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS_S,
+    ):
+        """Create a histogram family with the given upper bucket bounds."""
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        """Record one observation for the given labels."""
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), sum, count
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def add_counts(
+        self, counts: list, total: float, count: int, **labels: object
+    ) -> None:
+        """Set a series from per-bucket counts collected elsewhere."""
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = [list(counts), total, count]
+
+    def samples(self) -> Iterator[tuple[str, tuple, tuple, float]]:
+        """Yield the cumulative buckets, sum and count of every series."""
+        with self._lock:
+            series = [
+                (key, list(counts), total, n)
+                for key, (counts, total, n) in self._series.items()
+            ]
+        names = self.labelnames + ("le",)
+        for key, counts, total, count in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                le = "+Inf" if math.isinf(bound) else _format_value(float(bound))
+                yield "_bucket", names, key + (le,), cumulative
+            yield "_sum", self.labelnames, key, float(total)
+            yield "_count", self.labelnames, key, count
+
+
+class MetricsRegistry:
+    """The metrics of the process plus collectors that read state at scrape time.
+
+    Metrics created through the registry are updated where the events happen.
+    Collectors return freshly built metrics on every scrape, for state that is
+    already tracked elsewhere (queues, caches, span histograms).
+    """
+
+    def __init__(self):
+        """Create an empty registry."""
+        self._lock = threading.Lock()
+        self._metrics: list[Metric] = []
+        self._collectors: list[Callable[[], Iterable[Metric]]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        """Add ``metric`` to the registry and return it."""
+        with self._lock:
+            if any(m.name == metric.name for m in self._metrics):
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        """Create and register a counter."""
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple = ()) -> Gauge:
+        """Create and register a gauge."""
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = LATENCY_BUCKETS_S,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collect: Callable[[], Iterable[Metric]]) -> None:
+        """Call ``collect`` on every scrape and expose the metrics it returns."""
+        with self._lock:
+            self._collectors.append(collect)
+
+    def render(self) -> str:
+        """Return every metric in the text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics)
+            collectors = list(self._collectors)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collect in collectors:
+            try:
+                collected = list(collect())
+            except Exception:
+                # One broken collector must not take the whole scrape down
+                logger.exception("Metrics collector %s failed", collect)
+                continue
+            for metric in collected:
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _collect_spans() -> Iterator[Metric]:
+    """Node and outbound-call latencies and errors from the span histograms."""
+    families = {
+        "node": (
+            Histogram("agent_node_duration_seconds", "Graph node latency.", ("node",)),
+            Counter(
+                "agent_node_errors_total",
+                "Graph node executions that raised.",
+                ("node",),
+            ),
+        ),
+        "call": (
+            Histogram(
+                "agent_call_duration_seconds",
+                "Outbound LLM and search call latency, retries included.",
+                ("call",),
+            ),
+            Counter(
+                "agent_call_errors_total",
+                "Outbound LLM and search calls that failed after all retries.",
+                ("call",),
+            ),
+        ),
+    }
+    for name, histogram in span_histograms().items():
+        kind, _, label = name.partition(".")
+        if kind not in families or tuple(histogram.bounds_ms) != LATENCY_BUCKETS_MS:
+            continue
+        durations, errors = families[kind]
+        durations.add_counts(
+            histogram.counts, histogram.sum_ms / 1000, histogram.count, **{kind: label}
+        )
+        errors.inc(histogram.errors, **{kind: label})
+    for durations, errors in families.values():
+        yield durations
+        yield errors
+
+
+def _collect_search_caches() -> Iterator[Metric]:
+    """Lookups, hits and prefetches of the process-wide search caches."""
+    label = ("cache",)
+    counters = {
+        name: Counter(f"agent_search_cache_{name}_total", documentation, label)
+        for name, documentation in (
+            ("hits", "Search cache lookups answered from the cache."),
+            ("misses", "Search cache lookups that had to search."),
+            ("prefetches", "Speculative searches started."),
+            ("speculative_hits", "Lookups answered by a speculative search."),
+            ("wasted_prefetches", "Speculative searches that expired unused."),
+        )
+    }
+    entries = Gauge("agent_search_cache_entries", "Live search cache entries.", label)
+    hit_ratio = Gauge(
+        "agent_search_cache_hit_ratio",
+        "Share of lookups answered from the cache.",
+        label,
+    )
+    for (ttl_s, similarity), cache in search_caches().items():
+        stats = cache.stats()
+        cache_label = f"ttl={ttl_s:g},similarity={similarity:g}"
+        for name, counter in counters.items():
+            counter.inc(stats.get(name, 0), cache=cache_label)
+        entries.set(stats["entries"], cache=cache_label)
+        hit_ratio.set(stats["hit_rate"], cache=cache_label)
+    yield from counters.values()
+    yield entries
+    yield hit_ratio
+
+
+def _collect_load() -> Iterator[Metric]:
+    """Admission queue depth and research branches in flight."""
+    admission = ADMISSION.stats()
+    running = Gauge("agent_admission_running_runs", "Research runs holding a slot.")
+    running.set(admission["running"])
+    queued = Gauge(
+        "agent_admission_queued_runs",
+        "Research runs waiting for a slot.",
+        ("priority",),
+    )
+    for priority, count in admission["queued"].items():
+        queued.set(count, priority=priority)
+    rejected = Counter(
+        "agent_admission_rejected_total", "Research runs rejected by a full queue."
+    )
+    rejected.inc(admission["rejected"])
+    yield from (running, queued, rejected)
+
+    in_flight = Gauge(
+        "agent_branches_in_flight",
+        "Research branches running a search, as graph steps or in the branch pool.",
+    )
+    in_flight.set(RUNNING_BRANCHES.running)
+    branches = BRANCH_POOL.stats()
+    pooled = Gauge(
+        "agent_branch_pool_in_flight",
+        "Research branches queued or running in the background branch pool.",
+    )
+    pooled.set(branches["in_flight"])
+    tracked = Gauge(
+        "agent_branches_tracked",
+        "Straggler and prefetched branches not yet collected.",
+        ("kind",),
+    )
+    tracked.set(branches["stragglers"], kind="straggler")
+    tracked.set(branches["prefetched"], kind="prefetched")
+    yield from (in_flight, pooled, tracked)
+
+
+REGISTRY.register_collector(_collect_spans)
+REGISTRY.register_collector(_collect_search_caches)
+REGISTRY.register_collector(_collect_load)
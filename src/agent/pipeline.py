@@ -0,0 +1,222 @@
+"""Background execution of research branches with quorum-based collection."""
+
+import contextvars
+import math
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Any, Callable, Hashable, Iterator, List, Optional, Tuple
+
+
+class BranchPool:
+    """Run research branches in the background and hand back whatever has finished.
+
+    Branches are tracked per research run. A caller waits for a quorum of its
+    branches (or a deadline), keeps the finished results, and leaves the rest
+    registered as stragglers; later nodes of the same run pick them up with
+    ``take_finished`` instead of waiting for them.
+
+    Branches can also be started ahead of the node that owns them with
+    ``prefetch``; that node then ``claim``s the running future instead of
+    starting the same search again.
+
+    A run that ends without reaching ``discard`` (e.g. it crashed between
+    nodes) would keep its branches tracked forever, so the branches of runs
+    that registered nothing for ``run_ttl_s`` are discarded.
+    """
+
+    def __init__(self, max_workers: int = 32, run_ttl_s: float = 3600.0):
+        """Create a pool running at most ``max_workers`` branches at once."""
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="research-branch"
+        )
+        self.run_ttl_s = run_ttl_s
+        self._lock = threading.Lock()
+        self._stragglers: dict[str, List[Future]] = {}
+        self._prefetched: dict[str, dict[Hashable, Future]] = {}
+        # Monotonic time each tracked run last registered a branch
+        self._touched: dict[str, float] = {}
+        # Separate lock: submit is also called while holding ``_lock``
+        self._in_flight_lock = threading.Lock()
+        self._in_flight = 0
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Start ``fn(*args)`` in the pool with the caller's context variables."""
+        context = contextvars.copy_context()
+        with self._in_flight_lock:
+            self._in_flight += 1
+        future = self._executor.submit(context.run, fn, *args)
+        future.add_done_callback(self._branch_done)
+        return future
+
+    def _branch_done(self, future: Future) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+    @staticmethod
+    def wait_for_quorum(
+        futures: List[Future], quorum: float, deadline_s: float
+    ) -> Tuple[List[Future], List[Future]]:
+        """Wait until ``quorum`` of ``futures`` are done or ``deadline_s`` has passed.
+
+        At least one branch is always waited for, so a run never proceeds with
+        nothing to reflect on.
+
+        Returns:
+            tuple: The finished futures and the still pending ones.
+        """
+        needed = max(1, math.ceil(len(futures) * quorum))
+        deadline = time.monotonic() + deadline_s
+        done, pending = set(), set(futures)
+        while pending and len(done) < needed:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and done:
+                break
+            finished, pending = wait(
+                pending,
+                timeout=remaining if remaining > 0 else None,
+                return_when=FIRST_COMPLETED,
+            )
+            done |= finished
+        ordered_done = [future for future in futures if future in done]
+        ordered_pending = [future for future in futures if future in pending]
+        return ordered_done, ordered_pending
+
+    def add_stragglers(self, run_id: str, futures: List[Future]) -> None:
+        """Register unfinished branches of a run for later collection."""
+        if not futures:
+            return
+        with self._lock:
+            self._stragglers.setdefault(run_id, []).extend(futures)
+            expired = self._touch(run_id)
+        self._cancel(expired)
+
+    def take_finished(self, run_id: str) -> List[Any]:
+        """Remove and return the results of the run's stragglers that have finished."""
+        with self._lock:
+            futures = self._stragglers.get(run_id, [])
+            finished = [future for future in futures if future.done()]
+            remaining = [future for future in futures if not future.done()]
+            if remaining:
+                self._stragglers[run_id] = remaining
+            else:
+                self._stragglers.pop(run_id, None)
+                self._forget_if_untracked(run_id)
+        return [
+            future.result()
+            for future in finished
+            if not future.cancelled() and future.exception() is None
+        ]
+
+    def prefetch(
+        self, run_id: str, key: Hashable, fn: Callable[..., Any], *args: Any
+    ) -> Future:
+        """Start ``fn(*args)`` early for ``key`` unless it was already started."""
+        with self._lock:
+            prefetched = self._prefetched.setdefault(run_id, {})
+            if key not in prefetched:
+                prefetched[key] = self.submit(fn, *args)
+            future = prefetched[key]
+            expired = self._touch(run_id)
+        self._cancel(expired)
+        return future
+
+    def claim(self, run_id: str, key: Hashable) -> Optional[Future]:
+        """Remove and return the prefetched branch for ``key``, if any."""
+        with self._lock:
+            prefetched = self._prefetched.get(run_id, {})
+            future = prefetched.pop(key, None)
+            if not prefetched:
+                self._prefetched.pop(run_id, None)
+                self._forget_if_untracked(run_id)
+        return future
+
+    def pending_count(self, run_id: str) -> int:
+        """Return how many stragglers of a run are still running."""
+        with self._lock:
+            return len(self._stragglers.get(run_id, []))
+
+    def discard(self, run_id: str) -> int:
+        """Forget the run's stragglers and unclaimed prefetches, cancelling those not yet started."""
+        with self._lock:
+            futures = self._untrack(run_id)
+        self._cancel(futures)
+        return len(futures)
+
+    def _untrack(self, run_id: str) -> List[Future]:
+        """Forget a run, returning its futures; call while holding ``_lock``."""
+        self._touched.pop(run_id, None)
+        futures = self._stragglers.pop(run_id, [])
+        futures += self._prefetched.pop(run_id, {}).values()
+        return futures
+
+    def _forget_if_untracked(self, run_id: str) -> None:
+        if run_id not in self._stragglers and run_id not in self._prefetched:
+            self._touched.pop(run_id, None)
+
+    def _touch(self, run_id: str) -> List[Future]:
+        """Mark a run as active and untrack the expired ones, returning their futures.
+
+        Call while holding ``_lock``; cancel the returned futures after releasing it.
+        """
+        now = time.monotonic()
+        self._touched[run_id] = now
+        expired = []
+        for stale_id, touched in list(self._touched.items()):
+            if now - touched > self.run_ttl_s:
+                expired += self._untrack(stale_id)
+        return expired
+
+    @staticmethod
+    def _cancel(futures: List[Future]) -> None:
+        for future in futures:
+            future.cancel()
+
+    def stats(self) -> dict:
+        """Return the number of queued or running branches and of tracked ones."""
+        with self._lock:
+            stragglers = sum(len(futures) for futures in self._stragglers.values())
+            prefetched = sum(len(futures) for futures in self._prefetched.values())
+        with self._in_flight_lock:
+            in_flight = self._in_flight
+        return {
+            "in_flight": in_flight,
+            "stragglers": stragglers,
+            "prefetched": prefetched,
+        }
+
+
+class BranchCounter:
+    """Count the research branches running a search right now.
+
+    Branches run as graph steps or in a ``BranchPool``, so neither the graph
+    nor the pool sees all of them; each branch is counted where it searches.
+    """
+
+    def __init__(self):
+        """Create a counter with no branch running."""
+        self._lock = threading.Lock()
+        self._running = 0
+
+    @contextmanager
+    def track(self) -> Iterator[None]:
+        """Count a branch as running until the block exits."""
+        with self._lock:
+            self._running += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    @property
+    def running(self) -> int:
+        """The number of branches inside ``track``."""
+        with self._lock:
+            return self._running
+
+
+BRANCH_POOL = BranchPool(run_ttl_s=float(os.getenv("RESEARCH_BRANCH_TTL_S", "3600")))
+RUNNING_BRANCHES = BranchCounter()
@@ -0,0 +1,66 @@
+"""Chat model wrapper that runs every model turn under a call policy."""
+
+import contextvars
+from typing import Any, Callable, List, Optional
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables.config import var_child_runnable_config
+from pydantic import ConfigDict
+
+from agent.usage import unmetered
+
+
+class PolicyChatModel(BaseChatModel):
+    """Chat model that sends each generation through a caller-supplied guard.
+
+    ``call`` receives a function of the underlying chat model and must run it,
+    e.g. under a call policy with model failover. Wrapping the model of a ReAct
+    agent this way puts every model turn under the policy on its own, instead
+    of retrying the whole agent run with its tool calls.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    call: Callable[[Callable[[Any], Any]], Any]
+    tools: Optional[list] = None
+    tool_kwargs: dict = {}
+
+    @property
+    def _llm_type(self) -> str:
+        return "policy"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "PolicyChatModel":
+        """Remember the tools; they are bound on each model the guard hands out."""
+        return self.model_copy(update={"tools": list(tools), "tool_kwargs": kwargs})
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Any = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        def invoke(llm: Any) -> BaseMessage:
+            runnable = llm
+            if self.tools is not None:
+                runnable = runnable.bind_tools(self.tools, **self.tool_kwargs)
+            if stop or kwargs:
+                runnable = runnable.bind(stop=stop, **kwargs)
+            # This model's own run reports the token usage. Bindings such as
+            # the one of ``bind_tools`` merge in the callbacks of the enclosing
+            # run, so the inner call runs without the inherited config at all
+            with unmetered():
+                return contextvars.copy_context().run(
+                    _invoke_detached, runnable, messages
+                )
+
+        message = self.call(invoke)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+def _invoke_detached(runnable: Any, messages: List[BaseMessage]) -> BaseMessage:
+    """Invoke ``runnable`` outside of the runnable config of the calling run."""
+    var_child_runnable_config.set(None)
+    return runnable.invoke(messages)
@@ -0,0 +1,313 @@
+"""On-demand sampling profiler for single research runs, with flame graph output."""
+
+import contextvars
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from components.logging_config import GRAPH_LOGGER
+
+# Where profiles are written
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "logs/profiles"))
+# Seconds between two stack samples
+SAMPLE_INTERVAL_S = float(os.getenv("PROFILE_SAMPLE_INTERVAL_MS", "5")) / 1000
+# Frames kept per sample, counted from the innermost one
+MAX_STACK_DEPTH = 200
+# Seconds after which a profile started by the graph itself is written anyway
+GRAPH_PROFILE_MAX_S = float(os.getenv("PROFILE_MAX_S", "900"))
+
+# The profiler and label path of the block the current context runs in
+_ATTACHMENT: contextvars.ContextVar[Optional[tuple["RunProfiler", tuple]]] = (
+    contextvars.ContextVar("profiler_attachment", default=None)
+)
+
+_UNSAFE_NAME = re.compile(r"[^0-9A-Za-z_.-]")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    name = (
+        f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+    )
+    # ";" separates frames in the folded stack format
+    return name.replace(";", ":")
+
+
+def _fold(frame) -> str:
+    names = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class RunProfiler:
+    """Sample the stacks of the threads working on one research run.
+
+    Threads join the run with ``attach`` while they execute one of its nodes,
+    and record the node's wall and CPU time when they leave. Work a node hands
+    to other threads with a copied context (e.g. outbound calls) joins with
+    ``attach_current``. A background thread samples the attached threads every
+    ``interval_s`` and counts identical stacks, each rooted at the labels its
+    thread is attached with. Threads of other runs are never sampled, so
+    concurrent runs stay out of the profile.
+
+    The counts are written in the folded stack format read by ``flamegraph.pl``,
+    speedscope and most other flame graph viewers.
+    """
+
+    def __init__(
+        self,
+        thread_id: str,
+        interval_s: float = SAMPLE_INTERVAL_S,
+        max_duration_s: Optional[float] = None,
+    ):
+        """Create a stopped profiler for the run ``thread_id``.
+
+        With ``max_duration_s`` the profile is finished by the sampler once it
+        has run that long, for runs whose end is never seen.
+        """
+        self.thread_id = thread_id
+        self.interval_s = interval_s
+        self.max_duration_s = max_duration_s
+        self.stacks: Counter[str] = Counter()
+        self.timings: dict[str, dict] = {}
+        self.samples = 0
+        self.started_at = 0.0
+        self.duration_s = 0.0
+        self.path: Optional[Path] = None
+        self._lock = threading.Lock()
+        self._labels: dict[int, list[tuple]] = {}
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling in a background thread."""
+        self.started_at = time.time()
+        self._sampler = threading.Thread(
+            target=self._run, name=f"profiler-{self.thread_id}", daemon=True
+        )
+        self._sampler.start()
+
+    def stop(self) -> None:
+        """Stop sampling and wait for the sampler thread."""
+        self._stop.set()
+        if (
+            self._sampler is not None
+            and self._sampler is not threading.current_thread()
+        ):
+            self._sampler.join()
+        self.duration_s = time.time() - self.started_at
+
+    @contextmanager
+    def attach(self, label: str, parent: tuple = ()) -> Iterator[dict]:
+        """Sample the calling thread under ``label`` for the ``with`` block.
+
+        The label is nested under the labels the thread is already attached
+        with, or else under ``parent``. Yields a dict that holds the block's
+        ``wall_ms`` and ``cpu_ms`` once the block has finished. CPU time is that
+        of the calling thread only.
+        """
+        ident = threading.get_ident()
+        with self._lock:
+            paths = self._labels.setdefault(ident, [])
+            path = (*(paths[-1] if paths else parent), label)
+            paths.append(path)
+        token = _ATTACHMENT.set((self, path))
+        timing: dict = {}
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield timing
+        finally:
+            _ATTACHMENT.reset(token)
+            timing["wall_ms"] = round((time.perf_counter() - wall) * 1000, 3)
+            timing["cpu_ms"] = round((time.thread_time() - cpu) * 1000, 3)
+            with self._lock:
+                labels = self._labels[ident]
+                labels.pop()
+                if not labels:
+                    del self._labels[ident]
+                totals = self.timings.setdefault(
+                    label, {"calls": 0, "wall_ms": 0.0, "cpu_ms": 0.0}
+                )
+                totals["calls"] += 1
+                totals["wall_ms"] += timing["wall_ms"]
+                totals["cpu_ms"] += timing["cpu_ms"]
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            self._sample()
+            if (
+                self.max_duration_s is not None
+                and time.time() - self.started_at > self.max_duration_s
+            ):
+                GRAPH_LOGGER.warning(
+                    "⏱️ Profile of %s ran for %.0fs without its run ending",
+                    self.thread_id,
+                    self.max_duration_s,
+                )
+                _finish(self)
+                return
+
+    def _sample(self) -> None:
+        with self._lock:
+            roots = {
+                ident: ";".join(paths[-1]) for ident, paths in self._labels.items()
+            }
+        if not roots:
+            return
+        frames = sys._current_frames()
+        for ident, root in roots.items():
+            frame = frames.get(ident)
+            if frame is not None:
+                self.stacks[f"{root};{_fold(frame)}"] += 1
+        self.samples += 1
+
+    def summary(self) -> dict:
+        """Return the run's sampling totals and wall vs CPU time per label."""
+        with self._lock:
+            timings = {
+                label: {
+                    **totals,
+                    "wall_ms": round(totals["wall_ms"], 3),
+                    "cpu_ms": round(totals["cpu_ms"], 3),
+                }
+                for label, totals in self.timings.items()
+            }
+        return {
+            "thread_id": self.thread_id,
+            "started_at": self.started_at,
+            "duration_s": round(self.duration_s, 3),
+            "interval_ms": self.interval_s * 1000,
+            "samples": self.samples,
+            "nodes": timings,
+        }
+
+    def write(self, directory: Path = PROFILE_DIR) -> Path:
+        """Write ``<thread_id>-<time>.folded`` and its ``.json`` summary.
+
+        Returns:
+            Path: The folded stack file
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        stem = f"{_UNSAFE_NAME.sub('_', self.thread_id)}-{int(self.started_at)}"
+        folded = directory / f"{stem}.folded"
+        folded.write_text(
+            "".join(f"{stack} {count}\n" for stack, count in self.stacks.items()),
+            encoding="utf-8",
+        )
+        (directory / f"{stem}.json").write_text(
+            json.dumps(self.summary(), indent=2), encoding="utf-8"
+        )
+        self.path = folded
+        return folded
+
+
+_PROFILERS: dict[str, RunProfiler] = {}
+_PROFILERS_LOCK = threading.Lock()
+
+
+def active_profiler(thread_id: Optional[str]) -> Optional[RunProfiler]:
+    """Return the profiler of the run ``thread_id`` if that run is being profiled."""
+    # Unprofiled runs only pay for this truth test
+    if not _PROFILERS:
+        return None
+    return _PROFILERS.get(thread_id)
+
+
+@contextmanager
+def attach_current(label: str) -> Iterator[None]:
+    """Sample the calling thread under ``label`` if its context is being profiled.
+
+    For threads running work on behalf of an attached thread with a copy of
+    its context, such as the outbound call pool: their samples are rooted at
+    the labels of the thread that handed the work over.
+    """
+    attachment = _ATTACHMENT.get()
+    if attachment is None:
+        yield
+        return
+    profiler, parent = attachment
+    with profiler.attach(label, parent=parent):
+        yield
+
+
+def start_graph_profile(thread_id: str) -> RunProfiler:
+    """Profile ``thread_id`` from inside the graph, for runs no caller profiles.
+
+    The profile is written by ``end_graph_profile`` when the run finishes, or
+    after ``GRAPH_PROFILE_MAX_S`` if it never does.
+    """
+    with _PROFILERS_LOCK:
+        profiler = _PROFILERS.get(thread_id)
+        if profiler is not None:
+            return profiler
+        profiler = RunProfiler(thread_id, max_duration_s=GRAPH_PROFILE_MAX_S)
+        _PROFILERS[thread_id] = profiler
+    profiler.start()
+    return profiler
+
+
+def end_graph_profile(thread_id: Optional[str]) -> None:
+    """Write the profile of ``thread_id`` if the graph itself started it."""
+    profiler = active_profiler(thread_id)
+    if profiler is not None and profiler.max_duration_s is not None:
+        _finish(profiler)
+
+
+def _finish(profiler: RunProfiler) -> None:
+    """Stop ``profiler``, unregister it and write its profile."""
+    profiler.stop()
+    with _PROFILERS_LOCK:
+        if _PROFILERS.get(profiler.thread_id) is not profiler:
+            # Already finished by another thread
+            return
+        del _PROFILERS[profiler.thread_id]
+    try:
+        path = profiler.write()
+    except OSError as e:
+        GRAPH_LOGGER.warning(
+            "⚠️ Could not write the profile of %s: %s", profiler.thread_id, e
+        )
+    else:
+        GRAPH_LOGGER.info(
+            "🔥 Profile of %s written to %s (%s samples)",
+            profiler.thread_id,
+            path,
+            profiler.samples,
+        )
+
+
+@contextmanager
+def profile_run(
+    thread_id: str, enabled: bool = True, caller_label: Optional[str] = None
+) -> Iterator[Optional[RunProfiler]]:
+    """Profile the run ``thread_id`` for the duration of the ``with`` block.
+
+    Graph nodes of the run attach themselves to the profiler. Pass
+    ``caller_label`` to also sample the calling thread, e.g. the Streamlit
+    script thread that renders the run. When ``enabled`` is false nothing is
+    set up and ``None`` is yielded.
+    """
+    if not enabled:
+        yield None
+        return
+    profiler = RunProfiler(thread_id)
+    with _PROFILERS_LOCK:
+        _PROFILERS[thread_id] = profiler
+    profiler.start()
+    try:
+        if caller_label is None:
+            yield profiler
+        else:
+            with profiler.attach(caller_label):
+                yield profiler
+    finally:
+        _finish(profiler)
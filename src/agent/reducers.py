@@ -0,0 +1,194 @@
+"""Bounded, de-duplicating reducers for the research list channels of the graph state."""
+
+import functools
+import logging
+import os
+from typing import Any, Callable, Hashable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from langgraph.channels.binop import BinaryOperatorAggregate
+
+logger = logging.getLogger(__name__)
+
+# Items kept per channel; the oldest are evicted first
+MAX_SEARCH_QUERIES = int(os.getenv("RESEARCH_STATE_MAX_QUERIES", "64"))
+MAX_RESEARCH_RESULTS = int(os.getenv("RESEARCH_STATE_MAX_RESULTS", "64"))
+MAX_SOURCES = int(os.getenv("RESEARCH_STATE_MAX_SOURCES", "256"))
+
+# Short urls of dropped duplicates kept per source, newest first
+MAX_SOURCE_ALIASES = 16
+
+# Query parameters that only track where a click came from
+_TRACKING_PARAMS = frozenset(("fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"))
+
+
+@functools.lru_cache(maxsize=4096)
+def canonical_url(url: str) -> str:
+    """Return ``url`` reduced to the form two links to the same page share.
+
+    The scheme, ``www.``, default ports, fragments, tracking parameters and a
+    trailing slash are dropped, and the remaining query parameters are sorted.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").removeprefix("www.")
+    try:
+        port = parts.port
+    except ValueError:
+        # Malformed ports are kept as they are
+        return url.strip()
+    if port and port not in (80, 443):
+        host = f"{host}:{port}"
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith("utm_") and name.lower() not in _TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") if host else parts.path
+    return urlunsplit(("", host, path, urlencode(query), "")).lstrip("/")
+
+
+class ResearchLog(list):
+    """List value of a bounded research channel.
+
+    Besides the retained items it carries what a merge needs so it only has
+    to look at the update: the keys of the retained items and the count of
+    ``appended`` items (evicted ones included) and of ``duplicates`` dropped.
+    A ``ResearchLogChannel`` keeps the counters across checkpoints; a plain
+    list restarts them from its items.
+    """
+
+    __slots__ = ("appended", "duplicates", "_keys")
+
+    def __init__(self, items: Any = ()):
+        """Create a log holding ``items`` as if they had just been appended."""
+        super().__init__(items)
+        self.appended = len(self)
+        self.duplicates = 0
+        self._keys: Optional[dict] = None
+
+
+def appended_count(values: list) -> int:
+    """Return how many items were ever appended to a channel value."""
+    return getattr(values, "appended", len(values))
+
+
+def duplicate_count(values: list) -> int:
+    """Return how many items a channel value dropped as duplicates."""
+    return getattr(values, "duplicates", 0)
+
+
+def bounded_reducer(
+    limit: int,
+    key: Optional[Callable[[Any], Optional[Hashable]]] = None,
+    on_duplicate: Optional[Callable[[Any, Any], Any]] = None,
+) -> Callable[[list, list], ResearchLog]:
+    """Return a reducer appending updates to a log of at most ``limit`` items.
+
+    The oldest items are evicted once the log is full. With ``key``, an item
+    whose key is already in the log is dropped, or replaces the kept item with
+    ``on_duplicate(kept, item)`` when that is given; items keyed ``None`` are
+    always appended.
+
+    Every merge copies the retained items once, so its cost is bounded by
+    ``limit`` however long the run is.
+    """
+
+    def reduce(left: list, right: list) -> ResearchLog:
+        merged = ResearchLog()
+        merged.extend(left)
+        merged.appended = appended_count(left)
+        merged.duplicates = duplicate_count(left)
+        keys = None
+        if key is not None:
+            # Keys map to the item's append sequence number, so positions
+            # survive evictions from the front
+            keys = getattr(left, "_keys", None)
+            if keys is None:
+                first = merged.appended - len(merged)
+                keys = {key(item): first + idx for idx, item in enumerate(merged)}
+                keys.pop(None, None)
+            else:
+                keys = dict(keys)
+        for item in right:
+            item_key = key(item) if keys is not None else None
+            if item_key is not None and item_key in keys:
+                merged.duplicates += 1
+                if on_duplicate is not None:
+                    position = keys[item_key] - (merged.appended - len(merged))
+                    merged[position] = on_duplicate(merged[position], item)
+                continue
+            if item_key is not None:
+                keys[item_key] = merged.appended
+            merged.append(item)
+            merged.appended += 1
+        overflow = len(merged) - limit
+        if overflow > 0:
+            if keys is not None:
+                for item in merged[:overflow]:
+                    keys.pop(key(item), None)
+            del merged[:overflow]
+            logger.debug("🧹 Evicted %s items over the limit of %s", overflow, limit)
+        merged._keys = keys
+        return merged
+
+    return reduce
+
+
+class ResearchLogChannel(BinaryOperatorAggregate):
+    """State channel of a bounded reducer that checkpoints the log's counters.
+
+    Checkpoint serializers store a ``ResearchLog`` as a plain list, which would
+    restart ``appended`` from the retained items after a resume and let new
+    branch ids collide with evicted ones. The checkpoint therefore holds the
+    items and counters as a dict, and restoring it gives back the full log.
+    Checkpoints holding a plain list are restored as before.
+
+    Used as the annotation of a state key, e.g.
+    ``Annotated[list, ResearchLogChannel(list, add_sources)]``.
+    """
+
+    def checkpoint(self) -> Any:
+        """Return the value to store, with the counters of a ``ResearchLog``."""
+        value = self.value
+        if isinstance(value, ResearchLog):
+            return {
+                "items": list(value),
+                "appended": value.appended,
+                "duplicates": value.duplicates,
+            }
+        return value
+
+    def from_checkpoint(self, checkpoint: Any) -> "ResearchLogChannel":
+        """Restore the channel, rebuilding the ``ResearchLog`` and its counters."""
+        if isinstance(checkpoint, dict) and "items" in checkpoint:
+            log = ResearchLog(checkpoint["items"])
+            log.appended = checkpoint["appended"]
+            log.duplicates = checkpoint["duplicates"]
+            checkpoint = log
+        return super().from_checkpoint(checkpoint)
+
+
+def _source_key(source: dict) -> Optional[str]:
+    url = source.get("value")
+    return canonical_url(url) if url else None
+
+
+def _keep_first_source(kept: dict, duplicate: dict) -> dict:
+    """Keep the first source and remember the duplicate's short url as an alias.
+
+    Summaries cite sources by short url, so the duplicate's citations must
+    still resolve after it is dropped. Only the newest aliases are kept, as
+    older summaries are evicted first.
+    """
+    short_url = duplicate.get("short_url")
+    aliases = kept.get("aliases", [])
+    if not short_url or short_url == kept.get("short_url") or short_url in aliases:
+        return kept
+    return {**kept, "aliases": [short_url, *aliases][:MAX_SOURCE_ALIASES]}
+
+
+add_search_queries = bounded_reducer(MAX_SEARCH_QUERIES)
+add_research_results = bounded_reducer(MAX_RESEARCH_RESULTS, key=lambda text: text)
+add_sources = bounded_reducer(
+    MAX_SOURCES, key=_source_key, on_duplicate=_keep_first_source
+)
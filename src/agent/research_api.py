@@ -0,0 +1,566 @@
+"""Headless research API: start, stream, fetch and cancel graph runs over HTTP."""
+
+import asyncio
+import hashlib
+import json
+import os
+import secrets
+import time
+import uuid
+from typing import Any, AsyncIterator, Literal, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from langchain_core.messages import AIMessageChunk, BaseMessage, HumanMessage
+from pydantic import BaseModel, Field
+
+from agent.admission import ADMISSION, AdmissionController, AdmissionRejected, Ticket
+from agent.configuration import Configuration
+from agent.graph import graph
+from agent.metrics import REGISTRY
+from agent.pipeline import BRANCH_POOL
+from agent.profiling import profile_run
+from agent.usage import merge_usage
+from agent.utils import ThinkTagStreamParser, strip_thinking
+from components.logging_config import API_LOGGER, log_error_with_context, span_stats
+
+# Seconds between keep-alive comments on an idle event stream
+KEEPALIVE_S = 15.0
+# Seconds a finished run stays available for result lookups and stream replays
+RUN_RETENTION_S = 3600.0
+# Nodes whose LLM tokens are forwarded to clients as answer tokens
+ANSWER_NODES = ("finalize_answer",)
+# Seconds a finished answer is reused for identical requests; 0 disables it
+ANSWER_CACHE_TTL_S = float(os.getenv("RESEARCH_ANSWER_CACHE_TTL_S", "300"))
+
+
+class ResearchRequest(BaseModel):
+    """Request body for starting a research run."""
+
+    question: str = Field(description="The research question.")
+    config: dict[str, Any] = Field(
+        default_factory=dict,
+        description="Configurable overrides for the run, e.g. model_type, "
+        "search_type or run_budget_s.",
+    )
+    user_id: Optional[str] = Field(
+        default=None,
+        description="The user the run is accounted to. Runs without one are "
+        "not bound by the per-user limit.",
+    )
+    tenant_id: Optional[str] = Field(
+        default=None,
+        description="The tenant the run is accounted to. Runs without one are "
+        "not bound by the per-tenant limit.",
+    )
+    priority: Literal["interactive", "batch"] = Field(
+        default="interactive",
+        description="Interactive runs are admitted before queued batch runs.",
+    )
+
+
+class RunStatus(BaseModel):
+    """Status and, once finished, result of a research run."""
+
+    run_id: str
+    status: str
+    created_at: float
+    finished_at: Optional[float] = None
+    answer: Optional[str] = None
+    sources: list = Field(default_factory=list)
+    is_partial: bool = False
+    error: Optional[str] = None
+    queue_position: Optional[int] = None
+    queue_wait_s: float = 0.0
+    estimated_wait_s: Optional[float] = None
+    token_usage: dict = Field(default_factory=dict)
+    profile_path: Optional[str] = None
+    cancel_token: Optional[str] = Field(
+        default=None,
+        description="Returned once, when the run is started; pass it as "
+        "X-Cancel-Token to cancel this request.",
+    )
+
+
+RUNS_STARTED = REGISTRY.counter(
+    "agent_research_runs_started_total", "Research runs admitted and started."
+)
+RUNS_FINISHED = REGISTRY.counter(
+    "agent_research_runs_finished_total",
+    "Research runs finished, by final status.",
+    ("status",),
+)
+RUNS_COALESCED = REGISTRY.counter(
+    "agent_research_runs_coalesced_total",
+    "Requests attached to an in-flight or recently answered run.",
+)
+RUN_DURATION = REGISTRY.histogram(
+    "agent_research_run_duration_seconds",
+    "Time from admission to the end of a run.",
+    ("status",),
+)
+
+
+def coalescing_key(request: ResearchRequest) -> str:
+    """Return the key under which identical research requests share one run.
+
+    Questions are compared case-, whitespace- and trailing-punctuation-
+    insensitively. Runs are only shared within a tenant and between requests
+    made with the same API keys, which enter the key as a fingerprint, so no
+    one gets an answer paid for with someone else's key.
+    """
+    question = " ".join(request.question.lower().split()).rstrip("?!. ")
+    config, api_keys = {}, {}
+    for name, value in request.config.items():
+        (api_keys if name.endswith("api_key") else config)[name] = value
+    fingerprint = (
+        hashlib.sha256(json.dumps(api_keys, sort_keys=True).encode()).hexdigest()
+        if api_keys
+        else ""
+    )
+    payload = json.dumps(
+        [request.tenant_id, fingerprint, question, config], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def to_jsonable(value: Any) -> Any:
+    """Convert graph state updates into JSON-serialisable data."""
+    if isinstance(value, BaseMessage):
+        return {"type": value.type, "content": value.content}
+    if isinstance(value, BaseModel):
+        return to_jsonable(value.model_dump())
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set)):
+        return [to_jsonable(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+class ResearchRun:
+    """A single graph run and the ordered events it has published.
+
+    Every event is kept, so a client that connects late or reconnects with
+    ``Last-Event-ID`` replays what it missed before receiving live events.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        question: str,
+        config: dict,
+        ticket: Optional[Ticket] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        """Create a run for ``question`` holding an admission ``ticket``."""
+        self.run_id = run_id
+        self.question = question
+        self.config = config
+        self.ticket = ticket
+        self.admission = admission
+        self.key = ""
+        self.tenant_id: Optional[str] = None
+        self.cancel_tokens: set[str] = set()
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.answer: Optional[str] = None
+        self.sources: list = []
+        self.is_partial = False
+        self.error: Optional[str] = None
+        self.token_usage: dict = {}
+        self.started_at: Optional[float] = None
+        self.profiler = None
+        self.research_run_id = ""
+        self.task: Optional[asyncio.Task] = None
+        self.events: list[dict] = []
+        self.done = asyncio.Event()
+        self._subscribers: set[asyncio.Queue] = set()
+        self._think_parser = ThinkTagStreamParser()
+
+    def to_status(self) -> RunStatus:
+        """Return the public status of the run, including its queue position."""
+        queue = {}
+        if self.ticket is not None:
+            queue["queue_wait_s"] = round(self.ticket.wait_s, 3)
+            if self.status == "queued":
+                queue["queue_position"] = self.admission.position(self.ticket)
+                queue["estimated_wait_s"] = round(
+                    self.admission.estimated_wait_s(self.ticket), 1
+                )
+        return RunStatus(
+            **queue,
+            run_id=self.run_id,
+            status=self.status,
+            created_at=self.created_at,
+            finished_at=self.finished_at,
+            answer=self.answer,
+            sources=self.sources,
+            is_partial=self.is_partial,
+            error=self.error,
+            token_usage=self.token_usage,
+            profile_path=(
+                str(self.profiler.path)
+                if self.profiler is not None and self.profiler.path
+                else None
+            ),
+        )
+
+    def attach(self) -> str:
+        """Register one more request on the run and return its cancel token."""
+        token = secrets.token_urlsafe(16)
+        self.cancel_tokens.add(token)
+        return token
+
+    def publish(self, event: str, data: Any) -> None:
+        """Record an event and hand it to every connected subscriber."""
+        item = {"id": len(self.events), "event": event, "data": data}
+        self.events.append(item)
+        for queue in self._subscribers:
+            queue.put_nowait(item)
+
+    def on_update(self, node: str, update: Any) -> None:
+        """Track the result fields of a node's state update and publish it."""
+        if isinstance(update, dict):
+            self.research_run_id = update.get("research_run_id") or (
+                self.research_run_id
+            )
+            self.is_partial = self.is_partial or bool(update.get("is_partial"))
+            self.token_usage = merge_usage(self.token_usage, update.get("token_usage"))
+            if node == "finalize_answer" and update.get("messages"):
+                self.answer, _ = strip_thinking(update["messages"][-1].content)
+        self.publish("update", {"node": node, "update": to_jsonable(update)})
+
+    def on_values(self, values: Any) -> None:
+        """Take the de-duplicated sources from the state once there is an answer."""
+        if self.answer is not None and isinstance(values, dict):
+            self.sources = to_jsonable(values.get("sources_gathered", []))
+
+    def on_message(self, message: Any, metadata: dict) -> None:
+        """Publish streamed answer tokens, split from any ``<think>`` reasoning."""
+        # Whole messages are node outputs that arrive again in the updates
+        if not isinstance(message, AIMessageChunk):
+            return
+        if metadata.get("langgraph_node") not in ANSWER_NODES:
+            return
+        answer, thinking = self._think_parser.feed(message.text())
+        if thinking:
+            self.publish("thinking", {"text": thinking})
+        if answer:
+            self.publish("token", {"text": answer})
+
+    def finish(self, status: str, error: Optional[str] = None) -> None:
+        """Mark the run as finished and publish the final ``end`` event."""
+        self.status = status
+        self.error = error
+        self.finished_at = time.time()
+        self.publish("end", self.to_status().model_dump())
+        self.done.set()
+        RUNS_FINISHED.inc(status=status)
+        if self.started_at is not None:
+            RUN_DURATION.observe(self.finished_at - self.started_at, status=status)
+
+    async def subscribe(self, after: int = -1) -> AsyncIterator[Optional[dict]]:
+        """Yield events after the id ``after``, then live events until the end.
+
+        ``None`` is yielded whenever the stream has been idle for
+        ``KEEPALIVE_S`` so the caller can send a keep-alive.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            for item in self.events[after + 1 :]:
+                yield item
+            if self.done.is_set():
+                return
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), KEEPALIVE_S)
+                except TimeoutError:
+                    yield None
+                    continue
+                yield item
+                if item["event"] == "end":
+                    return
+        finally:
+            self._subscribers.discard(queue)
+
+
+class RunManager:
+    """Start research runs as asyncio tasks and keep them for later lookups.
+
+    Identical requests are coalesced: while a run is in flight, or for
+    ``answer_ttl_s`` after it succeeded with a complete answer, a request with
+    the same ``coalescing_key`` attaches to it instead of starting a new graph
+    run, and receives the same events and answer. Every request gets its own
+    cancel token; a shared run is cancelled once all of them have been used.
+    """
+
+    def __init__(
+        self,
+        graph: Any,
+        admission: AdmissionController = ADMISSION,
+        retention_s: float = RUN_RETENTION_S,
+        answer_ttl_s: float = ANSWER_CACHE_TTL_S,
+    ):
+        """Create a manager running ``graph`` under ``admission`` control."""
+        self.graph = graph
+        self.admission = admission
+        self.retention_s = retention_s
+        self.answer_ttl_s = answer_ttl_s
+        self._runs: dict[str, ResearchRun] = {}
+        self._by_key: dict[str, ResearchRun] = {}
+        self.coalesced = 0
+
+    def start(self, request: ResearchRequest) -> tuple[ResearchRun, str]:
+        """Queue a run for ``request``; it starts once admitted.
+
+        Uses the matching in-flight or recently answered run instead when
+        there is one.
+
+        Returns:
+            tuple: The run and the request's cancel token
+
+        Raises:
+            AdmissionRejected: If the admission queue is full.
+        """
+        self._evict_finished()
+        key = coalescing_key(request)
+        shared = self._by_key.get(key)
+        if shared is not None and self._reusable(shared):
+            self.coalesced += 1
+            RUNS_COALESCED.inc()
+            API_LOGGER.info(
+                "🔗 Request from %s/%s attached to research run %s (%s)",
+                request.tenant_id,
+                request.user_id,
+                shared.run_id,
+                shared.status,
+            )
+            return shared, shared.attach()
+        ticket = self.admission.submit(
+            request.user_id, request.tenant_id, request.priority
+        )
+        run = ResearchRun(
+            uuid.uuid4().hex, request.question, request.config, ticket, self.admission
+        )
+        run.key = key
+        run.tenant_id = request.tenant_id
+        self._runs[run.run_id] = run
+        self._by_key[key] = run
+        run.task = asyncio.create_task(self._execute(run))
+        run.task.add_done_callback(lambda _: self._cancelled_before_start(run))
+        API_LOGGER.info(
+            "🚀 Research run %s queued for %s/%s (%s)",
+            run.run_id,
+            request.tenant_id,
+            request.user_id,
+            request.priority,
+        )
+        return run, run.attach()
+
+    def get(self, run_id: str) -> ResearchRun:
+        """Return the run with ``run_id`` or raise ``KeyError``."""
+        return self._runs[run_id]
+
+    def cancel(self, run_id: str, token: Optional[str]) -> ResearchRun:
+        """Detach the request holding ``token`` and cancel the run once none is left.
+
+        Raises:
+            KeyError: If there is no run ``run_id``.
+            PermissionError: If ``token`` is not a cancel token of the run.
+        """
+        run = self._runs[run_id]
+        if token not in run.cancel_tokens:
+            raise PermissionError(f"Invalid cancel token for run {run_id}")
+        run.cancel_tokens.discard(token)
+        if not run.cancel_tokens and not run.done.is_set() and run.task is not None:
+            run.task.cancel()
+        return run
+
+    def _cancelled_before_start(self, run: ResearchRun) -> None:
+        # A task cancelled before its first step never runs _execute's cleanup
+        if not run.done.is_set():
+            API_LOGGER.info("🛑 Research run %s cancelled", run.run_id)
+            run.finish("cancelled")
+            self.admission.release(run.ticket)
+
+    def _reusable(self, run: ResearchRun) -> bool:
+        if not run.done.is_set():
+            return True
+        return (
+            run.status == "succeeded"
+            and not run.is_partial
+            and time.time() - run.finished_at < self.answer_ttl_s
+        )
+
+    async def _execute(self, run: ResearchRun) -> None:
+        # Research memory is never shared across tenants, whatever the config says
+        config = {
+            "configurable": {
+                **run.config,
+                "thread_id": run.run_id,
+                "memory_scope": run.tenant_id or "",
+            }
+        }
+        try:
+            if not run.ticket.admitted:
+                run.publish("queued", run.to_status().model_dump())
+                await run.ticket.wait_async()
+            run.status = "running"
+            run.started_at = time.time()
+            RUNS_STARTED.inc()
+            run.publish("running", {"queue_wait_s": round(run.ticket.wait_s, 3)})
+            profiling = Configuration.from_runnable_config(config).profile_run
+            with profile_run(run.run_id, enabled=profiling) as run.profiler:
+                async for mode, chunk in self.graph.astream(
+                    {"messages": [HumanMessage(content=run.question)]},
+                    config,
+                    stream_mode=["updates", "messages", "values"],
+                ):
+                    if mode == "updates":
+                        for node, update in chunk.items():
+                            run.on_update(node, update)
+                    elif mode == "values":
+                        run.on_values(chunk)
+                    else:
+                        run.on_message(*chunk)
+        except asyncio.CancelledError:
+            API_LOGGER.info("🛑 Research run %s cancelled", run.run_id)
+            run.finish("cancelled")
+        except Exception as e:
+            log_error_with_context(
+                API_LOGGER, e, "research_run", {"run_id": run.run_id}
+            )
+            run.finish("failed", error=str(e))
+        else:
+            API_LOGGER.info("✅ Research run %s finished", run.run_id)
+            run.finish("succeeded")
+        finally:
+            # Search branches left in the background pool stop with the run
+            BRANCH_POOL.discard(run.research_run_id)
+            self.admission.release(run.ticket)
+
+    def _evict_finished(self) -> None:
+        cutoff = time.time() - self.retention_s
+        for run_id, run in list(self._runs.items()):
+            if run.finished_at is not None and run.finished_at < cutoff:
+                del self._runs[run_id]
+                if self._by_key.get(run.key) is run:
+                    del self._by_key[run.key]
+
+
+RUNS = RunManager(graph)
+
+router = APIRouter(prefix="/research", tags=["research"])
+
+
+def _get_run(run_id: str) -> ResearchRun:
+    try:
+        return RUNS.get(run_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown run: {run_id}")
+
+
+def _format_sse(item: Optional[dict]) -> str:
+    if item is None:
+        return ": keep-alive\n\n"
+    data = json.dumps(item["data"], ensure_ascii=False)
+    return f"id: {item['id']}\nevent: {item['event']}\ndata: {data}\n\n"
+
+
+@router.post("/runs", status_code=202, response_model=RunStatus)
+async def start_run(
+    request: ResearchRequest, x_profile_run: Optional[str] = Header(default=None)
+):
+    """Queue a research run and return its id without waiting for the result.
+
+    When the admission queue is full the run is shed with a 429 response and
+    a ``Retry-After`` header. An ``X-Profile-Run: 1`` header profiles the run
+    like the ``profile_run`` config field does.
+    """
+    if x_profile_run and x_profile_run.lower() in ("1", "true", "yes"):
+        request.config = {**request.config, "profile_run": True}
+    try:
+        run, cancel_token = RUNS.start(request)
+    except AdmissionRejected as e:
+        return JSONResponse(
+            status_code=429,
+            content={"detail": str(e), "retry_after_s": round(e.retry_after_s, 1)},
+            headers={"Retry-After": str(max(1, round(e.retry_after_s)))},
+        )
+    return run.to_status().model_copy(update={"cancel_token": cancel_token})
+
+
+@router.get("/admission")
+async def admission_stats() -> dict:
+    """Return the number of running, queued, rejected and coalesced runs."""
+    return {**RUNS.admission.stats(), "coalesced": RUNS.coalesced}
+
+
+@router.get("/latency")
+async def latency_stats() -> dict:
+    """Return p50/p95/p99 latencies of the node and outbound-call spans."""
+    return span_stats()
+
+
+@router.get("/runs/{run_id}", response_model=RunStatus)
+async def get_run(run_id: str, wait_s: float = 0.0) -> RunStatus:
+    """Return the status of a run, waiting up to ``wait_s`` seconds for it to finish."""
+    run = _get_run(run_id)
+    if wait_s > 0 and not run.done.is_set():
+        try:
+            await asyncio.wait_for(asyncio.shield(run.done.wait()), wait_s)
+        except TimeoutError:
+            pass
+    return run.to_status()
+
+
+@router.get("/runs/{run_id}/stream")
+async def stream_run(
+    run_id: str,
+    request: Request,
+    last_event_id: Optional[int] = Header(default=None),
+) -> StreamingResponse:
+    """Stream the run's node updates and answer tokens as server-sent events.
+
+    Events are ``update`` (one per node update), ``token`` and ``thinking``
+    (answer tokens of ``finalize_answer``) and a final ``end`` carrying the
+    run status. Reconnecting clients resume after ``Last-Event-ID``.
+    """
+    run = _get_run(run_id)
+    after = last_event_id if last_event_id is not None else -1
+
+    async def events():
+        async for item in run.subscribe(after):
+            if item is None and await request.is_disconnected():
+                return
+            yield _format_sse(item)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/runs/{run_id}/cancel", response_model=RunStatus)
+async def cancel_run(
+    run_id: str, x_cancel_token: Optional[str] = Header(default=None)
+) -> RunStatus:
+    """Cancel the request that was given ``X-Cancel-Token`` when it started the run.
+
+    A run shared by coalesced requests keeps running until every one of them
+    has cancelled it. Unknown tokens are refused with 403.
+    """
+    _get_run(run_id)
+    try:
+        run = RUNS.cancel(run_id, x_cancel_token)
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    if run.task is not None and not run.cancel_tokens:
+        # Let the task record the cancellation before reporting the status
+        await asyncio.wait({run.task}, timeout=1.0)
+    return run.to_status()
@@ -0,0 +1,297 @@
+"""Persistent memory of past web research, reused across sessions and runs.
+
+Every successful ``web_research`` summary is stored with its search query,
+sources and date in a SQLite database with a full-text index. Before queries
+are searched, ``generate_query`` and ``reflection`` look each one up: a fresh
+summary of a near-duplicate query answers it without searching again.
+
+Entries are kept per ``memory_scope``. Everyone using the same scope, and
+therefore by default every user and session of the process, shares what was
+remembered; the research API scopes memory by tenant.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from agent.configuration import Configuration
+from agent.search_cache import query_tokens
+from agent.usage import record_usage
+from components.logging_config import TOOLS_LOGGER, log_error_with_context
+
+# Full-text candidates checked per lookup
+_CANDIDATES = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS research (
+    id INTEGER PRIMARY KEY,
+    scope TEXT NOT NULL DEFAULT '',
+    search_type TEXT NOT NULL,
+    query TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    sources TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS research_created_at ON research (created_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS research_fts
+    USING fts5(query, content='research', content_rowid='id');
+CREATE TRIGGER IF NOT EXISTS research_insert AFTER INSERT ON research BEGIN
+    INSERT INTO research_fts (rowid, query) VALUES (new.id, new.query);
+END;
+CREATE TRIGGER IF NOT EXISTS research_delete AFTER DELETE ON research BEGIN
+    INSERT INTO research_fts (research_fts, rowid, query)
+    VALUES ('delete', old.id, old.query);
+END;
+"""
+
+
+def _portable(summary: str, sources: list) -> tuple[str, list]:
+    """Point citations at the source URLs instead of the run's short urls.
+
+    Short urls are only unique within one run, so a summary reused by another
+    run would cite the wrong sources.
+    """
+    portable = []
+    for source in sources:
+        if source.get("short_url") and source.get("value"):
+            summary = summary.replace(
+                f"]({source['short_url']})", f"]({source['value']})"
+            )
+        portable.append({**source, "short_url": source.get("value")})
+    return summary, portable
+
+
+def _jaccard(left: frozenset, right: frozenset) -> float:
+    return len(left & right) / len(left | right) if left or right else 0.0
+
+
+class ResearchMemory:
+    """SQLite store of research summaries with full-text lookup by query.
+
+    One connection is shared by all threads and serialized by a lock; lookups
+    and writes are single indexed statements, so the lock is held briefly.
+    """
+
+    def __init__(self, path: Path):
+        """Open or create the memory database at ``path``."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(research)")}
+        if "scope" not in columns:
+            # Databases written before scopes existed hold unscoped entries
+            self._conn.execute(
+                "ALTER TABLE research ADD COLUMN scope TEXT NOT NULL DEFAULT ''"
+            )
+
+    def remember(
+        self,
+        search_type: str,
+        query: str,
+        summary: str,
+        sources: list,
+        scope: str = "",
+    ) -> None:
+        """Store the summary of ``query``, replacing older ones of the same query."""
+        summary, sources = _portable(summary, sources)
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "DELETE FROM research "
+                    "WHERE scope = ? AND search_type = ? AND query = ?",
+                    (scope, search_type, query),
+                )
+                self._conn.execute(
+                    "INSERT INTO research (scope, search_type, query, summary, "
+                    "sources, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        scope,
+                        search_type,
+                        query,
+                        summary,
+                        json.dumps(sources, ensure_ascii=False),
+                        time.time(),
+                    ),
+                )
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def lookup(
+        self,
+        search_type: str,
+        query: str,
+        max_age_s: float,
+        similarity: float,
+        scope: str = "",
+    ) -> Optional[dict]:
+        """Return the most similar fresh entry for ``query`` in ``scope``, if any.
+
+        Candidates come from the full-text index; an entry matches when the
+        word-set Jaccard similarity of its query reaches ``similarity``.
+
+        Returns:
+            dict: The entry's ``query``, ``summary``, ``sources`` and ``age_s``
+        """
+        tokens = query_tokens(query)
+        if not tokens:
+            return None
+        # Quoted so query words are never read as FTS operators
+        match = " OR ".join('"' + token.replace('"', '""') + '"' for token in tokens)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT r.query, r.summary, r.sources, r.created_at "
+                "FROM research_fts JOIN research r ON r.id = research_fts.rowid "
+                "WHERE research_fts MATCH ? AND r.scope = ? AND r.search_type = ? "
+                "AND r.created_at >= ? ORDER BY bm25(research_fts) LIMIT ?",
+                (match, scope, search_type, time.time() - max_age_s, _CANDIDATES),
+            ).fetchall()
+        best, best_score = None, similarity
+        for row in rows:
+            score = _jaccard(tokens, query_tokens(row[0]))
+            if score >= best_score:
+                best, best_score = row, score
+        if best is None:
+            return None
+        return {
+            "query": best[0],
+            "summary": best[1],
+            "sources": json.loads(best[2]),
+            "age_s": time.time() - best[3],
+        }
+
+    def prune(self, max_age_s: float) -> int:
+        """Delete entries older than ``max_age_s`` and return how many."""
+        with self._lock:
+            cursor = self._conn.execute(
+                "DELETE FROM research WHERE created_at < ?", (time.time() - max_age_s,)
+            )
+        return cursor.rowcount
+
+    def stats(self) -> dict:
+        """Return the number of entries and the age of the oldest one."""
+        with self._lock:
+            count, oldest = self._conn.execute(
+                "SELECT COUNT(*), MIN(created_at) FROM research"
+            ).fetchone()
+        return {"entries": count, "oldest_age_s": time.time() - oldest if count else 0}
+
+
+def max_age_for(query: str, configurable: Configuration) -> float:
+    """Return how old a remembered answer to ``query`` may be.
+
+    The first ``memory_freshness`` pattern found in the query decides;
+    queries matching none use ``memory_max_age_s``.
+    """
+    for pattern, max_age_s in configurable.memory_freshness.items():
+        if re.search(pattern, query, re.IGNORECASE):
+            return max_age_s
+    return configurable.memory_max_age_s
+
+
+_MEMORIES: dict[str, ResearchMemory] = {}
+_MEMORIES_LOCK = threading.Lock()
+
+
+def research_memory(configurable: Configuration) -> Optional[ResearchMemory]:
+    """Return the process-wide memory at ``memory_path`` when ``research_memory`` is on.
+
+    Entries too old for any freshness rule are pruned when a database is
+    first opened.
+    """
+    if not configurable.research_memory:
+        return None
+    path = str(Path(configurable.memory_path).resolve())
+    with _MEMORIES_LOCK:
+        memory = _MEMORIES.get(path)
+        if memory is None:
+            memory = _MEMORIES[path] = ResearchMemory(Path(path))
+            retention_s = max(
+                [configurable.memory_max_age_s, *configurable.memory_freshness.values()]
+            )
+            pruned = memory.prune(retention_s)
+            TOOLS_LOGGER.info(
+                "🧠 Research memory %s opened: %s (%s expired entries pruned)",
+                path,
+                memory.stats(),
+                pruned,
+            )
+        return memory
+
+
+def recall_answers(queries: list, configurable: Configuration) -> tuple[list, dict]:
+    """Answer what ``queries`` the memory can and return the rest.
+
+    Returns:
+        tuple: The queries still to search, and a state update with the
+            remembered ``search_query``, ``web_research_result`` and
+            ``sources_gathered`` of the answered ones
+    """
+    answered = {"search_query": [], "web_research_result": [], "sources_gathered": []}
+    memory = research_memory(configurable)
+    if memory is None:
+        return list(queries), answered
+    remaining = []
+    for query in queries:
+        try:
+            entry = memory.lookup(
+                configurable.search_type,
+                query,
+                max_age_for(query, configurable),
+                configurable.memory_similarity,
+                configurable.memory_scope,
+            )
+        except sqlite3.Error as e:
+            # A broken memory only costs the searches it would have saved
+            log_error_with_context(TOOLS_LOGGER, e, "recall_answers", {"query": query})
+            entry = None
+        if entry is None:
+            remaining.append(query)
+            continue
+        TOOLS_LOGGER.info(
+            "🧠 Answered %r from memory of %r (%.0f min old)",
+            query,
+            entry["query"],
+            entry["age_s"] / 60,
+        )
+        answered["search_query"].append(query)
+        answered["web_research_result"].append(entry["summary"])
+        answered["sources_gathered"].extend(entry["sources"])
+    record_usage(memory_hits=len(answered["search_query"]))
+    return remaining, answered
+
+
+def remember_research(
+    configurable: Configuration,
+    search_type: str,
+    query: str,
+    summary: str,
+    sources: list,
+) -> None:
+    """Store a finished search's summary when ``research_memory`` is on.
+
+    Searches that found no sources are not stored: their summary either
+    reports a failed or empty search or is not grounded in anything, and
+    remembering it would answer the same query without sources for days.
+    """
+    memory = research_memory(configurable)
+    if memory is None or not summary:
+        return
+    if not sources:
+        TOOLS_LOGGER.debug("🧠 Not remembering %r: the search found no sources", query)
+        return
+    try:
+        memory.remember(search_type, query, summary, sources, configurable.memory_scope)
+    except sqlite3.Error as e:
+        log_error_with_context(TOOLS_LOGGER, e, "remember_research", {"query": query})
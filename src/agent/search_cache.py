@@ -0,0 +1,271 @@
+"""Short-lived cache of raw search results shared by speculative prefetches."""
+
+import contextvars
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from components.logging_config import API_LOGGER
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def query_tokens(query: str) -> frozenset:
+    """Return the lower-cased word set used to compare two queries."""
+    return frozenset(_TOKEN_RE.findall(query.lower()))
+
+
+class _Entry:
+    __slots__ = ("key", "future", "created", "speculative", "used")
+
+    def __init__(self, key: tuple, future: Future, speculative: bool):
+        self.key = key
+        self.future = future
+        self.created = time.monotonic()
+        self.speculative = speculative
+        self.used = False
+
+
+class SearchCache:
+    """TTL cache of search results keyed by query, with near-duplicate lookup.
+
+    Entries hold futures, so a lookup for a query whose prefetch is still
+    running waits for it instead of searching again. A lookup matches the same
+    query after normalisation or, failing that, the most similar cached query
+    whose word-set Jaccard similarity reaches ``similarity``. Entries are kept
+    per ``scope`` and a lookup only matches entries of its own scope, so
+    results fetched for one tenant or API key never answer another's queries.
+
+    Hit and miss counters are kept separately for speculative entries so the
+    value of prefetching can be measured with ``stats``.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float = 120.0,
+        similarity: float = 0.8,
+        max_entries: int = 256,
+        max_workers: int = 8,
+    ):
+        """Create an empty cache with its own prefetch workers."""
+        self.ttl_s = ttl_s
+        self.similarity = similarity
+        self.max_entries = max_entries
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="search-prefetch"
+        )
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple, _Entry] = OrderedDict()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "speculative_hits": 0,
+            "prefetches": 0,
+            "wasted_prefetches": 0,
+        }
+
+    def prefetch(
+        self, query: str, search: Callable[[str], Any], scope: str = ""
+    ) -> Future:
+        """Start ``search(query)`` in the background unless a live entry matches."""
+        key = (scope, query_tokens(query))
+        with self._lock:
+            entry = self._find(key)
+            if entry is not None:
+                return entry.future
+            context = contextvars.copy_context()
+            future = self._executor.submit(context.run, search, query)
+            self._insert(key, future, speculative=True)
+            self._counters["prefetches"] += 1
+        API_LOGGER.info("🔮 Prefetching search: %s", query)
+        return future
+
+    def put(self, query: str, result: Any, scope: str = "") -> None:
+        """Store a completed search result."""
+        future: Future = Future()
+        future.set_result(result)
+        with self._lock:
+            self._insert((scope, query_tokens(query)), future, speculative=False)
+
+    def fetch(
+        self,
+        query: str,
+        search: Callable[[str], Any],
+        timeout: Optional[float] = None,
+        cacheable: Callable[[Any], bool] = bool,
+        scope: str = "",
+    ) -> Any:
+        """Return the cached result for ``query`` or run ``search`` exactly once.
+
+        Concurrent callers with the same or a near-duplicate query wait for the
+        search already in flight instead of starting their own. A result for
+        which ``cacheable`` is false is returned but not kept.
+
+        Args:
+            query: The search query.
+            search: Runs the search for a query.
+            timeout: Seconds to wait for another caller's search before searching
+                without the cache.
+            cacheable: Decides whether a result is worth keeping.
+            scope: The scope whose entries may answer the query.
+
+        Returns:
+            The search result.
+        """
+        key = (scope, query_tokens(query))
+        with self._lock:
+            entry = self._find(key)
+            if entry is None:
+                future: Future = Future()
+                self._insert(key, future, speculative=False)
+                entry = self._entries[key]
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            result = self.get(query, timeout=timeout, scope=scope)
+            if result is not None and cacheable(result):
+                return result
+            return search(query)
+
+        with self._lock:
+            self._counters["misses"] += 1
+        try:
+            result = search(query)
+        except Exception as e:
+            entry.future.set_exception(e)
+            self._drop(entry)
+            raise
+        keep = False
+        try:
+            keep = cacheable(result)
+        finally:
+            # Dropped before waiters are woken, and even if ``cacheable`` fails
+            if not keep:
+                self._drop(entry)
+            entry.future.set_result(result)
+        return result
+
+    def get(
+        self, query: str, timeout: Optional[float] = None, scope: str = ""
+    ) -> Optional[Any]:
+        """Return the cached result for ``query`` or None on a miss.
+
+        Args:
+            query: The search query.
+            timeout: Seconds to wait for a matching prefetch that is still running.
+            scope: The scope whose entries may answer the query.
+
+        Returns:
+            The search result, or None when nothing usable is cached.
+        """
+        with self._lock:
+            entry = self._find((scope, query_tokens(query)))
+        result = None
+        if entry is not None:
+            try:
+                result = entry.future.result(timeout=timeout)
+            except FutureTimeoutError:
+                result = None
+            except Exception:
+                # A failed prefetch must not keep answering lookups
+                self._drop(entry)
+                result = None
+        with self._lock:
+            if result is None:
+                self._counters["misses"] += 1
+            else:
+                self._counters["hits"] += 1
+                if entry.speculative and not entry.used:
+                    self._counters["speculative_hits"] += 1
+                entry.used = True
+        return result
+
+    def stats(self) -> dict:
+        """Return hit, miss and prefetch counters plus the overall hit rate."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        stats["prefetch_hit_rate"] = (
+            stats["speculative_hits"] / stats["prefetches"]
+            if stats["prefetches"]
+            else 0.0
+        )
+        return stats
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            for name in self._counters:
+                self._counters[name] = 0
+
+    def _find(self, key: tuple) -> Optional[_Entry]:
+        self._expire()
+        entry = self._entries.get(key)
+        scope, tokens = key
+        if entry is None and tokens:
+            best = 0.0
+            for (entry_scope, entry_tokens), candidate in self._entries.items():
+                if entry_scope != scope:
+                    continue
+                score = len(tokens & entry_tokens) / len(tokens | entry_tokens)
+                if score >= self.similarity and score > best:
+                    entry, best = candidate, score
+        return entry
+
+    def _insert(self, key: tuple, future: Future, speculative: bool) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None and previous.future is not future:
+            self._retire(previous)
+        self._entries[key] = _Entry(key, future, speculative)
+        while len(self._entries) > self.max_entries:
+            _, oldest = self._entries.popitem(last=False)
+            self._retire(oldest)
+
+    def _drop(self, entry: _Entry) -> None:
+        with self._lock:
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl_s
+        while self._entries:
+            oldest = next(iter(self._entries.values()))
+            if oldest.created >= cutoff:
+                break
+            self._entries.popitem(last=False)
+            self._retire(oldest)
+
+    def _retire(self, entry: _Entry) -> None:
+        if entry.speculative and not entry.used:
+            self._counters["wasted_prefetches"] += 1
+
+
+_CACHES: dict[tuple, SearchCache] = {}
+_CACHES_LOCK = threading.Lock()
+
+
+def get_search_cache(ttl_s: float, similarity: float) -> SearchCache:
+    """Return the process-wide search cache for the given TTL and similarity.
+
+    Prefetches start in one node and are looked up in the branches of the next
+    one, so every node of a run has to see the same cache instance.
+    """
+    key = (ttl_s, similarity)
+    with _CACHES_LOCK:
+        if key not in _CACHES:
+            _CACHES[key] = SearchCache(ttl_s=ttl_s, similarity=similarity)
+        return _CACHES[key]
+
+
+def search_caches() -> dict[tuple, SearchCache]:
+    """Return the process-wide search caches keyed by ``(ttl_s, similarity)``."""
+    with _CACHES_LOCK:
+        return dict(_CACHES)
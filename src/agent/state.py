@@ -4,23 +4,38 @@ from __future__ import annotations
 
 import operator
 from dataclasses import dataclass, field
-from typing import TypedDict
+from typing import Optional, TypedDict
 
 from langgraph.graph import add_messages
 from typing_extensions import Annotated
 
+from agent.reducers import (
+    ResearchLogChannel,
+    add_research_results,
+    add_search_queries,
+    add_sources,
+)
+from agent.usage import merge_usage
+
 
 class OverallState(TypedDict):
     """Overall state for the agent graph."""
 
     messages: Annotated[list, add_messages]
-    search_query: Annotated[list, operator.add]
-    web_research_result: Annotated[list, operator.add]
-    sources_gathered: Annotated[list, operator.add]
+    search_query: Annotated[list, ResearchLogChannel(list, add_search_queries)]
+    web_research_result: Annotated[list, ResearchLogChannel(list, add_research_results)]
+    sources_gathered: Annotated[list, ResearchLogChannel(list, add_sources)]
     initial_search_query_count: int
     max_research_loops: int
     research_loop_count: int
     reasoning_model: str
+    research_run_id: str
+    deadline: Optional[float]
+    research_gain: Annotated[list, operator.add]
+    is_partial: Annotated[bool, operator.or_]
+    number_of_ran_queries: int
+    answer_error: Optional[str]
+    token_usage: Annotated[dict, merge_usage]
 
 
 class ReflectionState(TypedDict):
@@ -28,9 +43,13 @@ class ReflectionState(TypedDict):
 
     is_sufficient: bool
     knowledge_gap: str
-    follow_up_queries: Annotated[list, operator.add]
+    follow_up_queries: list
+    recalled_from_memory: int
     research_loop_count: int
     number_of_ran_queries: int
+    research_run_id: str
+    deadline: Optional[float]
+    research_gain: Annotated[list, operator.add]
 
 
 class Query(TypedDict):
@@ -44,6 +63,11 @@ class QueryGenerationState(TypedDict):
     """State for query generation."""
 
     query_list: list[Query]
+    # Branch ids the searches of query_list were started with, if any
+    query_ids: Optional[list[int]]
+    number_of_ran_queries: int
+    research_run_id: str
+    deadline: Optional[float]
 
 
 class WebSearchState(TypedDict):
@@ -51,6 +75,17 @@ class WebSearchState(TypedDict):
 
     search_query: str
     id: str
+    research_run_id: str
+    deadline: Optional[float]
+
+
+class PipelinedResearchState(TypedDict):
+    """State for a batch of web searches collected by quorum."""
+
+    search_queries: list[str]
+    branch_ids: list[int]
+    research_run_id: str
+    deadline: Optional[float]
 
 
 @dataclass(kw_only=True)
@@ -0,0 +1,217 @@
+"""In-memory static file serving with precompressed variants, ETags and cache headers."""
+
+import gzip
+import hashlib
+import logging
+import mimetypes
+import pathlib
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; prebuilt .br files are still served
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# Cache headers for content-hashed assets and for everything else
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+# Encodings in order of preference when the client accepts several
+ENCODINGS = ("br", "gzip")
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+# Media types that are already compressed
+_COMPRESSED_TYPES = re.compile(r"^(image/(?!svg)|audio/|video/|font/woff)|zip|gzip")
+# Vite puts its hashed builds in assets/; elsewhere only names carrying a hex
+# content hash (with a digit, so words like "deadbeef" don't count) such as
+# main.3f9a2c1b.js are treated as hashed, never names like icon-192x192.png
+_HASHED_NAME = re.compile(r"[.-](?=[0-9a-f]*[0-9])[0-9a-f]{8,}\.[0-9A-Za-z]+$")
+_BYTE_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+@dataclass
+class StaticFile:
+    """A file of the build directory held in memory with its encoded variants."""
+
+    media_type: str
+    etag: str
+    cache_control: str
+    variants: dict[str, bytes] = field(default_factory=dict)
+
+
+def _is_hashed(rel_path: str) -> bool:
+    return rel_path.startswith("assets/") or bool(_HASHED_NAME.search(rel_path))
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Return whether an ``If-None-Match`` header matches ``etag``.
+
+    Uses the weak comparison HTTP requires for ``If-None-Match``: ``W/``
+    prefixes are ignored, so a tag weakened by a proxy still matches.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(",")
+    )
+
+
+def byte_range(header: str, size: int) -> Optional[tuple[int, int]]:
+    """Return the first and last byte of a single-range ``Range`` header.
+
+    Headers asking for several ranges, other units or malformed ones return
+    None, and the whole file is served as HTTP allows.
+
+    Raises:
+        ValueError: When the range starts past the end of a ``size``-byte file.
+    """
+    match = _BYTE_RANGE.match(header.strip())
+    if match is None or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if not first:
+        # A suffix range: the last ``last`` bytes
+        if int(last) == 0 or size == 0:
+            raise ValueError(f"Unsatisfiable range {header!r}")
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise ValueError(f"Unsatisfiable range {header!r}")
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+def _compress(data: bytes, encoding: str) -> Optional[bytes]:
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if encoding == "br" and brotli is not None:
+        return brotli.compress(data, quality=11)
+    return None
+
+
+def accepted_encodings(header: str) -> list[str]:
+    """Return the content codings of an ``Accept-Encoding`` header with a non-zero q."""
+    accepted = []
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        match = re.search(r"q=([0-9.]+)", params)
+        if match:
+            try:
+                quality = float(match.group(1))
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            accepted.append(name.strip().lower())
+    return accepted
+
+
+class StaticIndex:
+    """Index of a build directory, loaded and compressed once at startup.
+
+    Every file is read into memory together with its gzip and (when the
+    ``brotli`` package is installed) brotli variants, so a request costs a
+    dictionary lookup instead of filesystem calls. ``.gz``/``.br`` files that
+    the frontend build already produced are used as is. Content-hashed assets
+    get immutable cache headers; other files, such as ``index.html``, are
+    revalidated through their ETag.
+    """
+
+    def __init__(self, root: pathlib.Path, min_compress_size: int = MIN_COMPRESS_SIZE):
+        """Index every file below ``root``."""
+        self.root = root
+        self.files: dict[str, StaticFile] = {}
+        for path in sorted(root.rglob("*")):
+            if not path.is_file() or path.suffix in (".gz", ".br"):
+                continue
+            rel_path = path.relative_to(root).as_posix()
+            self.files[rel_path] = self._load(path, rel_path, min_compress_size)
+        size = sum(len(v) for f in self.files.values() for v in f.variants.values())
+        logger.info(
+            f"Indexed {len(self.files)} frontend files ({size / 1024:.0f} KiB with variants)"
+        )
+
+    def _load(
+        self, path: pathlib.Path, rel_path: str, min_compress_size: int
+    ) -> StaticFile:
+        data = path.read_bytes()
+        media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        static_file = StaticFile(
+            media_type=media_type,
+            etag='"' + hashlib.sha1(data).hexdigest()[:20] + '"',
+            cache_control=IMMUTABLE_CACHE if _is_hashed(rel_path) else REVALIDATE_CACHE,
+            variants={"identity": data},
+        )
+        compressible = len(data) >= min_compress_size and not _COMPRESSED_TYPES.search(
+            media_type
+        )
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            prebuilt = path.with_name(path.name + suffix)
+            if prebuilt.is_file():
+                static_file.variants[encoding] = prebuilt.read_bytes()
+            elif compressible:
+                encoded = _compress(data, encoding)
+                # Keep a variant only when it actually saves bytes
+                if encoded is not None and len(encoded) < len(data):
+                    static_file.variants[encoding] = encoded
+        return static_file
+
+    def lookup(self, path: str) -> Optional[StaticFile]:
+        """Return the indexed file at ``path`` relative to the build directory."""
+        return self.files.get(path.lstrip("/"))
+
+    def response(self, request: Request, static_file: StaticFile) -> Response:
+        """Return ``static_file`` in the best encoding the client accepts.
+
+        A single byte range is served from the unencoded file, unless an
+        ``If-Range`` names an older version. ``HEAD`` requests get the headers
+        of the matching ``GET`` response without its body.
+        """
+        headers = {
+            "ETag": static_file.etag,
+            "Cache-Control": static_file.cache_control,
+            "Vary": "Accept-Encoding",
+            "Accept-Ranges": "bytes",
+        }
+        if etag_matches(request.headers.get("if-none-match", ""), static_file.etag):
+            return Response(status_code=304, headers=headers)
+
+        accepted = accepted_encodings(request.headers.get("accept-encoding", ""))
+        encoding = next(
+            (e for e in ENCODINGS if e in accepted and e in static_file.variants),
+            "identity",
+        )
+        body = static_file.variants[encoding]
+        status_code = 200
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range", static_file.etag)
+        if range_header and if_range == static_file.etag:
+            data = static_file.variants["identity"]
+            try:
+                requested = byte_range(range_header, len(data))
+            except ValueError:
+                headers["Content-Range"] = f"bytes */{len(data)}"
+                return Response(status_code=416, headers=headers)
+            if requested is not None:
+                start, end = requested
+                encoding, body, status_code = "identity", data[start : end + 1], 206
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            body = b""
+        return Response(
+            body,
+            status_code=status_code,
+            media_type=static_file.media_type,
+            headers=headers,
+        )
@@ -1,16 +1,26 @@
 """Tools and schemas for the agent operations."""
 
-from typing import Annotated, List
+from typing import Annotated, Any, List, Optional
 
 import requests
 from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from langchain_core.tools import tool
+from langchain_core.tools import BaseTool, StructuredTool, tool
 from langchain_tavily import TavilySearch
 from pydantic import BaseModel, Field
 
+from agent.api_keys import user_api_key
+from agent.call_policy import call_with_policy, remaining_time
+from agent.cassette import recorded
+from agent.configuration import CallPolicy
+from agent.search_cache import SearchCache
+from agent.usage import record_search_call
+
 load_dotenv()
 
+# Seconds to wait for a page in fetch_url
+FETCH_TIMEOUT_S = 15
+
 
 class SearchQueryList(BaseModel):
     """A list of search queries for web research."""
@@ -68,7 +78,7 @@ def fetch_url(url: Annotated[str, "Target Web site"]) -> str:
         403 Forbidden, other HTTP errors, or garbled text detection).
     """
     try:
-        response = requests.get(url)
+        response = requests.get(url, timeout=FETCH_TIMEOUT_S)
         response.raise_for_status()
         soup = BeautifulSoup(response.content, "html.parser")
 
@@ -89,6 +99,9 @@ def fetch_url(url: Annotated[str, "Target Web site"]) -> str:
             content = f"error in scraping website, 403 Forbidden for url: {url}"
         else:
             content = f"error in scraping website, {str(e)}"
+        return content
+    except requests.RequestException as e:
+        return f"error in scraping website, {str(e)}"
 
 
 @tool
@@ -122,10 +135,175 @@ def tavily_search(
     Returns:
         web_search_result(dict) : The web search result from the Tavily search tool.
     """
-    tavily_search_tool = TavilySearch(
-        max_result=max_result, topic=topic, time_range=time_range
+    record_search_call()
+    web_search_result = call_with_policy(
+        "tavily",
+        lambda: recorded(
+            "tavily",
+            {
+                "query": query,
+                "max_results": max_result,
+                "topic": topic,
+                "time_range": time_range,
+            },
+            lambda: _tavily_request(
+                _tavily_client(
+                    max_results=max_result, topic=topic, time_range=time_range
+                ),
+                query,
+            ),
+        ),
+        provider="tavily",
     )
-    web_search_result = tavily_search_tool.invoke(query)
     for idx, result in enumerate(web_search_result["results"]):
         result.update({"citation_number": f"[{idx + 1}]"})
     return web_search_result
+
+
+class TavilyQuery(BaseModel):
+    """Input of the policy-wrapped Tavily search tool."""
+
+    query: str = Field(description="Search query to look up")
+
+
+def _tavily_client(**kwargs: Any) -> TavilySearch:
+    """Create a ``TavilySearch`` with the run's user API key, if one was passed."""
+    api_key = user_api_key("tavily_api_key")
+    if api_key:
+        kwargs["tavily_api_key"] = api_key
+    return TavilySearch(**kwargs)
+
+
+def _tavily_request(tavily: TavilySearch, query: str) -> dict:
+    """Send one Tavily request, raising the errors the tool returns as results.
+
+    ``TavilySearch`` catches request failures (HTTP errors, timeouts) and
+    returns them as ``{"error": exception}``; they are raised here so the call
+    policy retries them and the circuit breaker counts them.
+    """
+    result = tavily.invoke({"query": query})
+    if isinstance(result, dict) and "error" in result:
+        error = result["error"]
+        if isinstance(error, BaseException):
+            raise error
+        raise RuntimeError(f"Tavily search failed: {error}")
+    return result
+
+
+def search_tavily(
+    query: str,
+    policy: Optional[CallPolicy] = None,
+    deadline: Optional[float] = None,
+    max_results: int = 5,
+    tavily: Optional[TavilySearch] = None,
+) -> dict:
+    """Run one Tavily search under a call policy, without any summarization.
+
+    Args:
+        query: The search query.
+        policy: The call policy for the request.
+        deadline: The absolute epoch time by which the run must finish.
+        max_results: The maximum number of results when ``tavily`` is not given.
+        tavily: A configured ``TavilySearch`` tool to reuse.
+
+    Returns:
+        dict: The Tavily response with ``query`` and ``results`` keys.
+    """
+    left = remaining_time(deadline)
+    if left is not None and left <= 0:
+        return {"query": query, "results": [], "error": "deadline exceeded"}
+    if tavily is not None:
+        max_results = tavily.max_results
+    record_search_call()
+    return call_with_policy(
+        "tavily",
+        lambda: recorded(
+            "tavily",
+            {"query": query, "max_results": max_results},
+            # Created per call so replays need no Tavily API key
+            lambda: _tavily_request(
+                tavily or _tavily_client(max_results=max_results), query
+            ),
+        ),
+        policy=policy,
+        deadline=deadline,
+        provider="tavily",
+    )
+
+
+def lookup_cached_search(
+    cache: SearchCache,
+    query: str,
+    policy: Optional[CallPolicy] = None,
+    deadline: Optional[float] = None,
+    scope: str = "",
+) -> Optional[dict]:
+    """Return a cached search result for ``query``, waiting for a running prefetch.
+
+    The wait is bounded like a search request would be: by the policy timeout
+    and by the run deadline. Cached results without any hits count as misses.
+    Only results cached under ``scope`` are used.
+    """
+    result = cache.get(query, timeout=_cache_wait_s(policy, deadline), scope=scope)
+    return result if _has_results(result) else None
+
+
+def _has_results(result: Any) -> bool:
+    # Searches without hits come back as a message string, not a response dict
+    return isinstance(result, dict) and bool(result.get("results"))
+
+
+def _cache_wait_s(
+    policy: Optional[CallPolicy], deadline: Optional[float]
+) -> Optional[float]:
+    wait_s = remaining_time(deadline)
+    if policy is not None and policy.timeout_s is not None:
+        wait_s = policy.timeout_s if wait_s is None else min(wait_s, policy.timeout_s)
+    return max(0.0, wait_s) if wait_s is not None else None
+
+
+def make_tavily_search_tool(
+    policy: Optional[CallPolicy] = None,
+    deadline: Optional[float] = None,
+    max_results: int = 5,
+    cache: Optional[SearchCache] = None,
+    cache_scope: str = "",
+) -> BaseTool:
+    """Create a ``tavily_search`` tool whose requests run under a call policy.
+
+    The tool keeps the name and output shape of ``TavilySearch`` so ReAct agents
+    and ``get_sources`` treat it exactly like the stock tool. With a ``cache``,
+    matching cached or prefetched results are returned without a request and
+    fresh results are added to the cache. Concurrent identical searches share
+    one request.
+
+    Args:
+        policy: The call policy for each Tavily request.
+        deadline: The absolute epoch time by which the run must finish.
+        max_results: The maximum number of results per search.
+        cache: The search cache to consult first.
+        cache_scope: The cache scope the tool's searches are kept under.
+
+    Returns:
+        BaseTool: A structured tool named ``tavily_search``.
+    """
+    # No TavilySearch is created up front, so replayed runs need no API key
+    tavily_fields = TavilySearch.model_fields
+
+    def _search(query: str) -> dict:
+        if cache is None:
+            return search_tavily(query, policy, deadline, max_results)
+        return cache.fetch(
+            query,
+            lambda q: search_tavily(q, policy, deadline, max_results),
+            timeout=_cache_wait_s(policy, deadline),
+            cacheable=_has_results,
+            scope=cache_scope,
+        )
+
+    return StructuredTool.from_function(
+        func=_search,
+        name=tavily_fields["name"].default,
+        description=tavily_fields["description"].default,
+        args_schema=TavilyQuery,
+    )
@@ -0,0 +1,137 @@
+"""Per-node token and search-call accounting collected from LLM callbacks."""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from langchain_core.tracers.context import register_configure_hook
+
+# Counters kept per node, in display order
+USAGE_FIELDS = (
+    "prompt_tokens",
+    "completion_tokens",
+    "reasoning_tokens",
+    "llm_calls",
+    "search_calls",
+    "memory_hits",
+)
+
+
+class UsageMeter(BaseCallbackHandler):
+    """Callback handler adding up the token usage of every LLM call it sees.
+
+    While a meter is active (see ``metered``), LangChain attaches it to every
+    chat model run in the same context, including runs in threads started
+    with a copied context, so nested agents and structured-output calls are
+    counted without touching the call sites.
+    """
+
+    def __init__(self):
+        """Create a meter with all counters at zero."""
+        super().__init__()
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(USAGE_FIELDS, 0)
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        """Add the usage reported by a finished LLM call."""
+        usage = _response_usage(response)
+        with self._lock:
+            self.counts["llm_calls"] += 1
+            for name, value in usage.items():
+                self.counts[name] += value
+
+    def add(self, name: str, value: int = 1) -> None:
+        """Add ``value`` to the counter ``name``."""
+        with self._lock:
+            self.counts[name] += value
+
+    def as_dict(self) -> dict:
+        """Return the non-zero counters."""
+        with self._lock:
+            return {name: value for name, value in self.counts.items() if value}
+
+
+def _response_usage(response: LLMResult) -> dict:
+    usage = dict.fromkeys(("prompt_tokens", "completion_tokens", "reasoning_tokens"), 0)
+    found = False
+    for generations in response.generations:
+        for generation in generations:
+            metadata = getattr(
+                getattr(generation, "message", None), "usage_metadata", None
+            )
+            if not metadata:
+                continue
+            found = True
+            usage["prompt_tokens"] += metadata.get("input_tokens", 0)
+            usage["completion_tokens"] += metadata.get("output_tokens", 0)
+            details = metadata.get("output_token_details") or {}
+            usage["reasoning_tokens"] += details.get("reasoning", 0)
+    if not found and response.llm_output:
+        # Providers that only report usage for the whole request
+        token_usage = response.llm_output.get("token_usage") or {}
+        usage["prompt_tokens"] = token_usage.get("prompt_tokens", 0)
+        usage["completion_tokens"] = token_usage.get("completion_tokens", 0)
+        details = token_usage.get("completion_tokens_details") or {}
+        usage["reasoning_tokens"] = details.get("reasoning_tokens") or 0
+    return usage
+
+
+_METER: ContextVar[Optional[UsageMeter]] = ContextVar("usage_meter", default=None)
+register_configure_hook(_METER, inheritable=True)
+
+
+@contextmanager
+def metered() -> Iterator[UsageMeter]:
+    """Count the LLM usage and search calls made inside the ``with`` block."""
+    meter = UsageMeter()
+    token = _METER.set(meter)
+    try:
+        yield meter
+    finally:
+        _METER.reset(token)
+
+
+@contextmanager
+def unmetered() -> Iterator[None]:
+    """Hide the active meter, for calls made on behalf of other metered callers."""
+    token = _METER.set(None)
+    try:
+        yield
+    finally:
+        _METER.reset(token)
+
+
+def record_usage(**counts: int) -> None:
+    """Add usage made outside of LangChain (e.g. raw SDK calls) to the active meter."""
+    meter = _METER.get()
+    if meter is not None:
+        for name, value in counts.items():
+            meter.add(name, value)
+
+
+def record_search_call() -> None:
+    """Count one outbound search request against the active meter."""
+    record_usage(search_calls=1)
+
+
+def merge_usage(left: Optional[dict], right: Optional[dict]) -> dict:
+    """Add up two ``{node: {counter: value}}`` usage maps (state reducer)."""
+    merged = {node: dict(counts) for node, counts in (left or {}).items()}
+    for node, counts in (right or {}).items():
+        target = merged.setdefault(node, {})
+        for name, value in counts.items():
+            target[name] = target.get(name, 0) + value
+    return merged
+
+
+def usage_totals(usage: Optional[dict]) -> dict:
+    """Return the counters of a usage map summed over all nodes."""
+    totals = dict.fromkeys(USAGE_FIELDS, 0)
+    for counts in (usage or {}).values():
+        for name, value in counts.items():
+            totals[name] = totals.get(name, 0) + value
+    totals["total_tokens"] = totals["prompt_tokens"] + totals["completion_tokens"]
+    return totals
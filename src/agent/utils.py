@@ -5,51 +5,297 @@ import os
 
 # 로깅 설정 추가
 import sys
-from typing import Any, Dict, List, Literal
+from typing import Any, Dict, List, Literal, Optional
 
 from langchain_core.messages import AIMessage, AnyMessage, HumanMessage, ToolMessage
 
+from agent.api_keys import user_api_key
+from agent.cassette import active_cassette, recording_model
+from agent.configuration import Configuration, ModelProfile
+
 sys.path.append(
     "/Users/nam-young-woo/Desktop/codes/work/vllm-fullstack-langgraph-quickstart/backend"
 )
 from components.logging_config import UTILS_LOGGER, log_error_with_context
 
 
+def _api_key(env_name: str, cassette) -> Optional[str]:
+    """Return the API key in ``env_name``; replays run without one."""
+    api_key = os.getenv(env_name)
+    if api_key is None and cassette is not None and cassette.replaying:
+        return "replay"
+    return api_key
+
+
 def get_llm_model(
-    model_type: Literal["vllm", "gemini"],
+    model_type: Literal["vllm", "gemini", "fake"],
     temperature: float = 0.0,
     max_retries: int = 2,
     top_p: float = 0.8,
     top_k: int = 20,
+    node: Optional[str] = None,
+    configurable: Optional[Configuration] = None,
+    timeout: Optional[float] = None,
 ) -> str:
-    """Get the LLM model based on the type."""
+    """Get the LLM model based on the type.
+
+    When ``node`` and ``configurable`` are given, the node's profile from
+    ``Configuration.node_models`` overrides the provider, endpoint, model name,
+    temperature and reasoning settings. Reasoning is switched through
+    ``chat_template_kwargs`` in ``extra_body`` for vLLM and through
+    ``thinking_budget`` for Gemini. ``timeout`` bounds each HTTP request so a
+    hung endpoint releases its worker thread.
+
+    While a cassette is active (see ``agent.cassette``) the model records its
+    calls or replays them; replays need no API key. The ``fake`` model type
+    answers offline with seeded synthetic output (see ``agent.fakes``).
+    """
+    profile = (
+        configurable.get_model_profile(node)
+        if configurable is not None and node
+        else ModelProfile()
+    )
+    model_type = profile.model_type or model_type
+    if profile.temperature is not None:
+        temperature = profile.temperature
+    cassette = active_cassette()
+
     if model_type == "vllm":
         from langchain_openai import ChatOpenAI
 
-        llm = ChatOpenAI(
-            model=os.getenv("MODEL_NAME"),
+        extra_body = {"top_k": top_k}
+        chat_template_kwargs = {}
+        if profile.reasoning is not None:
+            chat_template_kwargs["enable_thinking"] = profile.reasoning
+        if profile.thinking_budget is not None and profile.reasoning is not False:
+            chat_template_kwargs["thinking_budget"] = profile.thinking_budget
+        if chat_template_kwargs:
+            extra_body["chat_template_kwargs"] = chat_template_kwargs
+
+        chat_model = ChatOpenAI if cassette is None else recording_model(ChatOpenAI)
+        llm = chat_model(
+            model=profile.model_name or os.getenv("MODEL_NAME"),
             temperature=temperature,
             max_retries=max_retries,
-            openai_api_key=os.getenv("MODEL_API_KEY"),
-            openai_api_base=os.getenv("MODEL_API_URL"),
+            timeout=timeout,
+            openai_api_key=_api_key(profile.api_key_env or "MODEL_API_KEY", cassette),
+            openai_api_base=profile.api_base or os.getenv("MODEL_API_URL"),
             top_p=top_p,
-            extra_body={"top_k": top_k},
+            extra_body=extra_body,
+            # Streamed calls report token usage only when asked to
+            stream_usage=True,
         )
         return llm
     elif model_type == "gemini":
         from langchain_google_genai import ChatGoogleGenerativeAI
 
-        llm = ChatGoogleGenerativeAI(
-            model=os.getenv("GEMINI_MODEL_NAME"),
+        thinking_kwargs = {}
+        if profile.reasoning is False:
+            thinking_kwargs["thinking_budget"] = 0
+        elif profile.thinking_budget is not None:
+            thinking_kwargs["thinking_budget"] = profile.thinking_budget
+
+        chat_model = (
+            ChatGoogleGenerativeAI
+            if cassette is None
+            else recording_model(ChatGoogleGenerativeAI)
+        )
+        llm = chat_model(
+            model=profile.model_name or os.getenv("GEMINI_MODEL_NAME"),
             temperature=temperature,
             max_retries=max_retries,
-            google_api_key=os.getenv("GEMINI_API_KEY"),
+            timeout=timeout,
+            google_api_key=(
+                _api_key(profile.api_key_env or "GEMINI_API_KEY", cassette)
+                or user_api_key("google_api_key")
+            ),
+            **thinking_kwargs,
         )
         return llm
+    elif model_type == "fake":
+        from agent.fakes import FakeChatModel
+
+        configurable = configurable or Configuration()
+        return FakeChatModel(
+            seed=configurable.fake_seed,
+            latency_s=configurable.fake_llm_latency_ms / 1000,
+            temperature=temperature,
+            model_name=profile.model_name or "fake",
+        )
     else:
         raise ValueError(f"Unsupported LLM type: {model_type}")
 
 
+class ThinkTagStreamParser:
+    r"""Incrementally split model output into answer text and ``<think>`` reasoning.
+
+    Chunks are fed as they are decoded; a tag split across chunk boundaries is
+    held back until it can be classified, so the answer stream never contains
+    partial ``<think>`` markup.
+
+    Example:
+        >>> parser = ThinkTagStreamParser()
+        >>> parser.feed("<thi")
+        ('', '')
+        >>> parser.feed("nk>plan")
+        ('', 'plan')
+        >>> parser.feed("</think>Answer")
+        ('Answer', '\n')
+    """
+
+    OPEN_TAG = "<think>"
+    CLOSE_TAG = "</think>"
+
+    def __init__(self):
+        """Create a parser positioned outside any ``<think>`` block."""
+        self._buffer = ""
+        self._in_thinking = False
+
+    def feed(self, chunk: str) -> tuple[str, str]:
+        """Consume a chunk and return the ``(answer, thinking)`` text it completes."""
+        self._buffer += chunk or ""
+        answer, thinking = [], []
+        while self._buffer:
+            tag = self.CLOSE_TAG if self._in_thinking else self.OPEN_TAG
+            target = thinking if self._in_thinking else answer
+            idx = self._buffer.find(tag)
+            if idx >= 0:
+                target.append(self._buffer[:idx])
+                if self._in_thinking:
+                    thinking.append("\n")
+                self._buffer = self._buffer[idx + len(tag) :]
+                self._in_thinking = not self._in_thinking
+                continue
+            # Keep a possible partial tag at the end of the buffer for the next chunk
+            keep = self._partial_tag_length(tag)
+            target.append(self._buffer[: len(self._buffer) - keep])
+            self._buffer = self._buffer[len(self._buffer) - keep :]
+            break
+        return "".join(answer), "".join(thinking)
+
+    def close(self) -> tuple[str, str]:
+        """Flush buffered text; an unterminated ``<think>`` block counts as reasoning."""
+        rest, self._buffer = self._buffer, ""
+        return ("", rest) if self._in_thinking else (rest, "")
+
+    def _partial_tag_length(self, tag: str) -> int:
+        for size in range(min(len(tag) - 1, len(self._buffer)), 0, -1):
+            if self._buffer.endswith(tag[:size]):
+                return size
+        return 0
+
+
+def strip_thinking(text: str) -> tuple[str, str]:
+    """Split a complete response into ``(answer, thinking)`` using the stream parser.
+
+    Args:
+        text: The raw model output, possibly containing ``<think>`` blocks.
+
+    Returns:
+        tuple: The stripped answer and the joined reasoning text.
+    """
+    parser = ThinkTagStreamParser()
+    answer, thinking = parser.feed(text or "")
+    tail_answer, tail_thinking = parser.close()
+    return (answer + tail_answer).strip(), (thinking + tail_thinking).strip()
+
+
+class StreamingQueryListParser:
+    """Incrementally decode the query strings of a ``SearchQueryList`` JSON object.
+
+    Model output is fed chunk by chunk as it streams. Every string of the
+    top-level ``query`` array is returned as soon as its closing quote has been
+    decoded, so work on the first queries can start while the rest of the
+    object is still being generated. ``<think>`` blocks and any text around
+    the JSON object (such as Markdown code fences) are ignored.
+
+    Example:
+        >>> parser = StreamingQueryListParser()
+        >>> parser.feed('{"rationale": "r", "query": ["first q')
+        []
+        >>> parser.feed('uery", "second')
+        ['first query']
+        >>> parser.feed(' query"]}')
+        ['second query']
+    """
+
+    def __init__(self, key: str = "query"):
+        """Create a parser for the string array stored under ``key``."""
+        self.key = key
+        self.text = ""
+        self._think = ThinkTagStreamParser()
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._raw: List[str] = []
+        self._expect_key = False
+        self._last_key: Optional[str] = None
+        self._in_target = False
+
+    def feed(self, chunk: str) -> List[str]:
+        """Consume a chunk of model output and return the queries it completes."""
+        answer, _ = self._think.feed(chunk)
+        return self._consume(answer)
+
+    def close(self) -> List[str]:
+        """Flush the remaining output and return any queries it completes."""
+        answer, _ = self._think.close()
+        return self._consume(answer)
+
+    def _consume(self, text: str) -> List[str]:
+        self.text += text
+        completed = []
+        for char in text:
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    value = json.loads('"' + "".join(self._raw) + '"')
+                    if self._on_string(value):
+                        completed.append(value)
+                    continue
+                self._raw.append(char)
+            elif char == '"':
+                self._in_string = True
+                self._raw = []
+            elif char in "{[":
+                self._in_target = (
+                    char == "[" and self._stack == ["{"] and self._last_key == self.key
+                )
+                self._stack.append(char)
+                self._expect_key = char == "{"
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                self._in_target = False
+            elif char == "," and self._stack[-1:] == ["{"]:
+                self._expect_key = True
+            elif char == ":":
+                self._expect_key = False
+        return completed
+
+    def _on_string(self, value: str) -> bool:
+        """Track top-level keys and report whether ``value`` is a query."""
+        if self._stack == ["{"] and self._expect_key:
+            self._last_key = value
+            return False
+        return self._in_target and len(self._stack) == 2
+
+
+def extract_json_object(text: str) -> str:
+    """Return the outermost ``{...}`` span of a model response.
+
+    Strips Markdown code fences and any prose around the object so the result
+    can be handed to ``json.loads`` or ``model_validate_json``.
+    """
+    start, end = text.find("{"), text.rfind("}")
+    if start < 0 or end < start:
+        raise ValueError(f"No JSON object found in: {text[:200]}")
+    return text[start : end + 1]
+
+
 def get_research_topic(messages: List[AnyMessage]) -> str:
     """Get the research topic from the messages."""
     # check if request has a history and combine the messages into a single string
@@ -209,6 +455,10 @@ def get_citations(response, resolved_urls_map):
     return citations
 
 
+# Tools whose Tavily-shaped results get_sources turns into sources
+SEARCH_TOOL_NAMES = ("tavily_search", "local_search", "fake_search")
+
+
 def get_sources(messages: list[AnyMessage], session_id: int) -> list[dict]:
     """Extract sources from messages.
 
@@ -222,7 +472,7 @@ def get_sources(messages: list[AnyMessage], session_id: int) -> list[dict]:
     sources = []
     for message in messages:
         if isinstance(message, ToolMessage):
-            if message.name == "tavily_search":
+            if message.name in SEARCH_TOOL_NAMES:
                 try:
                     results = json.loads(message.content)["results"]
                 except (json.JSONDecodeError, KeyError) as e:
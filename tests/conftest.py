@@ -0,0 +1,11 @@
+import pytest
+
+from agent import circuit_breaker
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers():
+    # Breakers are process-wide; every test starts with closed circuits
+    circuit_breaker._BREAKERS.clear()
+    yield
+    circuit_breaker._BREAKERS.clear()
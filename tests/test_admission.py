@@ -0,0 +1,68 @@
+from types import SimpleNamespace
+
+import pytest
+
+from agent.admission import AdmissionController
+from components import chat_interface
+
+
+def test_anonymous_runs_are_only_bound_by_the_global_cap():
+    admission = AdmissionController(max_concurrent=3, per_user_limit=1)
+    tickets = [admission.submit() for _ in range(4)]
+    assert [ticket.admitted for ticket in tickets] == [True, True, True, False]
+
+
+def test_named_users_and_tenants_are_capped():
+    admission = AdmissionController(per_user_limit=1, per_tenant_limit=2)
+    first = admission.submit("alice", "acme")
+    second = admission.submit("alice", "acme")
+    third = admission.submit("bob", "acme")
+    fourth = admission.submit("carol", "acme")
+    assert [first.admitted, second.admitted, third.admitted] == [True, False, True]
+    assert not fourth.admitted
+
+    admission.release(first)
+    assert second.admitted and not fourth.admitted
+
+
+class Interrupted(Exception):
+    """Stands in for Streamlit stopping the script on a rerun."""
+
+
+@pytest.mark.parametrize("stage", ["waiting", "running"])
+def test_streamlit_releases_its_slot_when_interrupted(monkeypatch, stage):
+    admission = AdmissionController(max_concurrent=1)
+    blocker = admission.submit("other")
+    monkeypatch.setattr(chat_interface, "ADMISSION", admission)
+    monkeypatch.setattr(
+        chat_interface,
+        "st",
+        SimpleNamespace(session_state=SimpleNamespace(thread_id="session")),
+    )
+
+    def interrupt(*args):
+        raise Interrupted
+
+    ui = SimpleNamespace(
+        sidebar_manager=SimpleNamespace(update_status=lambda *args: None),
+        _wait_for_research_slot=interrupt if stage == "waiting" else lambda t: None,
+        _run_research=interrupt,
+    )
+    if stage == "running":
+        admission.release(blocker)
+
+    with pytest.raises(Interrupted):
+        chat_interface.ChatInterface._process_ai_response(ui, "question")
+
+    stats = admission.stats()
+    assert stats["queued"]["interactive"] == 0
+    assert stats["running"] == (1 if stage == "waiting" else 0)
+
+
+def test_slot_releases_on_timeout():
+    admission = AdmissionController(max_concurrent=1)
+    admission.submit("other")
+    with pytest.raises(Exception, match="Timed out"):
+        with admission.slot("alice", timeout=0.01):
+            pass
+    assert admission.stats()["queued"]["interactive"] == 0
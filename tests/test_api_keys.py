@@ -0,0 +1,50 @@
+import os
+import threading
+
+import langchain_tavily._utilities as tavily_utilities
+
+from agent.api_keys import use_api_keys, user_api_key
+from agent.call_policy import call_with_policy
+from agent.configuration import CallPolicy
+from agent.tools_and_schemas import search_tavily
+
+
+def test_user_tavily_key_is_sent_per_run(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-env")
+    sent = []
+
+    class Response:
+        status_code = 200
+
+        def json(self):
+            return {"query": "q", "results": []}
+
+    def post(url, json=None, headers=None, **kwargs):
+        sent.append(headers["Authorization"])
+        return Response()
+
+    monkeypatch.setattr(tavily_utilities.requests, "post", post)
+    barrier = threading.Barrier(2)
+
+    def run(key):
+        with use_api_keys({"configurable": {"tavily_api_key": key}}):
+            barrier.wait(5)
+            search_tavily("q", policy=CallPolicy(max_attempts=1))
+
+    threads = [threading.Thread(target=run, args=(k,)) for k in ("tvly-a", "tvly-b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    search_tavily("q", policy=CallPolicy(max_attempts=1))
+
+    assert sorted(sent[:2]) == ["Bearer tvly-a", "Bearer tvly-b"]
+    assert sent[2] == "Bearer tvly-env"
+    assert os.environ["TAVILY_API_KEY"] == "tvly-env"
+
+
+def test_keys_follow_the_run_into_call_threads():
+    with use_api_keys({"configurable": {"google_api_key": " g-key "}}):
+        key = call_with_policy("probe", lambda: user_api_key("google_api_key"))
+    assert key == "g-key"
+    assert user_api_key("google_api_key") is None
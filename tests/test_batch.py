@@ -0,0 +1,56 @@
+import json
+
+from langchain_core.messages import AIMessage
+
+from agent import batch
+
+SOURCE = {"label": "Example", "value": "https://example.com", "short_url": "[0]"}
+
+
+class StubGraph:
+    def __init__(self, results):
+        self.results = results
+        self.asked = []
+
+    def invoke(self, input, config):
+        question = input["messages"][0].content
+        self.asked.append(question)
+        return self.results[question]
+
+
+def write_questions(path, questions):
+    path.write_text("".join(json.dumps(q) + "\n" for q in questions))
+
+
+def test_error_and_sourceless_answers_are_retried(monkeypatch, tmp_path):
+    questions, output = tmp_path / "questions.jsonl", tmp_path / "results.jsonl"
+    write_questions(
+        questions,
+        [
+            {"id": "ok", "question": "ok?"},
+            {"id": "error", "question": "error?"},
+            {"id": "empty", "question": "empty?"},
+        ],
+    )
+    graph = StubGraph(
+        {
+            "ok?": {"messages": [AIMessage("Answer [0]")], "sources_gathered": [SOURCE]},
+            "error?": {
+                "messages": [AIMessage("최종 답변 생성 중 오류가 발생했습니다: boom")],
+                "answer_error": "boom",
+                "sources_gathered": [SOURCE],
+            },
+            "empty?": {"messages": [AIMessage("Nothing found")]},
+        }
+    )
+    monkeypatch.setattr(batch, "graph", graph)
+
+    counts = batch.run_batch(questions, output, concurrency=1)
+    assert (counts["succeeded"], counts["failed"]) == (1, 2)
+    records = {r["id"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert records["error"]["error"] == "boom"
+    assert records["empty"]["status"] == "failed"
+
+    graph.asked.clear()
+    batch.run_batch(questions, output, concurrency=1)
+    assert sorted(graph.asked) == ["empty?", "error?"]
@@ -0,0 +1,82 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from agent import call_policy
+from agent.call_policy import call_with_policy
+from agent.circuit_breaker import get_breaker
+from agent.configuration import CallPolicy
+from agent.tools_and_schemas import search_tavily
+
+FAST = CallPolicy(timeout_s=2.0, max_attempts=2, backoff_base_s=0, backoff_max_s=0)
+
+
+def test_nested_calls_do_not_starve_the_pool(monkeypatch):
+    monkeypatch.setattr(call_policy, "_EXECUTOR", ThreadPoolExecutor(max_workers=2))
+
+    def outer():
+        # Every pool worker is busy with an outer call when the nested one starts
+        return call_with_policy("inner", lambda: "searched", FAST)
+
+    with ThreadPoolExecutor(max_workers=2) as callers:
+        futures = [
+            callers.submit(call_with_policy, "outer", outer, FAST) for _ in range(2)
+        ]
+        assert [future.result(timeout=5) for future in futures] == ["searched"] * 2
+
+
+def test_retry_adopts_timed_out_attempt():
+    calls = []
+
+    def slow_then_slower():
+        calls.append(time.monotonic())
+        time.sleep(0.3 if len(calls) == 1 else 5)
+        return len(calls)
+
+    policy = CallPolicy(
+        timeout_s=0.2, max_attempts=2, backoff_base_s=0, backoff_max_s=0
+    )
+    started = time.monotonic()
+    # The first attempt answers during the retry and its answer is used
+    assert call_with_policy("slow", slow_then_slower, policy) == 2
+    assert time.monotonic() - started < 1
+    assert len(calls) == 2
+
+
+def test_timed_out_attempts_are_bounded_by_max_attempts():
+    release = threading.Event()
+    calls = []
+
+    def hang():
+        calls.append(1)
+        release.wait(5)
+
+    policy = CallPolicy(
+        timeout_s=0.05, max_attempts=3, backoff_base_s=0, backoff_max_s=0
+    )
+    with pytest.raises(TimeoutError):
+        call_with_policy("hang", hang, policy)
+    release.set()
+    assert len(calls) == 3
+
+
+class ErrorTavily:
+    max_results = 5
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, input):
+        # TavilySearch returns request failures instead of raising them
+        self.calls += 1
+        return {"error": ValueError("Error 503: Service Unavailable")}
+
+
+def test_tavily_error_results_are_retried_and_counted():
+    tavily = ErrorTavily()
+    with pytest.raises(ValueError, match="503"):
+        search_tavily("query", policy=FAST, tavily=tavily)
+    assert tavily.calls == 2
+    assert [failed for _, failed in get_breaker("tavily")._calls] == [True, True]
@@ -0,0 +1,16 @@
+from agent.cassette import Cassette
+
+
+def test_error_results_are_recorded_and_replayed(tmp_path):
+    path = tmp_path / "run.jsonl"
+    request = {"query": "solar", "max_results": 5}
+    recorder = Cassette(path, "record")
+    recorder.record("tavily", request, {"error": TimeoutError("read timed out")}, 0.5)
+    recorder.close()
+
+    entry = Cassette(path, "replay").replay("tavily", request)
+
+    assert entry["response"] == {
+        "error": {"error_type": "TimeoutError", "message": "read timed out"}
+    }
+    assert entry["latency_s"] == 0.5
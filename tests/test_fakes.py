@@ -0,0 +1,19 @@
+from langchain_core.messages import HumanMessage
+
+from agent.graph import graph
+
+
+def _run(seed):
+    config = {
+        "configurable": {"model_type": "fake", "search_type": "fake", "fake_seed": seed}
+    }
+    return graph.invoke({"messages": [HumanMessage(content="What is X?")]}, config)
+
+
+def test_fake_runs_are_reproducible():
+    first, second = _run(7), _run(7)
+
+    assert first["messages"][-1].content == second["messages"][-1].content
+    assert list(first["sources_gathered"]) == list(second["sources_gathered"])
+    assert first["sources_gathered"]
+    assert _run(8)["messages"][-1].content != first["messages"][-1].content
@@ -0,0 +1,43 @@
+from agent.local_search import LocalIndex, build_index
+from scripts.local_index import main
+
+
+def _write(path, text):
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def test_index_search_and_incremental_updates(tmp_path):
+    docs = tmp_path / "docs"
+    docs.mkdir()
+    _write(docs / "solar.md", "# Solar\nSolar panels convert sunlight into power.")
+    wind = _write(docs / "wind.md", "# Wind\nWind turbines turn moving air into power.")
+    index_dir = tmp_path / "index"
+
+    stats = build_index([docs], index_dir, workers=1)
+    assert stats["files_indexed"] == 2
+
+    results = LocalIndex(index_dir).search("solar panels sunlight", 5)
+    assert results[0]["title"] == "Solar"
+
+    # Unchanged files are skipped and deleted ones drop out of the results
+    wind.unlink()
+    stats = build_index([docs], index_dir, workers=1)
+    assert stats["files_unchanged"] == 1
+    assert stats["files_removed"] == 1
+    titles = [result["title"] for result in LocalIndex(index_dir).search("power", 5)]
+    assert titles == ["Solar"]
+
+
+def test_cli_accepts_index_before_or_after_the_command(tmp_path, capsys):
+    _write(tmp_path / "solar.md", "# Solar\nSolar panels convert sunlight into power.")
+    after = str(tmp_path / "after")
+    before = str(tmp_path / "before")
+
+    assert main(["index", str(tmp_path / "solar.md"), "--index", after]) == 0
+    assert main(["--index", before, "index", str(tmp_path / "solar.md")]) == 0
+    capsys.readouterr()
+
+    assert main(["search", "solar panels", "--index", after]) == 0
+    assert main(["--index", before, "search", "solar panels"]) == 0
+    assert capsys.readouterr().out.count('"title": "Solar"') == 2
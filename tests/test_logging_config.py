@@ -0,0 +1,54 @@
+import logging
+
+import pytest
+
+from components.logging_config import (
+    _flush_logs,
+    _queued,
+    reset_span_stats,
+    span,
+    span_stats,
+)
+
+
+class _Collect(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+def test_queued_records_keep_the_arguments_of_the_call():
+    sink = _Collect()
+    logger = logging.getLogger("tests.queued")
+    logger.propagate = False
+    handler = _queued(sink)
+    logger.addHandler(handler)
+    try:
+        sources = ["a"]
+        logger.warning("sources: %s", sources)
+        # The caller keeps using the argument after logging it
+        sources.append("b")
+    finally:
+        logger.removeHandler(handler)
+        _flush_logs()
+    assert sink.messages == ["sources: ['a']"]
+
+
+def test_spans_nest_and_feed_the_latency_histograms():
+    reset_span_stats()
+    with span("test.outer", trace_id="run-1") as outer:
+        with span("test.inner") as inner:
+            pass
+    with pytest.raises(ValueError):
+        with span("test.inner"):
+            raise ValueError("boom")
+
+    assert inner.parent is outer
+    assert inner.trace_id == "run-1"
+    stats = span_stats()
+    assert stats["test.inner"]["count"] == 2
+    assert stats["test.inner"]["errors"] == 1
+    assert stats["test.outer"]["count"] == 1
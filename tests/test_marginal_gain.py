@@ -0,0 +1,35 @@
+from agent.marginal_gain import measure_gain
+from agent.reducers import add_research_results, add_sources
+
+
+def _source(url):
+    return {"label": url, "value": url, "short_url": url}
+
+
+def test_repeated_urls_and_content_lower_the_gain():
+    summaries = add_research_results([], ["solar panels convert sunlight to power"])
+    sources = add_sources(
+        [], [_source("https://a.example"), _source("https://b.example")]
+    )
+    first = measure_gain(summaries, sources, 0, 0, loop=1)
+    assert first["gain"] == 1.0
+
+    summaries = add_research_results(
+        summaries, ["solar panels convert sunlight to power today"]
+    )
+    sources = add_sources(
+        sources, [_source("https://a.example/"), _source("https://c.example")]
+    )
+    second = measure_gain(
+        summaries,
+        sources,
+        first["total_results"],
+        first["total_sources"],
+        loop=2,
+        seen_duplicate_sources=first["total_duplicate_sources"],
+    )
+
+    # One of the two urls is new; one of the five trigrams is new
+    assert second["url_novelty"] == 0.5
+    assert second["content_novelty"] == 0.2
+    assert second["gain"] == 0.35
@@ -0,0 +1,30 @@
+from agent.graph import SEARCH_BACKENDS, web_research
+from agent.metrics import REGISTRY
+
+
+def _gauge(name: str) -> float:
+    for line in REGISTRY.render().splitlines():
+        if line.startswith(f"{name} "):
+            return float(line.split()[1])
+    raise AssertionError(f"{name} not exported")
+
+
+def test_branches_in_flight_counts_web_research_steps(monkeypatch):
+    seen = []
+
+    def search(state, configurable, prompt):
+        seen.append(_gauge("agent_branches_in_flight"))
+        source = {"label": "f", "short_url": "[0]", "value": "https://example.com/f"}
+        return "summary", [source]
+
+    monkeypatch.setitem(SEARCH_BACKENDS, "fake", search)
+    config = {"configurable": {"model_type": "fake", "search_type": "fake"}}
+    before = _gauge("agent_branches_in_flight")
+
+    result = web_research({"search_query": "solar output", "id": "0"}, config)
+
+    assert result["web_research_result"] == ["summary"]
+    # A graph step runs outside the branch pool but still counts
+    assert seen == [before + 1]
+    assert _gauge("agent_branches_in_flight") == before
+    assert _gauge("agent_branch_pool_in_flight") == 0
@@ -0,0 +1,81 @@
+import json
+import sys
+
+from agent.circuit_breaker import get_breaker
+from agent.configuration import Configuration
+from agent.graph import _call_llm
+from agent.utils import get_llm_model
+
+
+def test_node_models_from_the_environment(monkeypatch):
+    monkeypatch.setenv(
+        "NODE_MODELS",
+        json.dumps({"reflection": {"model_type": "fake", "temperature": 0.1}}),
+    )
+    configurable = Configuration.from_runnable_config({})
+
+    assert configurable.model_type_for("reflection") == "fake"
+    assert configurable.model_type_for("finalize_answer") == configurable.model_type
+    assert configurable.get_model_profile("finalize_answer").temperature is None
+
+
+def test_node_profile_overrides_the_vllm_model(monkeypatch):
+    monkeypatch.setenv("MODEL_API_KEY", "test-key")
+    configurable = Configuration(
+        node_models={
+            "generate_query": {
+                "model_name": "small-model",
+                "api_base": "http://small:8000/v1",
+                "temperature": 0.2,
+                "reasoning": False,
+            }
+        }
+    )
+
+    llm = get_llm_model(
+        "vllm", temperature=1.0, node="generate_query", configurable=configurable
+    )
+
+    assert llm.model_name == "small-model"
+    assert llm.openai_api_base == "http://small:8000/v1"
+    assert llm.temperature == 0.2
+    assert llm.extra_body["chat_template_kwargs"] == {"enable_thinking": False}
+
+
+def test_nodes_without_a_profile_keep_the_defaults(monkeypatch):
+    monkeypatch.setenv("MODEL_API_KEY", "test-key")
+    monkeypatch.setenv("MODEL_NAME", "large-model")
+    configurable = Configuration(node_models={"generate_query": {"reasoning": False}})
+
+    llm = get_llm_model(
+        "vllm", temperature=1.0, node="finalize_answer", configurable=configurable
+    )
+
+    assert llm.model_name == "large-model"
+    assert llm.temperature == 1.0
+    assert "chat_template_kwargs" not in llm.extra_body
+
+
+def test_open_endpoint_circuit_fails_over_first(monkeypatch):
+    monkeypatch.setenv("MODEL_API_KEY", "test-key")
+    graph_module = sys.modules["agent.graph"]
+    providers = []
+
+    def call_with_policy(node, fn, policy, deadline, provider):
+        providers.append(provider)
+        return fn()
+
+    monkeypatch.setattr(graph_module, "call_with_policy", call_with_policy)
+    configurable = Configuration(
+        model_type="vllm",
+        llm_failover_model_type="fake",
+        node_models={"reflection": {"api_base": "http://small:8000/v1"}},
+    )
+    breaker = get_breaker("vllm:http://small:8000/v1")
+    for _ in range(breaker.min_calls):
+        breaker.record(False, 0.0)
+
+    answer = _call_llm("reflection", configurable, None, 0.0, lambda llm: "answer")
+
+    assert answer == "answer"
+    assert providers == ["fake"]
@@ -0,0 +1,23 @@
+import threading
+
+from agent.pipeline import BranchPool
+
+
+def test_branches_of_abandoned_runs_expire():
+    pool = BranchPool(max_workers=1, run_ttl_s=60)
+    release = threading.Event()
+    running = pool.prefetch("abandoned", 0, release.wait)
+    queued = pool.prefetch("abandoned", 1, release.wait)
+    pool.add_stragglers("abandoned", [running])
+    # The run crashed before finalize_answer and an hour has passed
+    pool._touched["abandoned"] -= 3600
+
+    pool.prefetch("active", 0, lambda: "result")
+
+    assert queued.cancelled()
+    assert pool.stats()["prefetched"] == 1
+    assert pool.stats()["stragglers"] == 0
+    assert pool.claim("abandoned", 0) is None
+    release.set()
+    assert pool.claim("active", 0).result() == "result"
+    assert pool._touched == {}
@@ -0,0 +1,29 @@
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+from agent.fakes import FakeChatModel
+from agent.policy_model import PolicyChatModel
+from agent.usage import metered
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look up ``query``."""
+    return f"Result for {query}"
+
+
+def test_bound_tool_turns_are_metered_once():
+    model = PolicyChatModel(call=lambda invoke: invoke(FakeChatModel(seed=1)))
+    agent = create_react_agent(model, tools=[lookup])
+
+    with metered() as meter:
+        out = agent.invoke({"messages": [("user", "Look up X")]})
+
+    turns = sum(message.type == "ai" for message in out["messages"])
+    assert turns == 2
+    assert meter.counts["llm_calls"] == turns
+    assert meter.counts["prompt_tokens"] == sum(
+        message.usage_metadata["input_tokens"]
+        for message in out["messages"]
+        if message.type == "ai"
+    )
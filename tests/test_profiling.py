@@ -0,0 +1,46 @@
+import json
+import time
+
+from langchain_core.messages import HumanMessage
+
+from agent.call_policy import call_with_policy
+from agent.graph import graph
+from agent.profiling import RunProfiler, active_profiler
+
+
+def test_outbound_call_threads_are_sampled_under_their_node():
+    profiler = RunProfiler("run", interval_s=0.002)
+    profiler.start()
+    with profiler.attach("node.web_research"):
+        call_with_policy("tavily", lambda: time.sleep(0.1))
+    profiler.stop()
+
+    roots = {stack.split(";(", 1)[0] for stack in profiler.stacks}
+    assert any(
+        stack.startswith("node.web_research;call.tavily;") for stack in profiler.stacks
+    ), roots
+    assert profiler.timings["call.tavily"]["calls"] == 1
+
+
+def test_graph_honours_profile_run(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    config = {
+        "configurable": {
+            "thread_id": "profiled-run",
+            "model_type": "fake",
+            "search_type": "fake",
+            "fake_search_latency_ms": 50,
+            "profile_run": True,
+        }
+    }
+    graph.invoke(
+        {"messages": [HumanMessage("How fast is the battery market growing?")]},
+        config,
+    )
+
+    assert active_profiler("profiled-run") is None
+    [summary] = (tmp_path / "logs" / "profiles").glob("profiled-run-*.json")
+    nodes = json.loads(summary.read_text())["nodes"]
+    assert "node.generate_query" in nodes
+    assert "node.finalize_answer" in nodes
+    assert "call.fake_search" in nodes
@@ -0,0 +1,80 @@
+import pytest
+
+from agent.configuration import Configuration
+from agent.graph import (
+    _cancel_unused_prefetches,
+    _dispatch_web_research,
+    _stream_queries,
+)
+from agent.pipeline import BRANCH_POOL
+
+
+class Chunk:
+    def __init__(self, text):
+        self._text = text
+
+    def text(self):
+        return self._text
+
+
+class StreamingModel:
+    def __init__(self, queries, fail=False):
+        self.queries = queries
+        self.fail = fail
+
+    def stream(self, prompt):
+        quoted = ", ".join(f'"{query}"' for query in self.queries)
+        yield Chunk(f'{{"rationale": "r", "query": [{quoted}')
+        if self.fail:
+            raise TimeoutError("stream cut off")
+        yield Chunk("]}")
+
+
+@pytest.fixture
+def prefetches(monkeypatch):
+    started = []
+
+    def prefetch(run_id, key, fn, *args):
+        started.append(key)
+
+    monkeypatch.setattr(BRANCH_POOL, "prefetch", prefetch)
+    return started
+
+
+def test_retried_attempts_search_each_query_once(prefetches):
+    configurable = Configuration()
+    started = {}
+
+    with pytest.raises(TimeoutError):
+        _stream_queries(
+            StreamingModel(["solar", "wind"], fail=True),
+            "prompt",
+            "run",
+            None,
+            {},
+            configurable,
+            started,
+        )
+    queries, _ = _stream_queries(
+        StreamingModel(["wind", "hydro", "wind"]),
+        "prompt",
+        "run",
+        None,
+        {},
+        configurable,
+        started,
+    )
+
+    assert prefetches == [(0, "solar"), (1, "wind"), (2, "hydro")]
+    assert queries == ["wind", "hydro"]
+    assert [started[query] for query in queries] == [1, 2]
+
+
+def test_dropped_queries_are_cancelled_and_ids_kept():
+    future = BRANCH_POOL.prefetch("run-c", (0, "solar"), lambda: None)
+    future.result()
+    _cancel_unused_prefetches("run-c", {"solar": 0, "wind": 1}, ["wind"])
+
+    assert BRANCH_POOL.claim("run-c", (0, "solar")) is None
+    sends = _dispatch_web_research(["wind"], 0, "run-c", None, {}, [1])
+    assert [send.arg["id"] for send in sends] == [1]
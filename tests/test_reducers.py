@@ -0,0 +1,69 @@
+from typing import Annotated, TypedDict
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import END, START, StateGraph
+
+from agent.reducers import (
+    ResearchLogChannel,
+    add_sources,
+    appended_count,
+    bounded_reducer,
+)
+from components.response_processor import ResponseProcessor
+
+
+class State(TypedDict):
+    queries: Annotated[list, ResearchLogChannel(list, bounded_reducer(2))]
+    new: list
+
+
+def _graph():
+    builder = StateGraph(State)
+    builder.add_node("search", lambda state: {"queries": state["new"]})
+    builder.add_edge(START, "search")
+    builder.add_edge("search", END)
+    return builder.compile(checkpointer=InMemorySaver())
+
+
+def test_counters_survive_a_checkpoint_round_trip():
+    graph = _graph()
+    config = {"configurable": {"thread_id": "t"}}
+    graph.invoke({"new": ["a", "b", "c"]}, config)
+
+    # A fresh graph only sees the checkpoint, as a resumed run does
+    resumed = _graph()
+    resumed.checkpointer = graph.checkpointer
+    values = resumed.invoke({"new": ["d"]}, config)["queries"]
+
+    assert list(values) == ["c", "d"]
+    assert appended_count(values) == 4
+    assert appended_count(resumed.get_state(config).values["queries"]) == 4
+
+
+def test_plain_list_checkpoints_still_restore():
+    channel = ResearchLogChannel(list, bounded_reducer(2)).from_checkpoint(["a", "b"])
+    channel.update([["c"]])
+
+    assert list(channel.get()) == ["b", "c"]
+    assert appended_count(channel.get()) == 3
+
+
+def test_citations_of_merged_duplicates_resolve_to_the_kept_source():
+    sources = add_sources(
+        [],
+        [
+            {"label": "A", "value": "https://example.com/a", "short_url": "0-0"},
+            {"label": "A", "value": "https://www.example.com/a/", "short_url": "1-0"},
+        ],
+    )
+    assert len(sources) == 1
+
+    text = ResponseProcessor(None, None)._enhance_citations(
+        "First [A](0-0), again [A](1-0), unknown [B](9-9).",
+        {"sources_gathered": sources},
+    )
+
+    assert text == (
+        "First [[A]](https://example.com/a), again [[A]](https://example.com/a), "
+        "unknown [B](9-9)."
+    )
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from agent.admission import AdmissionController
+from agent.research_api import ResearchRequest, RunManager, coalescing_key
+
+
+class SlowGraph:
+    """Stands in for the compiled graph; streams nothing until cancelled."""
+
+    def __init__(self):
+        self.runs = 0
+
+    async def astream(self, input, config, stream_mode):
+        self.runs += 1
+        await asyncio.sleep(30)
+        yield "values", {}
+
+
+def request(**fields):
+    return ResearchRequest(question="What is X?", **fields)
+
+
+def test_coalesced_run_survives_a_repeated_cancel():
+    async def scenario():
+        graph = SlowGraph()
+        manager = RunManager(graph, admission=AdmissionController())
+        run, first = manager.start(request(user_id="alice"))
+        shared, second = manager.start(request(user_id="bob"))
+        assert shared is run and first != second
+        await asyncio.sleep(0)
+
+        manager.cancel(run.run_id, first)
+        # The same requester cancelling again must not detach anyone else
+        with pytest.raises(PermissionError):
+            manager.cancel(run.run_id, first)
+        with pytest.raises(PermissionError):
+            manager.cancel(run.run_id, None)
+        await asyncio.sleep(0)
+        assert not run.task.done()
+
+        manager.cancel(run.run_id, second)
+        await asyncio.wait({run.task}, timeout=1)
+        assert run.status == "cancelled"
+        assert graph.runs == 1
+
+    asyncio.run(scenario())
+
+
+def test_coalescing_key_separates_tenants_and_api_keys():
+    base = coalescing_key(request())
+    assert coalescing_key(request(user_id="bob")) == base
+    assert coalescing_key(request(tenant_id="other")) != base
+    with_key = coalescing_key(request(config={"tavily_api_key": "tvly-a"}))
+    assert with_key != base
+    assert coalescing_key(request(config={"tavily_api_key": "tvly-b"})) != with_key
+    assert coalescing_key(request(config={"tavily_api_key": "tvly-a"})) == with_key
@@ -0,0 +1,50 @@
+import sqlite3
+
+from agent.configuration import Configuration
+from agent.research_memory import ResearchMemory, recall_answers, remember_research
+
+SOURCE = {"label": "Example", "short_url": "[0]", "value": "https://example.com/a"}
+
+
+def configuration(tmp_path, **fields):
+    return Configuration(
+        research_memory=True, memory_path=str(tmp_path / "memory.sqlite"), **fields
+    )
+
+
+def test_searches_without_sources_are_not_remembered(tmp_path):
+    configurable = configuration(tmp_path)
+    remember_research(
+        configurable, "tavily", "battery prices", "No results were found.", []
+    )
+    remaining, answered = recall_answers(["battery prices"], configurable)
+    assert remaining == ["battery prices"]
+    assert answered["web_research_result"] == []
+
+
+def test_memory_is_kept_per_scope(tmp_path):
+    acme = configuration(tmp_path, memory_scope="acme")
+    remember_research(acme, "tavily", "battery prices", "Prices fell [0].", [SOURCE])
+
+    remaining, answered = recall_answers(["battery prices"], acme)
+    assert remaining == []
+    assert answered["sources_gathered"][0]["value"] == SOURCE["value"]
+
+    for scope in ("other", ""):
+        other = configuration(tmp_path, memory_scope=scope)
+        assert recall_answers(["battery prices"], other)[0] == ["battery prices"]
+
+
+def test_databases_without_scopes_are_migrated(tmp_path):
+    path = tmp_path / "old.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE research (id INTEGER PRIMARY KEY, search_type TEXT NOT NULL, "
+        "query TEXT NOT NULL, summary TEXT NOT NULL, sources TEXT NOT NULL, "
+        "created_at REAL NOT NULL)"
+    )
+    conn.close()
+
+    memory = ResearchMemory(path)
+    memory.remember("tavily", "battery prices", "Prices fell.", [SOURCE])
+    assert memory.lookup("tavily", "battery prices", 60, 0.7)["summary"]
@@ -0,0 +1,112 @@
+import threading
+
+import pytest
+
+from agent.api_keys import use_api_keys
+from agent.configuration import Configuration
+from agent.graph import _search_cache_scope
+from agent.search_cache import SearchCache
+from agent.tools_and_schemas import lookup_cached_search, make_tavily_search_tool
+
+NO_RESULTS = "No search results found for 'battery prices'."
+
+
+def test_tool_does_not_cache_results_without_hits(monkeypatch):
+    searches = []
+
+    def search_tavily(query, *args):
+        searches.append(query)
+        return NO_RESULTS
+
+    monkeypatch.setattr("agent.tools_and_schemas.search_tavily", search_tavily)
+    tool = make_tavily_search_tool(cache=SearchCache())
+
+    assert tool.invoke({"query": "battery prices"}) == NO_RESULTS
+    assert tool.invoke({"query": "battery prices"}) == NO_RESULTS
+    assert len(searches) == 2
+
+
+def test_tool_caches_results_with_hits(monkeypatch):
+    searches = []
+
+    def search_tavily(query, *args):
+        searches.append(query)
+        return {"query": query, "results": [{"url": "https://example.com"}]}
+
+    monkeypatch.setattr("agent.tools_and_schemas.search_tavily", search_tavily)
+    tool = make_tavily_search_tool(cache=SearchCache())
+
+    tool.invoke({"query": "battery prices"})
+    tool.invoke({"query": "Battery prices"})
+    assert len(searches) == 1
+
+
+def test_failing_cacheable_drops_the_entry():
+    cache = SearchCache()
+
+    def cacheable(result):
+        raise AttributeError("not a dict")
+
+    with pytest.raises(AttributeError):
+        cache.fetch("query", lambda q: NO_RESULTS, cacheable=cacheable)
+    assert cache.get("query") is None
+
+
+def test_concurrent_fetches_share_one_search():
+    cache = SearchCache()
+    started, release = threading.Event(), threading.Event()
+    searches = []
+
+    def search(query):
+        searches.append(query)
+        started.set()
+        release.wait(5)
+        return {"results": [1]}
+
+    leader = threading.Thread(target=cache.fetch, args=("query", search))
+    leader.start()
+    started.wait(5)
+    follower = []
+    thread = threading.Thread(
+        target=lambda: follower.append(cache.fetch("query", search, timeout=5))
+    )
+    thread.start()
+    release.set()
+    leader.join(5)
+    thread.join(5)
+    assert follower == [{"results": [1]}]
+    assert len(searches) == 1
+
+
+def test_prefetched_results_without_hits_are_a_miss():
+    cache = SearchCache()
+    cache.prefetch("battery prices", lambda q: NO_RESULTS).result(5)
+    assert lookup_cached_search(cache, "battery prices") is None
+
+
+def test_scopes_do_not_share_results():
+    cache = SearchCache()
+    searches = []
+
+    def search(query):
+        searches.append(query)
+        return {"query": query, "results": [{"url": "https://example.com"}]}
+
+    cache.fetch("battery prices", search, scope="tenant-a:key-a")
+    assert cache.get("battery prices", scope="tenant-b:key-a") is None
+    assert cache.get("battery prices", scope="tenant-a:key-b") is None
+
+    cache.fetch("battery prices", search, scope="tenant-b:key-b")
+    assert searches == ["battery prices", "battery prices"]
+
+
+def test_run_scope_follows_tenant_and_tavily_key():
+    def scope(tenant, key):
+        config = {"configurable": {"memory_scope": tenant, "tavily_api_key": key}}
+        with use_api_keys(config):
+            return _search_cache_scope(Configuration.from_runnable_config(config))
+
+    assert scope("a", "tvly-a") == scope("a", "tvly-a")
+    assert scope("a", "tvly-a") != scope("b", "tvly-a")
+    assert scope("a", "tvly-a") != scope("a", "tvly-b")
+    assert "tvly-a" not in scope("a", "tvly-a")
@@ -0,0 +1,57 @@
+import langchain_tavily._utilities as tavily_utilities
+import pytest
+
+from agent.configuration import CallPolicy
+from agent.graph import SEARCH_BACKENDS, web_research
+
+FAST = CallPolicy(timeout_s=5.0, max_attempts=2, backoff_base_s=0, backoff_max_s=0)
+
+
+class Response:
+    def __init__(self, status_code: int, body: dict):
+        self.status_code = status_code
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+@pytest.fixture
+def tavily_503(monkeypatch):
+    requests = []
+
+    def post(url, json=None, headers=None, **kwargs):
+        requests.append(json["query"])
+        return Response(503, {"detail": {"error": "Service Unavailable"}})
+
+    monkeypatch.setenv("TAVILY_API_KEY", "tvly-test")
+    monkeypatch.setattr(tavily_utilities.requests, "post", post)
+    return requests
+
+
+def test_tavily_5xx_fails_over_to_google(monkeypatch, tavily_503):
+    google_calls = []
+
+    def google(state, configurable, prompt):
+        google_calls.append(state["search_query"])
+        source = {"label": "g", "short_url": "[0]", "value": "https://example.com/g"}
+        return "google summary", [source]
+
+    monkeypatch.setitem(SEARCH_BACKENDS, "google", google)
+    config = {
+        "configurable": {
+            "model_type": "fake",
+            "search_type": "tavily",
+            "search_failover_type": "google",
+            "call_policies": {"tavily": FAST, "web_research": FAST},
+        }
+    }
+    state = {"search_query": "battery prices", "id": "0"}
+
+    result = web_research(state, config)
+
+    # The fake model picks its own query; every attempt of it got the 503
+    assert len(tavily_503) == FAST.max_attempts
+    assert len(set(tavily_503)) == 1
+    assert google_calls == ["battery prices"]
+    assert result["web_research_result"] == ["google summary"]
@@ -0,0 +1,107 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from agent.app import create_frontend_router
+from agent.static_files import _is_hashed, byte_range, etag_matches
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "assets/index-B7mqx9Ux.js",
+        "main.3f9a2c1b.js",
+        "static/chunk-0a1b2c3d4e5f.css",
+    ],
+)
+def test_content_hashed_names(path):
+    assert _is_hashed(path)
+
+
+@pytest.mark.parametrize(
+    "path",
+    [
+        "index.html",
+        "apple-touch-icon.png",
+        "android-chrome-192x192.png",
+        "logo-dark-mode.svg",
+        "site.webmanifest",
+        "favicon-deadbeef.ico",
+    ],
+)
+def test_plain_names_are_revalidated(path):
+    assert not _is_hashed(path)
+
+
+@pytest.mark.parametrize(
+    "header",
+    ['"abc"', 'W/"abc"', '"other", W/"abc"', " * "],
+)
+def test_etag_matches(header):
+    assert etag_matches(header, '"abc"')
+
+
+@pytest.mark.parametrize("header", ["", '"abcd"', 'W/"ab"', "abc"])
+def test_etag_mismatches(header):
+    assert not etag_matches(header, '"abc"')
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [
+        ("bytes=0-3", (0, 3)),
+        ("bytes=4-", (4, 9)),
+        ("bytes=-3", (7, 9)),
+        ("bytes=5-100", (5, 9)),
+        ("bytes=0-1,4-5", None),
+        ("items=0-3", None),
+        ("bytes=3-1", None),
+    ],
+)
+def test_byte_range(header, expected):
+    assert byte_range(header, 10) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=10-", "bytes=-0"])
+def test_unsatisfiable_byte_range(header):
+    with pytest.raises(ValueError):
+        byte_range(header, 10)
+
+
+@pytest.fixture
+def frontend(tmp_path):
+    (tmp_path / "index.html").write_text("<html>app</html>")
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "index-B7mqx9Ux.js").write_text("console.log(1)")
+    return TestClient(create_frontend_router(str(tmp_path)))
+
+
+def test_head_returns_headers_without_body(frontend):
+    response = frontend.head("/assets/index-B7mqx9Ux.js")
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["content-length"] == "14"
+    assert frontend.head("/settings").headers["content-length"] == "16"
+
+
+def test_range_requests(frontend):
+    etag = frontend.get("/assets/index-B7mqx9Ux.js").headers["etag"]
+
+    partial = frontend.get("/assets/index-B7mqx9Ux.js", headers={"Range": "bytes=0-6"})
+    assert partial.status_code == 206
+    assert partial.content == b"console"
+    assert partial.headers["content-range"] == "bytes 0-6/14"
+
+    stale = frontend.get(
+        "/assets/index-B7mqx9Ux.js",
+        headers={"Range": "bytes=0-6", "If-Range": '"old"'},
+    )
+    assert stale.status_code == 200
+    current = frontend.get(
+        "/assets/index-B7mqx9Ux.js", headers={"Range": "bytes=0-6", "If-Range": etag}
+    )
+    assert current.status_code == 206
+
+    unsatisfiable = frontend.get("/index.html", headers={"Range": "bytes=99-"})
+    assert unsatisfiable.status_code == 416
+    assert unsatisfiable.headers["content-range"] == "bytes */16"